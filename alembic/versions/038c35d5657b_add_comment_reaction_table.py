@@ -0,0 +1,106 @@
+"""Add comment reaction table
+
+Revision ID: 038c35d5657b
+Revises: 88cbcee63c72
+Create Date: 2026-10-18 21:26:04.551372
+
+"""
+from collections import Counter
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '038c35d5657b'
+down_revision: Union[str, None] = '88cbcee63c72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+reactions = sa.table(
+    'reactions',
+    sa.column('id', sa.Integer),
+    sa.column('comment_id', sa.Integer),
+    sa.column('data', sa.JSON),
+)
+comment_reaction = sa.table(
+    'comment_reaction',
+    sa.column('comment_id', sa.Integer),
+    sa.column('user_id', sa.Integer),
+    sa.column('kind', sa.String),
+)
+comment_reaction_count = sa.table(
+    'comment_reaction_count',
+    sa.column('comment_id', sa.Integer),
+    sa.column('kind', sa.String),
+    sa.column('count', sa.Integer),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'comment_reaction',
+        sa.Column('comment_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.ForeignKeyConstraint(['comment_id'], ['comment.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('comment_id', 'user_id')
+    )
+    op.create_table(
+        'comment_reaction_count',
+        sa.Column('comment_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['comment_id'], ['comment.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('comment_id', 'kind')
+    )
+
+    # Move the {kind: [user_ids]} blobs to one row per user, skipping users and comments that no
+    # longer exist. A user listed under several kinds keeps the first one.
+    connection = op.get_bind()
+    user_ids = set(connection.execute(sa.text('SELECT id FROM "user"')).scalars())
+    comment_ids = set(connection.execute(sa.text('SELECT id FROM comment')).scalars())
+    rows = {}
+    for comment_id, data in connection.execute(sa.select(reactions.c.comment_id, reactions.c.data)):
+        if comment_id not in comment_ids:
+            continue
+        for kind, users in (data or {}).items():
+            for user_id in users:
+                if user_id in user_ids:
+                    rows.setdefault((comment_id, user_id), kind)
+
+    if rows:
+        op.bulk_insert(comment_reaction, [{'comment_id': comment_id, 'user_id': user_id, 'kind': kind}
+                                          for (comment_id, user_id), kind in rows.items()])
+        counts = Counter((comment_id, kind) for (comment_id, _), kind in rows.items())
+        op.bulk_insert(comment_reaction_count, [{'comment_id': comment_id, 'kind': kind, 'count': count}
+                                                for (comment_id, kind), count in counts.items()])
+
+    op.drop_index('ix_reactions_comment_id', table_name='reactions')
+    op.drop_table('reactions')
+
+
+def downgrade() -> None:
+    op.create_table(
+        'reactions',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('comment_id', sa.Integer(), nullable=True),
+        sa.Column('data', sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(['comment_id'], ['comment.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_reactions_comment_id', 'reactions', ['comment_id'], unique=False)
+    op.create_index(op.f('ix_reactions_id'), 'reactions', ['id'], unique=False)
+
+    connection = op.get_bind()
+    data = {}
+    for comment_id, user_id, kind in connection.execute(
+            sa.select(comment_reaction.c.comment_id, comment_reaction.c.user_id, comment_reaction.c.kind)):
+        data.setdefault(comment_id, {}).setdefault(kind, []).append(user_id)
+    if data:
+        op.bulk_insert(reactions, [{'comment_id': comment_id, 'data': kinds} for comment_id, kinds in data.items()])
+
+    op.drop_table('comment_reaction_count')
+    op.drop_table('comment_reaction')
@@ -0,0 +1,53 @@
+"""Add picture full-text index
+
+Revision ID: 16e9fd62c783
+Revises: 9f2a906cf4ee
+Create Date: 2026-10-18 14:05:51.220318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '16e9fd62c783'
+down_revision: Union[str, None] = '9f2a906cf4ee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The index as of this revision; it is inlined so later changes to src.database.fulltext do not
+# alter what this migration does.
+PICTURE_TAGS = ("SELECT {aggregate} FROM tag JOIN picture_tags_association "
+                "ON picture_tags_association.tag_id = tag.id "
+                "WHERE picture_tags_association.picture_id = picture.id")
+
+SQLITE_UPGRADE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS picture_fts USING fts5(description, tags)",
+    "INSERT INTO picture_fts (rowid, description, tags) "
+    "SELECT id, COALESCE(description, ''), COALESCE(({}), '') FROM picture".format(
+        PICTURE_TAGS.format(aggregate="group_concat(tag.name, ' ')")),
+)
+POSTGRESQL_UPGRADE = (
+    "CREATE TABLE IF NOT EXISTS picture_fts ("
+    "picture_id INTEGER PRIMARY KEY REFERENCES picture (id) ON DELETE CASCADE, "
+    "document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_picture_fts_document ON picture_fts USING GIN (document)",
+    "INSERT INTO picture_fts (picture_id, document) "
+    "SELECT id, setweight(to_tsvector('simple', COALESCE(({}), '')), 'A') || "
+    "setweight(to_tsvector('simple', COALESCE(description, '')), 'B') FROM picture".format(
+        PICTURE_TAGS.format(aggregate="string_agg(tag.name, ' ')")),
+)
+
+
+def upgrade() -> None:
+    dialect_name = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRESQL_UPGRADE}.get(dialect_name, ())
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name in ("sqlite", "postgresql"):
+        op.execute("DROP TABLE IF EXISTS picture_fts")
@@ -0,0 +1,26 @@
+"""Add picture feed index
+
+Revision ID: 670b23498b24
+Revises: 864c40bfcf2e
+Create Date: 2026-10-18 09:12:05.413927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '670b23498b24'
+down_revision: Union[str, None] = '864c40bfcf2e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_picture_created_at_id', 'picture', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_picture_created_at_id', table_name='picture')
@@ -0,0 +1,64 @@
+"""Add foreign key indexes
+
+Revision ID: 88cbcee63c72
+Revises: eaa787ff41e9
+Create Date: 2026-10-18 20:41:37.118604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '88cbcee63c72'
+down_revision: Union[str, None] = 'eaa787ff41e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A user rates a picture at most once: keep the latest of any duplicate ratings and
+    # recount the aggregates of the pictures, which counted every duplicate.
+    op.execute(
+        """
+        DELETE FROM rating
+        WHERE picture_id IS NOT NULL AND user_id IS NOT NULL AND id NOT IN (
+            SELECT MAX(id) FROM rating
+            WHERE picture_id IS NOT NULL AND user_id IS NOT NULL
+            GROUP BY picture_id, user_id
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE picture SET
+            rating_sum = (SELECT COALESCE(SUM(rating.rat), 0) FROM rating WHERE rating.picture_id = picture.id),
+            rating_count = (SELECT COUNT(rating.rat) FROM rating WHERE rating.picture_id = picture.id)
+        """
+    )
+
+    op.create_index('ix_picture_user_id_created_at_id', 'picture', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_rating_picture_id_user_id', 'rating', ['picture_id', 'user_id'], unique=True)
+    op.create_index('ix_rating_user_id', 'rating', ['user_id'], unique=False)
+    op.create_index('ix_comment_picture_id_created_at', 'comment', ['picture_id', 'created_at'], unique=False)
+    op.create_index('ix_comment_user_id', 'comment', ['user_id'], unique=False)
+    op.create_index('ix_reactions_comment_id', 'reactions', ['comment_id'], unique=False)
+    op.create_index('ix_message_sender_id', 'message', ['sender_id'], unique=False)
+    op.create_index('ix_message_receiver_id', 'message', ['receiver_id'], unique=False)
+    op.create_index('ix_story_created_at', 'story', ['created_at'], unique=False)
+    op.create_index('ix_story_user_id_created_at', 'story', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_story_user_id_created_at', table_name='story')
+    op.drop_index('ix_story_created_at', table_name='story')
+    op.drop_index('ix_message_receiver_id', table_name='message')
+    op.drop_index('ix_message_sender_id', table_name='message')
+    op.drop_index('ix_reactions_comment_id', table_name='reactions')
+    op.drop_index('ix_comment_user_id', table_name='comment')
+    op.drop_index('ix_comment_picture_id_created_at', table_name='comment')
+    op.drop_index('ix_rating_user_id', table_name='rating')
+    op.drop_index('ix_rating_picture_id_user_id', table_name='rating')
+    op.drop_index('ix_picture_user_id_created_at_id', table_name='picture')
@@ -0,0 +1,38 @@
+"""Add picture rating aggregates
+
+Revision ID: 9f2a906cf4ee
+Revises: 670b23498b24
+Create Date: 2026-10-18 11:47:22.908154
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f2a906cf4ee'
+down_revision: Union[str, None] = '670b23498b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('picture') as batch_op:
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(
+        """
+        UPDATE picture SET
+            rating_sum = (SELECT COALESCE(SUM(rating.rat), 0) FROM rating WHERE rating.picture_id = picture.id),
+            rating_count = (SELECT COUNT(rating.rat) FROM rating WHERE rating.picture_id = picture.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('picture') as batch_op:
+        batch_op.drop_column('rating_count')
+        batch_op.drop_column('rating_sum')
@@ -0,0 +1,39 @@
+"""Add media asset index
+
+Revision ID: eaa787ff41e9
+Revises: 16e9fd62c783
+Create Date: 2026-10-18 17:59:56.030645
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'eaa787ff41e9'
+down_revision: Union[str, None] = '16e9fd62c783'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'media_asset',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('resource_type', sa.String(length=20), nullable=False),
+        sa.Column('url', sa.String(length=255), nullable=False),
+        sa.Column('upload_json', sa.JSON(), nullable=True),
+        sa.Column('qr_code', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_media_asset_content_hash_resource_type', 'media_asset',
+                    ['content_hash', 'resource_type'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_media_asset_content_hash_resource_type', table_name='media_asset')
+    op.drop_table('media_asset')
@@ -4,13 +4,22 @@ from fastapi import FastAPI
 from fastapi_limiter import FastAPILimiter
 from starlette.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from src.database.db import replica_router, DB_REPLICA_CHECK_INTERVAL, DB_REPLICA_PIN_SECONDS
+from src.database.replicas import pin_primary_after_writes
 from src.routes import (users, auth, messages, tags, search, comments, pictures, descriptions, reactions,
-                        rating, main_router, stories)
+                        rating, main_router, stories, metrics)
+from src.services.passwords import password_service
 from src.services.secrets_manager import SecretsManager
+from src.services.storage import storage_service, LocalBackend
+from src.services.story_purge import story_purger, STORY_PURGE_INTERVAL
 
 app = FastAPI()
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
+if isinstance(storage_service.backend, LocalBackend) and storage_service.backend.base_url.startswith("/"):
+    # Local media is served by the app itself unless MEDIA_URL points at a CDN origin.
+    app.mount(storage_service.backend.base_url, StaticFiles(directory=storage_service.backend.root, check_dir=False),
+              name="media")
 
 origins = [
     "http://localhost:8000"
@@ -24,6 +33,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if replica_router.engines:
+    # Reads right after a write go to the primary so clients see their own changes.
+    app.middleware("http")(pin_primary_after_writes(DB_REPLICA_PIN_SECONDS))
+
 app.include_router(main_router.router, tags=["Main"])
 app.include_router(auth.router, prefix='/api')
 app.include_router(users.router, prefix='/api')
@@ -36,6 +49,7 @@ app.include_router(tags.router, prefix='/api')
 app.include_router(comments.router, prefix='/api')
 app.include_router(reactions.router, prefix='/api')
 app.include_router(stories.router, prefix='/api')
+app.include_router(metrics.router)
 
 REDIS_HOST = SecretsManager.get_secret("REDIS_HOST")
 REDIS_PORT = SecretsManager.get_secret("REDIS_PORT")
@@ -45,8 +59,11 @@ REDIS_PASSWORD = SecretsManager.get_secret("REDIS_PASSWORD")
 @app.on_event("startup")
 async def startup():
     """
-    Function to initialize FastAPILimiter on application startup.
+    Function to initialize FastAPILimiter, the read replica health checks and the purge of expired
+    stories on application startup.
     """
+    replica_router.start(DB_REPLICA_CHECK_INTERVAL)
+    story_purger.start(STORY_PURGE_INTERVAL)
     r = await redis.Redis(
         host=REDIS_HOST,
         port=REDIS_PORT,
@@ -56,5 +73,17 @@ async def startup():
     )
     await FastAPILimiter.init(r)
 
+
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Function to stop the story purge, let pending media uploads and password hashes finish and close
+    the read replicas on application shutdown.
+    """
+    await story_purger.stop()
+    storage_service.shutdown()
+    password_service.shutdown()
+    await replica_router.stop()
+
 if __name__ == "__main__":
     uvicorn.run("main:app", reload=True)
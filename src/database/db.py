@@ -1,26 +1,125 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from starlette.requests import Request
 
+from src.database.pool import TimedQueuePool
+from src.database.replicas import ReplicaRouter, is_pinned_to_primary
 from src.services.secrets_manager import SecretsManager
+import src.database.fulltext  # noqa: F401 - registers the full-text index listeners
 
 SQLALCHEMY_DATABASE_URL = SecretsManager.get_secret("SQLALCHEMY_DATABASE_URL")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Per worker process: a gunicorn deployment opens up to workers * (size + overflow) connections.
+DB_POOL_SIZE = int(SecretsManager.get_secret("DB_POOL_SIZE"))
+DB_MAX_OVERFLOW = int(SecretsManager.get_secret("DB_MAX_OVERFLOW"))
+DB_POOL_TIMEOUT = float(SecretsManager.get_secret("DB_POOL_TIMEOUT"))
+DB_POOL_RECYCLE = int(SecretsManager.get_secret("DB_POOL_RECYCLE"))
+DB_POOL_PRE_PING = SecretsManager.get_secret("DB_POOL_PRE_PING").lower() in ("1", "true", "yes")
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Comma-separated URLs of read replicas; empty to read from the primary only.
+SQLALCHEMY_REPLICA_URLS = [url.strip() for url in SecretsManager.get_secret("SQLALCHEMY_REPLICA_URLS").split(",")
+                           if url.strip()]
+DB_REPLICA_CHECK_INTERVAL = float(SecretsManager.get_secret("DB_REPLICA_CHECK_INTERVAL"))
+DB_REPLICA_PIN_SECONDS = int(SecretsManager.get_secret("DB_REPLICA_PIN_SECONDS"))
 
-def get_db():
+# Async drivers used by the application for each database backend. Alembic keeps using the
+# synchronous driver of SQLALCHEMY_DATABASE_URL.
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Convert a database URL to use the async driver of its backend.
+
+    `postgresql://` and `postgresql+psycopg2://` URLs are switched to asyncpg and `sqlite://` URLs
+    to aiosqlite; URLs that already name an async driver are returned unchanged.
+
+    Args:
+        url (str): The database URL.
+
+    Returns:
+        str: The URL with an async driver.
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None or parsed.drivername in ASYNC_DRIVERS.values():
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def pool_options() -> dict:
+    """
+    Connection pool settings for the engine, read from the secrets.
+
+    Returns:
+        dict: Keyword arguments for `create_async_engine`.
+    """
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL), **pool_options())
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+replica_router = ReplicaRouter([create_async_engine(async_database_url(url), **pool_options())
+                                for url in SQLALCHEMY_REPLICA_URLS])
+
+
+async def get_db():
     """
     Function to obtain a database session.
 
+    The session runs on the async engine, so a request waiting for the database gives the event
+    loop back to other requests instead of blocking the worker.
+
+    Returns:
+        sqlalchemy.ext.asyncio.AsyncSession: A SQLAlchemy async database session.
+
+    Yields:
+        sqlalchemy.ext.asyncio.AsyncSession: A SQLAlchemy async database session.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def read_engine(request: Request) -> AsyncEngine:
+    """
+    Choose the engine that serves a read-only request.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        AsyncEngine: A healthy replica, or the primary when the client was pinned to it after a
+        write or no replica is available.
+    """
+    if is_pinned_to_primary(request):
+        return async_engine
+    return replica_router.choose() or async_engine
+
+
+async def get_db_read(request: Request):
+    """
+    Function to obtain a database session for read-only requests.
+
+    Reads are spread over the read replicas. The session must not be used to write: replicas reject
+    writes, and the primary is only used as a fallback.
+
     Returns:
-        sqlalchemy.orm.Session: A SQLAlchemy database session.
+        sqlalchemy.ext.asyncio.AsyncSession: A SQLAlchemy async database session.
 
     Yields:
-        sqlalchemy.orm.Session: A SQLAlchemy database session.
+        sqlalchemy.ext.asyncio.AsyncSession: A SQLAlchemy async database session.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal(bind=read_engine(request)) as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,162 @@
+"""
+Full-text index of picture descriptions and tag names.
+
+SQLite (local development and tests) uses an FTS5 virtual table keyed by the picture id.
+PostgreSQL uses a `tsvector` table with a GIN index, tag names weighted above the description.
+The index is kept in sync from an `after_flush` session hook, so every code path that creates a
+picture, edits its description or changes its tags is covered without extra calls.
+"""
+
+import re
+
+from sqlalchemy import event, inspect, select, text, bindparam, Integer, Float
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Subquery
+
+from src.database.models import Base, Picture, Tag, PictureTagsAssociation
+
+SQLITE_CREATE = "CREATE VIRTUAL TABLE IF NOT EXISTS picture_fts USING fts5(description, tags)"
+POSTGRESQL_CREATE = (
+    "CREATE TABLE IF NOT EXISTS picture_fts ("
+    "picture_id INTEGER PRIMARY KEY REFERENCES picture (id) ON DELETE CASCADE, "
+    "document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_picture_fts_document ON picture_fts USING GIN (document)",
+)
+DROP = "DROP TABLE IF EXISTS picture_fts"
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def is_supported(dialect_name: str) -> bool:
+    """
+    Check if the full-text index is available for the given database dialect.
+    """
+    return dialect_name in ("sqlite", "postgresql")
+
+
+def create_index(connection: Connection) -> None:
+    """
+    Create the full-text index table for the connection's dialect.
+    """
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(SQLITE_CREATE))
+    elif connection.dialect.name == "postgresql":
+        for statement in POSTGRESQL_CREATE:
+            connection.execute(text(statement))
+
+
+def drop_index(connection: Connection) -> None:
+    """
+    Drop the full-text index table.
+    """
+    if is_supported(connection.dialect.name):
+        connection.execute(text(DROP))
+
+
+def reindex_pictures(picture_ids: set[int], connection: Connection) -> None:
+    """
+    Rebuild the index entries of the given pictures from their current description and tags.
+
+    Pictures that no longer exist are removed from the index.
+
+    Args:
+        picture_ids (set[int]): IDs of the pictures to reindex.
+        connection (Connection): Connection bound to the current transaction.
+    """
+    if not picture_ids or not is_supported(connection.dialect.name):
+        return
+
+    descriptions = dict(connection.execute(
+        select(Picture.id, Picture.description).where(Picture.id.in_(picture_ids))
+    ).all())
+    tags = {picture_id: [] for picture_id in descriptions}
+    for picture_id, name in connection.execute(
+            select(PictureTagsAssociation.picture_id, Tag.name)
+            .join(Tag, Tag.id == PictureTagsAssociation.tag_id)
+            .where(PictureTagsAssociation.picture_id.in_(list(descriptions)))):
+        tags[picture_id].append(name)
+
+    connection.execute(
+        text("DELETE FROM picture_fts WHERE {} IN :ids".format(
+            "rowid" if connection.dialect.name == "sqlite" else "picture_id"
+        )).bindparams(bindparam("ids", expanding=True)),
+        {"ids": list(picture_ids)}
+    )
+    if not descriptions:
+        return
+
+    rows = [{"id": picture_id, "description": description or "", "tags": " ".join(tags[picture_id])}
+            for picture_id, description in descriptions.items()]
+    if connection.dialect.name == "sqlite":
+        connection.execute(
+            text("INSERT INTO picture_fts (rowid, description, tags) VALUES (:id, :description, :tags)"), rows
+        )
+    else:
+        connection.execute(
+            text("INSERT INTO picture_fts (picture_id, document) VALUES (:id, "
+                 "setweight(to_tsvector('simple', :tags), 'A') || "
+                 "setweight(to_tsvector('simple', :description), 'B'))"), rows
+        )
+
+
+def match_pictures(keyword: str, dialect_name: str) -> Subquery | None:
+    """
+    Build a subquery of pictures matching all words of the keyword, with their relevance.
+
+    Every word is matched as a prefix, so "holi" finds "holiday".
+
+    Args:
+        keyword (str): The user's search phrase.
+        dialect_name (str): Name of the database dialect.
+
+    Returns:
+        Subquery | None: A subquery with `picture_id` and `rank` columns (higher rank is more
+        relevant), or None if the keyword contains no words.
+    """
+    words = WORD.findall(keyword)
+    if not words:
+        return None
+
+    if dialect_name == "sqlite":
+        statement = text(
+            "SELECT rowid AS picture_id, -bm25(picture_fts, 1.0, 2.0) AS rank "
+            "FROM picture_fts WHERE picture_fts MATCH :query"
+        ).bindparams(query=" ".join(f'"{word}"*' for word in words))
+    else:
+        statement = text(
+            "SELECT picture_id, ts_rank(document, to_tsquery('simple', :query)) AS rank "
+            "FROM picture_fts WHERE document @@ to_tsquery('simple', :query)"
+        ).bindparams(query=" & ".join(f"{word}:*" for word in words))
+
+    return statement.columns(picture_id=Integer, rank=Float).subquery("picture_match")
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_index(target, connection, **kw):
+    create_index(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_index(target, connection, **kw):
+    drop_index(connection)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_index(session, flush_context):
+    picture_ids = set()
+    for obj in session.new:
+        if isinstance(obj, (Picture, PictureTagsAssociation)):
+            picture_ids.add(obj.id if isinstance(obj, Picture) else obj.picture_id)
+    for obj in session.dirty:
+        if isinstance(obj, Picture):
+            state = inspect(obj)
+            if state.attrs.description.history.has_changes() or state.attrs.tags.history.has_changes():
+                picture_ids.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, (Picture, PictureTagsAssociation)):
+            picture_ids.add(obj.id if isinstance(obj, Picture) else obj.picture_id)
+
+    picture_ids.discard(None)
+    if picture_ids:
+        reindex_pictures(picture_ids, session.connection())
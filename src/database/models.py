@@ -1,8 +1,8 @@
 import datetime
 
-from sqlalchemy import Column, Integer, String, func, ForeignKey
+from sqlalchemy import Column, Integer, String, func, ForeignKey, Index, Float, case, cast
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy.orm import relationship, declarative_base, query_expression
 from sqlalchemy.sql.sqltypes import DateTime, Boolean, JSON
 
 Base = declarative_base()
@@ -54,8 +54,16 @@ class Picture(Base):
         qr_code_picture_edited (str): URL of the QR code associated with the edited picture (nullable).
         description (str): Description of the picture (nullable).
         created_at (DateTime): Timestamp indicating when the picture was created.
+        rating_sum (int): Sum of all rating values, maintained incrementally by the rating repository.
+        rating_count (int): Number of ratings, maintained incrementally by the rating repository.
+        average_rating (float): Average rating derived from rating_sum and rating_count (None if unrated).
+        comment_count (int): Number of comments, populated only by queries that request it (e.g. the feed).
     """
     __tablename__ = "picture"
+    __table_args__ = (
+        Index('ix_picture_created_at_id', 'created_at', 'id'),
+        Index('ix_picture_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     picture_json = Column(JSON, nullable=True)
@@ -70,18 +78,26 @@ class Picture(Base):
     description = Column(String, nullable=True)
     created_at = Column('created_at', DateTime, default=func.now())
     user_id = Column('user_id', ForeignKey('user.id', ondelete='CASCADE'), default=None)
+    rating_sum = Column(Integer, nullable=False, default=0, server_default='0')
+    rating_count = Column(Integer, nullable=False, default=0, server_default='0')
 
     user = relationship('User', back_populates='pictures')
     tags = relationship('Tag', secondary='picture_tags_association', back_populates='pictures')
     comments = relationship('Comment', back_populates='picture')
     ratings = relationship('Rating', back_populates='picture')
 
+    comment_count = query_expression()
+
     @hybrid_property
     def average_rating(self):
-        if self.ratings:
-            return sum(rat.rat for rat in self.ratings) / len(self.ratings)
+        if self.rating_count:
+            return self.rating_sum / self.rating_count
         return None
 
+    @average_rating.expression
+    def average_rating(cls):
+        return case((cls.rating_count > 0, cast(cls.rating_sum, Float) / cls.rating_count), else_=None)
+
 
 class Rating(Base):
     """
@@ -98,6 +114,10 @@ class Rating(Base):
     The `picture` and `user` relationships create a direct link between the Rating instance and the associated Picture and User instances, respectively. This setup facilitates easy navigation and manipulation of related data within the application's ORM layer.
     """
     __tablename__ = "rating"
+    __table_args__ = (
+        Index('ix_rating_picture_id_user_id', 'picture_id', 'user_id', unique=True),
+        Index('ix_rating_user_id', 'user_id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     picture_id = Column(Integer, ForeignKey('picture.id', ondelete='CASCADE'))
@@ -121,6 +141,10 @@ class Comment(Base):
         user (User): Relationship with the User model representing the user who posted the comment.
     """
     __tablename__ = "comment"
+    __table_args__ = (
+        Index('ix_comment_picture_id_created_at', 'picture_id', 'created_at'),
+        Index('ix_comment_user_id', 'user_id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('user.id', ondelete='CASCADE'))
@@ -129,28 +153,51 @@ class Comment(Base):
     created_at = Column(DateTime)
     updated_at = Column(DateTime, onupdate=datetime.datetime.now)
 
-    reactions = relationship('Reaction', back_populates='comment')
+    reactions = relationship('CommentReaction', back_populates='comment', cascade='all, delete-orphan')
+    reaction_counts = relationship('CommentReactionCount', cascade='all, delete-orphan')
     picture = relationship('Picture', back_populates='comments')
     user = relationship('User', back_populates='comments')
 
 
-class Reaction(Base):
+class CommentReaction(Base):
     """
-    SQLAlchemy model representing a reaction on a comment.
+    SQLAlchemy model representing the reaction of a user to a comment.
+
+    A user has at most one reaction per comment, so adding or changing a reaction touches a single row.
 
     Attributes:
-        id (int): Primary key for the like.
-        comment_id (int): Foreign key referencing the id of the liked comment.
-        data (json): Dict of reactions with lists of users_id as values for a given reaction.
-        comment (Comment): Relationship with the Comment model representing the liked comment.
+        comment_id (int): Foreign key referencing the id of the comment.
+        user_id (int): Foreign key referencing the id of the user who reacted.
+        kind (str): The reaction ("like", "love", "wow", "haha" or "dislike").
+        comment (Comment): Relationship with the Comment model representing the comment.
+        user (User): Relationship with the User model representing the user who reacted.
     """
-    __tablename__ = "reactions"
+    __tablename__ = "comment_reaction"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    comment_id = Column(Integer, ForeignKey('comment.id', ondelete='CASCADE'))
-    data = Column(JSON)
+    comment_id = Column(Integer, ForeignKey('comment.id', ondelete='CASCADE'), primary_key=True)
+    user_id = Column(Integer, ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    kind = Column(String(20), nullable=False)
 
     comment = relationship('Comment', back_populates='reactions')
+    user = relationship('User')
+
+
+class CommentReactionCount(Base):
+    """
+    SQLAlchemy model holding the number of reactions of each kind to a comment.
+
+    Maintained incrementally by the reactions repository together with CommentReaction.
+
+    Attributes:
+        comment_id (int): Foreign key referencing the id of the comment.
+        kind (str): The reaction.
+        count (int): Number of users who reacted to the comment with `kind`.
+    """
+    __tablename__ = "comment_reaction_count"
+
+    comment_id = Column(Integer, ForeignKey('comment.id', ondelete='CASCADE'), primary_key=True)
+    kind = Column(String(20), primary_key=True)
+    count = Column(Integer, nullable=False, default=0, server_default='0')
 
 
 class User(Base):
@@ -231,6 +278,10 @@ class Message(Base):
         receiver (User): Relationship with the User model representing the receiver of the message.
     """
     __tablename__ = "message"
+    __table_args__ = (
+        Index('ix_message_sender_id', 'sender_id'),
+        Index('ix_message_receiver_id', 'receiver_id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     sender_id = Column(Integer, ForeignKey('user.id'))
@@ -247,6 +298,10 @@ class Story(Base):
     SQLAlchemy model representing a story.
     """
     __tablename__ = "story"
+    __table_args__ = (
+        Index('ix_story_created_at', 'created_at'),
+        Index('ix_story_user_id_created_at', 'user_id', 'created_at'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     image_url = Column(String(255), nullable=False)
@@ -256,3 +311,30 @@ class Story(Base):
     user_id = Column(Integer, ForeignKey('user.id', ondelete='CASCADE'))
 
     user = relationship('User', back_populates='stories')
+
+
+class MediaAsset(Base):
+    """
+    SQLAlchemy model indexing stored media by content, so identical uploads reuse one asset.
+
+    Attributes:
+        id (int): Primary key for the asset.
+        content_hash (str): SHA-256 hex digest of the uploaded file.
+        resource_type (str): Storage resource type the file was stored as ('image' or 'video').
+        url (str): URL of the stored file.
+        upload_json (json): Storage upload response of the file.
+        qr_code (str): URL of the QR code of `url` (nullable until it has been generated).
+        created_at (DateTime): Timestamp indicating when the asset was stored.
+    """
+    __tablename__ = "media_asset"
+    __table_args__ = (
+        Index('ix_media_asset_content_hash_resource_type', 'content_hash', 'resource_type', unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    content_hash = Column(String(64), nullable=False)
+    resource_type = Column(String(20), nullable=False)
+    url = Column(String(255), nullable=False)
+    upload_json = Column(JSON)
+    qr_code = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=func.now())
@@ -0,0 +1,91 @@
+"""
+Database connection pool with checkout telemetry.
+
+Each gunicorn worker holds its own pool, so up to `workers * (pool_size + max_overflow)` connections
+can be open against the database at once. The stats recorded here show how close a worker gets to
+its limit and how long requests wait for a connection, to size the pool against the worker count.
+"""
+
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolWaitStats:
+    """
+    Time spent waiting for a connection from the pool, since the pool was created.
+
+    Attributes:
+        checkouts (int): Number of connections handed out.
+        timeouts (int): Number of checkouts that gave up after `pool_timeout`.
+        wait_total (float): Total time spent waiting, in seconds.
+        wait_max (float): Longest single wait, in seconds.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records how long each checkout waits for a connection.
+
+    The wait includes opening a new connection when the pool has room, and queueing for a
+    returned one once `pool_size + max_overflow` connections are checked out.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return connection
+
+
+def pool_stats(engine: Engine) -> dict:
+    """
+    Snapshot the state of an engine's connection pool.
+
+    Args:
+        engine (Engine): The engine, or the `sync_engine` of an async engine.
+
+    Returns:
+        dict: `size` (configured persistent connections), `checked_in` (idle connections),
+        `checked_out` (connections in use), `overflow` (connections open beyond `size`, negative
+        while the pool is still filling up) and, for a TimedQueuePool, the checkout wait stats:
+        `checkouts`, `timeouts`, `wait_seconds_total` and `wait_seconds_max`.
+    """
+    pool = engine.pool
+    stats = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        stats.update(checkouts=wait_stats.checkouts,
+                     timeouts=wait_stats.timeouts,
+                     wait_seconds_total=wait_stats.wait_total,
+                     wait_seconds_max=wait_stats.wait_max)
+    return stats
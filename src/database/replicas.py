@@ -0,0 +1,143 @@
+"""
+Routing of read-only sessions to database read replicas.
+
+Replicas are picked round-robin among those that pass health checks. A replica is taken out of
+rotation when a health check fails or a connection to it drops, and put back once a health check
+succeeds again; while no replica is healthy, reads go to the primary.
+
+Replication is asynchronous, so a client that has just written could read stale data from a
+replica. After a successful write, the client is pinned to the primary for a few seconds with a
+cookie (see `pin_primary_after_writes`).
+"""
+
+import asyncio
+import itertools
+import logging
+from functools import partial
+from typing import Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.requests import Request
+
+PRIMARY_PIN_COOKIE = "db_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaRouter:
+    """
+    Round-robin choice of a healthy read replica.
+
+    Attributes:
+        engines (list[AsyncEngine]): The replica engines, in configuration order.
+        check_timeout (float): Seconds a health check may take before the replica counts as down.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], check_timeout: float = 2.0):
+        self.engines = engines
+        self.check_timeout = check_timeout
+        self._down: set[int] = set()
+        self._turn = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        for index, engine in enumerate(engines):
+            event.listen(engine.sync_engine, "handle_error", partial(self._on_error, index))
+
+    def is_healthy(self, index: int) -> bool:
+        return index not in self._down
+
+    def choose(self) -> Optional[AsyncEngine]:
+        """
+        Pick the replica for the next read-only session.
+
+        Returns:
+            Optional[AsyncEngine]: The next healthy replica, or None if there is none.
+        """
+        healthy = [engine for index, engine in enumerate(self.engines) if self.is_healthy(index)]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    def mark_down(self, index: int) -> None:
+        if index not in self._down:
+            logger.warning("database replica %s taken out of rotation", index)
+            self._down.add(index)
+
+    def mark_up(self, index: int) -> None:
+        if index in self._down:
+            logger.info("database replica %s back in rotation", index)
+            self._down.discard(index)
+
+    def _on_error(self, index: int, context: ExceptionContext) -> None:
+        if context.is_disconnect:
+            self.mark_down(index)
+
+    async def check(self) -> None:
+        """
+        Run `SELECT 1` on every replica and update which ones are in rotation.
+        """
+        async def ping(index: int, engine: AsyncEngine) -> None:
+            try:
+                async with asyncio.timeout(self.check_timeout):
+                    async with engine.connect() as connection:
+                        await connection.execute(text("SELECT 1"))
+            except Exception:
+                self.mark_down(index)
+            else:
+                self.mark_up(index)
+
+        await asyncio.gather(*(ping(index, engine) for index, engine in enumerate(self.engines)))
+
+    async def _run_checks(self, interval: float) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float) -> None:
+        """
+        Start checking the replicas every `interval` seconds in the background.
+        """
+        if self.engines and self._task is None:
+            self._task = asyncio.create_task(self._run_checks(interval))
+
+    async def stop(self) -> None:
+        """
+        Stop the health checks and close the replica connections.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for engine in self.engines:
+            await engine.dispose()
+
+
+def is_pinned_to_primary(request: Request) -> bool:
+    return request.cookies.get(PRIMARY_PIN_COOKIE) is not None
+
+
+def pin_primary_after_writes(pin_seconds: int):
+    """
+    Create a middleware that pins a client to the primary for `pin_seconds` after a write.
+
+    Any successful request with a method other than GET, HEAD or OPTIONS counts as a write, so
+    the redirect that follows a form post and the client's next API reads see its own changes.
+
+    Args:
+        pin_seconds (int): How long reads from the client stay on the primary.
+
+    Returns:
+        Callable: An HTTP middleware for `app.middleware("http")`.
+    """
+    async def middleware(request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(PRIMARY_PIN_COOKIE, "1", max_age=pin_seconds, httponly=True, samesite="lax")
+        return response
+
+    return middleware
@@ -0,0 +1,27 @@
+"""
+Dialect-specific INSERT constructs for `INSERT ... ON CONFLICT DO UPDATE` upserts.
+
+SQLAlchemy only offers `on_conflict_do_update` on the INSERT constructs of the dialects that
+support it, so repositories pick the construct matching the session's database.
+"""
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert_insert(db: AsyncSession):
+    """
+    Get the INSERT construct with ON CONFLICT support for the session's database.
+
+    Args:
+        db (AsyncSession): The session the statement will be executed on.
+
+    Returns:
+        Callable: `sqlalchemy.dialects.postgresql.insert` or `sqlalchemy.dialects.sqlite.insert`.
+    """
+    return UPSERT_INSERTS[db.get_bind().dialect.name]
@@ -1,10 +1,11 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.models import User
 from src.schemas import AdminUserUpdateModel
 
 
-async def update_user_admin(user_id: int, body: AdminUserUpdateModel, db: Session):
+async def update_user_admin(user_id: int, body: AdminUserUpdateModel, db: AsyncSession):
     """
     Updates user details in the database as an admin. This function allows for partial updates,
     meaning only the fields provided in the request body will be updated. It is designed to be used
@@ -17,7 +18,7 @@ async def update_user_admin(user_id: int, body: AdminUserUpdateModel, db: Sessio
                                      values for the user. This model includes fields that can be updated,
                                      and it uses Pydantic's `exclude_unset` feature to ignore fields that
                                      are not included in the request, allowing for partial updates.
-    - `db` (Session): The database session, used to execute database operations.
+    - `db` (AsyncSession): The database session, used to execute database operations.
 
     Returns:
     - The updated user object, reflecting the changes made. If the update is successful, this object
@@ -32,7 +33,7 @@ async def update_user_admin(user_id: int, body: AdminUserUpdateModel, db: Sessio
     are left unchanged. After updating the user details, the function commits the changes to the database
     and refreshes the user object to reflect the updated state.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -40,6 +41,6 @@ async def update_user_admin(user_id: int, body: AdminUserUpdateModel, db: Sessio
     for key, value in update_data_dict.items():
         setattr(user, key, value)
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
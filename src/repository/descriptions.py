@@ -1,9 +1,11 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.models import Picture
+from src.services.cache import picture_detail_cache
 from fastapi import HTTPException
 
 
-async def upload_description(picture_id: int, description: str, db: Session) -> Picture:
+async def upload_description(picture_id: int, description: str, db: AsyncSession) -> Picture:
     """
     Upload the description of a picture in the database.
 
@@ -12,22 +14,23 @@ async def upload_description(picture_id: int, description: str, db: Session) ->
     Parameters:
     - picture_id (int): The ID of the picture whose description is to be updated.
     - description (str): The new description to be assigned to the picture.
-    - db (Session): The SQLAlchemy session used to interact with the database.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
 
     Returns:
     - Picture: The updated Picture object with the new description.
     """
 
-    picture = db.query(Picture).filter(Picture.id == picture_id).first()
+    picture = await db.scalar(select(Picture).where(Picture.id == picture_id))
     if not picture:
         raise HTTPException(status_code=404, detail="Picture not found")
 
     picture.description = description
-    db.commit()
+    await db.commit()
+    await picture_detail_cache.delete(picture_id)
     return picture
 
 
-async def get_all_descriptions(skip: int, limit: int, db: Session) -> list[str]:
+async def get_all_descriptions(skip: int, limit: int, db: AsyncSession) -> list[str]:
     """
     Retrieves descriptions of pictures from the database.
 
@@ -37,16 +40,17 @@ async def get_all_descriptions(skip: int, limit: int, db: Session) -> list[str]:
     Parameters:
     - skip (int): The number of records to skip.
     - limit (int): The maximum number of records to return.
-    - db (Session): The SQLAlchemy session used to interact with the database.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
 
     Returns:
     - List[str]: A list of descriptions of pictures.
     """
 
-    return db.query(Picture.description).offset(skip).limit(limit).all()
+    result = await db.execute(select(Picture.description).offset(skip).limit(limit))
+    return result.all()
 
 
-async def get_one_description(picture_id: int, db: Session) -> str:
+async def get_one_description(picture_id: int, db: AsyncSession) -> str:
     """
     Retrieves the description of a specific picture from the database.
 
@@ -54,16 +58,17 @@ async def get_one_description(picture_id: int, db: Session) -> str:
 
     Parameters:
     - picture_id (int): The ID of the picture whose description is to be retrieved.
-    - db (Session): The SQLAlchemy session used to interact with the database.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
 
     Returns:
     - Optional[Picture]: The Picture object containing the description, or None if not found.
     """
 
-    return db.query(Picture.description).filter(Picture.id == picture_id).first()
+    result = await db.execute(select(Picture.description).where(Picture.id == picture_id))
+    return result.first()
 
 
-async def update_description(picture_id: int, new_description: str, db: Session) -> Picture | None:
+async def update_description(picture_id: int, new_description: str, db: AsyncSession) -> Picture | None:
     """
     Updates the description of a picture in the database.
 
@@ -72,20 +77,21 @@ async def update_description(picture_id: int, new_description: str, db: Session)
     Parameters:
     - picture_id (int): The ID of the picture whose description is to be updated.
     - new_description (str): The new description to be assigned to the picture.
-    - db (Session): The SQLAlchemy session used to interact with the database.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
 
     Returns:
     - Optional[Picture]: The updated Picture object with the new description, or None if picture not found.
     """
 
-    picture = db.query(Picture).filter(Picture.id == picture_id).first()
+    picture = await db.scalar(select(Picture).where(Picture.id == picture_id))
     if picture:
         picture.description = new_description
-        db.commit()
+        await db.commit()
+        await picture_detail_cache.delete(picture_id)
     return picture
 
 
-async def delete_description(picture_id: int, db: Session) -> Picture | None:
+async def delete_description(picture_id: int, db: AsyncSession) -> Picture | None:
     """
     Deletes the description of a picture in the database.
 
@@ -93,14 +99,15 @@ async def delete_description(picture_id: int, db: Session) -> Picture | None:
 
     Parameters:
     - picture_id (int): The ID of the picture whose description is to be deleted.
-    - db (Session): The SQLAlchemy session used to interact with the database.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
 
     Returns:
     - Optional[Picture]: The Picture object after deleting the description, or None if picture not found.
     """
 
-    picture = db.query(Picture).filter(Picture.id == picture_id).first()
+    picture = await db.scalar(select(Picture).where(Picture.id == picture_id))
     if picture:
         picture.description = None
-        db.commit()
+        await db.commit()
+        await picture_detail_cache.delete(picture_id)
     return picture
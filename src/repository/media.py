@@ -0,0 +1,62 @@
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import MediaAsset
+
+
+async def get_media_asset(content_hash: str, resource_type: str, db: AsyncSession) -> MediaAsset | None:
+    """
+    Asynchronously retrieves the stored asset with the given content.
+
+    Parameters:
+    - content_hash (str): SHA-256 hex digest of the file.
+    - resource_type (str): Storage resource type of the file.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
+
+    Returns:
+    - MediaAsset | None: The asset, or None if this content has not been stored yet.
+    """
+    return await db.scalar(select(MediaAsset).where(MediaAsset.content_hash == content_hash,
+                                                    MediaAsset.resource_type == resource_type))
+
+
+async def add_media_asset(content_hash: str, resource_type: str, url: str, upload_json: dict, db: AsyncSession) -> MediaAsset:
+    """
+    Asynchronously records a newly stored file in the content index.
+
+    If the same content was recorded concurrently by another request, that asset is returned instead.
+
+    Parameters:
+    - content_hash (str): SHA-256 hex digest of the file.
+    - resource_type (str): Storage resource type of the file.
+    - url (str): URL of the stored file.
+    - upload_json (dict): Storage upload response of the file.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
+
+    Returns:
+    - MediaAsset: The asset recorded for this content.
+    """
+    asset = MediaAsset(content_hash=content_hash, resource_type=resource_type, url=url, upload_json=upload_json)
+    db.add(asset)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return await get_media_asset(content_hash, resource_type, db)
+    await db.refresh(asset)
+    return asset
+
+
+async def set_media_asset_qr(asset_id: int, qr: str, db: AsyncSession) -> None:
+    """
+    Asynchronously stores the URL of the QR code of an asset.
+
+    Parameters:
+    - asset_id (int): The ID of the asset.
+    - qr (str): The URL of the QR code.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
+    """
+    await db.execute(update(MediaAsset).where(MediaAsset.id == asset_id).values(qr_code=qr),
+                     execution_options={"synchronize_session": False})
+    await db.commit()
@@ -1,6 +1,7 @@
 from typing import List
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.models import Message
 from src.schemas import MessageResponse
 
@@ -9,7 +10,7 @@ async def create_message(
         sender_id: int,
         receiver_id: int,
         content: str,
-        db: Session
+        db: AsyncSession
 ) -> Message:
     """
     Asynchronously creates a new message in the database.
@@ -22,7 +23,7 @@ async def create_message(
     Parameters:
     - body (MessageModel): A Pydantic model representing the message to be created,
       including the sender_id, receiver_id, and content of the message.
-    - db (Session): The SQLAlchemy session used to interact with the database.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
 
     Returns:
     - Message: The newly created Message object, refreshed from the database.
@@ -31,14 +32,14 @@ async def create_message(
                          receiver_id=receiver_id,
                          content=content)
     db.add(db_message)
-    db.commit()
-    db.refresh(db_message)
+    await db.commit()
+    await db.refresh(db_message)
     return db_message
 
 
 async def get_messages_for_user(
         user_id: int,
-        db: Session
+        db: AsyncSession
 ) -> List[MessageResponse]:
     """
     Asynchronously retrieves all messages sent by or to a specific user from the database.
@@ -49,14 +50,14 @@ async def get_messages_for_user(
 
     Parameters:
     - user_id (int): The ID of the user for whom to retrieve messages.
-    - db (Session): The SQLAlchemy session used to interact with the database.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
 
     Returns:
     - List[MessageResponse]: A list of MessageResponse models representing all messages
       found that were sent by or to the specified user. Each MessageResponse includes
       the message details such as sender_id, receiver_id, content, and timestamp.
     """
-    messages = db.query(Message).filter(
+    messages = await db.scalars(select(Message).where(
         (Message.sender_id == user_id) | (Message.receiver_id == user_id)
-    ).all()
-    return messages
+    ))
+    return messages.all()
@@ -1,14 +1,45 @@
 from typing import Type
-from sqlalchemy.orm import Session
-from src.database.models import Picture, User
+from sqlalchemy import Select, and_, or_, select, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload, with_expression
+from src.database.models import Picture, User, Comment
+from src.repository.reactions import get_reactions_for_comments
+from src.services.cache import picture_detail_cache
+from src.services.pagination import encode_cursor, decode_cursor
 from fastapi import HTTPException
 
+FEED_PAGE_SIZE = 24
+FEED_MAX_PAGE_SIZE = 50
+
+
+def pictures_list_query() -> Select:
+    """
+    Builds the base statement for every picture listing (feed, profile page, API lists).
+
+    The uploader's display columns are joined into the main statement, tags are loaded with
+    one batched `IN` query, ratings are read from the stored aggregates and the comment count
+    is computed by a correlated subquery, so rendering a page costs a fixed number of statements whatever its size.
+
+    Returns:
+    - Select: A statement selecting Picture objects with the listing relationships eagerly loaded.
+    """
+
+    comment_count = (select(func.count(Comment.id))
+                     .where(Comment.picture_id == Picture.id)
+                     .scalar_subquery())
+
+    return select(Picture).options(
+        joinedload(Picture.user).load_only(User.id, User.username, User.avatar),
+        selectinload(Picture.tags),
+        with_expression(Picture.comment_count, comment_count),
+    )
+
 
 async def upload_picture(picture_url: str,
                          picture_json: dict,
                          user: User,
                          qr: str,
-                         db: Session,
+                         db: AsyncSession,
                          description: str = None,
                          media_type: str = 'image',
                          picture_secondary_url: str = None,
@@ -28,7 +59,7 @@ async def upload_picture(picture_url: str,
     - picture_json (dict): A dictionary containing metadata of the picture.
     - user (User): The user object associated with the picture.
     - qr (str): The URL for the QR code of the original picture.
-    - db (Session): The SQLAlchemy session used to interact with the database.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
     - description (str): The description of the picture.
     - media_type (str): The media type of the picture (e.g., 'image', 'video', 'gif', 'reel').
     - picture_secondary_url (str): The URL of the secondary picture for BeReal.
@@ -49,12 +80,29 @@ async def upload_picture(picture_url: str,
         is_bereal=is_bereal
     )
     db.add(picture)
-    db.commit()
-    db.refresh(picture)
+    await db.commit()
+    await db.refresh(picture, ["tags"])
     return picture
 
 
-async def get_all_pictures(skip: int, limit: int, db: Session) -> list[Type[Picture]]:
+async def set_picture_qr(picture_id: int, qr: str, db: AsyncSession) -> None:
+    """
+    Asynchronously stores the URL of a picture's QR code.
+
+    Used when the QR code is generated after the picture was saved.
+
+    Parameters:
+    - picture_id (int): The ID of the picture.
+    - qr (str): The URL of the QR code.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
+    """
+    await db.execute(update(Picture).where(Picture.id == picture_id).values(qr_code_picture=qr),
+                     execution_options={"synchronize_session": False})
+    await db.commit()
+    await picture_detail_cache.delete(picture_id)
+
+
+async def get_all_pictures(skip: int, limit: int, db: AsyncSession) -> list[Type[Picture]]:
     """
     Asynchronously retrieves all pictures from the database.
 
@@ -64,16 +112,72 @@ async def get_all_pictures(skip: int, limit: int, db: Session) -> list[Type[Pict
     Parameters:
     - skip (int): The number of pictures to skip.
     - limit (int): The maximum number of pictures to retrieve.
-    - db (Session): The SQLAlchemy session used to interact with the database.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
 
     Returns:
     - List[Type[Picture]]: A list of Picture objects representing the retrieved pictures.
     """
 
-    return db.query(Picture).offset(skip).limit(limit).all()
+    result = await db.scalars(pictures_list_query().offset(skip).limit(limit))
+    return result.all()
+
+
+async def get_pictures_feed(limit: int, db: AsyncSession, cursor: str | None = None) -> tuple[list[Picture], str | None]:
+    """
+    Asynchronously retrieves one page of the picture feed using keyset pagination.
+
+    Pictures are ordered newest first by `(created_at, id)`, which is backed by the
+    `ix_picture_created_at_id` index, so every page reads a bounded number of rows
+    regardless of how many pictures exist.
+
+    Parameters:
+    - limit (int): The maximum number of pictures to retrieve, capped at FEED_MAX_PAGE_SIZE.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
+    - cursor (str | None): The cursor returned with the previous page, or None for the first page.
+
+    Returns:
+    - tuple[list[Picture], str | None]: The pictures on the page and the cursor of the next page,
+      or None if this is the last page.
+    """
+
+    limit = max(1, min(limit, FEED_MAX_PAGE_SIZE))
+    statement = pictures_list_query()
+
+    if cursor:
+        created_at, picture_id = decode_cursor(cursor)
+        statement = statement.where(or_(Picture.created_at < created_at,
+                                        and_(Picture.created_at == created_at, Picture.id < picture_id)))
+
+    result = await db.scalars(statement.order_by(Picture.created_at.desc(), Picture.id.desc()).limit(limit + 1))
+    pictures = result.all()
+
+    next_cursor = None
+    if len(pictures) > limit:
+        pictures = pictures[:limit]
+        next_cursor = encode_cursor(pictures[-1].created_at, pictures[-1].id)
+
+    return pictures, next_cursor
+
+
+async def get_user_pictures(user_id: int, db: AsyncSession) -> list[Picture]:
+    """
+    Asynchronously retrieves all pictures uploaded by a specific user, newest first.
+
+    Parameters:
+    - user_id (int): The ID of the uploader.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
+
+    Returns:
+    - list[Picture]: The user's pictures of every media type.
+    """
+
+    result = await db.scalars(pictures_list_query()
+                              .where(Picture.user_id == user_id)
+                              .order_by(Picture.created_at.desc(), Picture.id.desc()))
+    return result.all()
 
 
-async def get_one_picture(picture_id: int, db: Session) -> Picture:
+async def get_one_picture(picture_id: int, db: AsyncSession) -> Picture:
     """
     Asynchronously retrieves a specific picture from the database.
 
@@ -81,16 +185,66 @@ async def get_one_picture(picture_id: int, db: Session) -> Picture:
 
     Parameters:
     - picture_id (int): The ID of the picture to retrieve.
-    - db (Session): The SQLAlchemy session used to interact with the database.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
 
     Returns:
     - Picture: The Picture object representing the retrieved picture.
     """
 
-    return db.query(Picture).filter(Picture.id == picture_id).first()
+    return await db.scalar(select(Picture).options(selectinload(Picture.tags)).where(Picture.id == picture_id))
+
+
+async def get_picture_detail(picture_id: int, db: AsyncSession) -> dict | None:
+    """
+    Asynchronously retrieves the view model of the picture detail page.
+
+    The view model holds the picture, its uploader's username, the comments with their reactions
+    and the average rating. It is cached in Redis, and the repositories that change any of it
+    invalidate the entry, so hot pictures are served without querying the database.
+
+    Parameters:
+    - picture_id (int): The ID of the picture.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
+
+    Returns:
+    - dict | None: The view model, or None if the picture does not exist.
+    """
+
+    detail = await picture_detail_cache.get(picture_id)
+    if detail is not None:
+        return detail
+
+    row = (await db.execute(select(Picture, User.username)
+                            .outerjoin(User, Picture.user_id == User.id)
+                            .where(Picture.id == picture_id))).first()
+    if row is None:
+        return None
+    picture, username_uploader = row
+
+    comments = (await db.execute(select(Comment.content, User.username, Comment.id, Comment.user_id)
+                                 .join(User, Comment.user_id == User.id)
+                                 .where(Comment.picture_id == picture_id)
+                                 .order_by(Comment.id.desc()))).all()
+    reactions = await get_reactions_for_comments([comment.id for comment in comments], db)
+
+    detail = {
+        "picture": {
+            "id": picture.id,
+            "user_id": picture.user_id,
+            "picture_url": picture.picture_url,
+            "media_type": picture.media_type,
+            "description": picture.description,
+            "qr_code_picture": picture.qr_code_picture,
+        },
+        "username_uploader": username_uploader,
+        "comments": [{**comment._asdict(), "reactions": reactions[comment.id]} for comment in comments],
+        "average_rating": picture.average_rating or 0,
+    }
+    await picture_detail_cache.set(picture_id, detail)
+    return detail
 
 
-async def update_picture(picture_id: int, url: str, user: User, db: Session, media_type: str = None) -> Picture | None:
+async def update_picture(picture_id: int, url: str, user: User, db: AsyncSession, media_type: str = None) -> Picture | None:
     """
     Asynchronously updates a picture in the database.
 
@@ -101,24 +255,25 @@ async def update_picture(picture_id: int, url: str, user: User, db: Session, med
     - picture_id (int): The ID of the picture to update.
     - url (str): The new URL of the picture.
     - user (User): The user object associated with the picture.
-    - db (Session): The SQLAlchemy session used to interact with the database.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
 
     Returns:
     - Union[Picture, None]: The updated Picture object if successful, otherwise None.
     """
 
-    picture = db.query(Picture).filter(Picture.id == picture_id).first()
+    picture = await db.scalar(select(Picture).where(Picture.id == picture_id))
     if picture:
         picture.user_id = user.id
         picture.picture_url = url
         if media_type:
             picture.media_type = media_type
-        db.commit()
-        db.refresh(picture)
+        await db.commit()
+        await db.refresh(picture, ["tags"])
+        await picture_detail_cache.delete(picture_id)
     return picture
 
 
-async def delete_picture(picture_id: int, db: Session) -> Picture | None:
+async def delete_picture(picture_id: int, db: AsyncSession) -> Picture | None:
     """
     Asynchronously deletes a picture from the database.
 
@@ -126,20 +281,21 @@ async def delete_picture(picture_id: int, db: Session) -> Picture | None:
 
     Parameters:
     - picture_id (int): The ID of the picture to delete.
-    - db (Session): The SQLAlchemy session used to interact with the database.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
 
     Returns:
     - Union[Picture, None]: The deleted Picture object if successful, otherwise None.
     """
 
-    picture = db.query(Picture).filter(Picture.id == picture_id).first()
+    picture = await db.scalar(select(Picture).options(selectinload(Picture.tags)).where(Picture.id == picture_id))
     if picture:
-        db.delete(picture)
-        db.commit()
+        await db.delete(picture)
+        await db.commit()
+        await picture_detail_cache.delete(picture_id)
     return picture
 
 
-async def upload_edited_picture(picture: dict, picture_edited: dict, picture_edited_url: str, qr: str, db: Session) -> Picture | None:
+async def upload_edited_picture(picture: dict, picture_edited: dict, picture_edited_url: str, qr: str, db: AsyncSession) -> Picture | None:
     """
     Uploads the edited picture to the database and returns the edited URL and QR code.
 
@@ -148,7 +304,7 @@ async def upload_edited_picture(picture: dict, picture_edited: dict, picture_edi
     - picture_edited (dict): The edited picture object.
     - picture_edited_url (str): The edited URL of the picture.
     - qr (str): The QR code associated with the edited picture.
-    - db (Session): An SQLAlchemy database session instance provided by the FastAPI dependency injection system.
+    - db (AsyncSession): An SQLAlchemy database session instance provided by the FastAPI dependency injection system.
 
     Returns:
     - dict: A dictionary containing the edited URL and QR code.
@@ -160,7 +316,8 @@ async def upload_edited_picture(picture: dict, picture_edited: dict, picture_edi
     picture.picture_edited_url = picture_edited_url
     picture.picture_edited_json = picture_edited
     picture.qr_code_picture_edited = qr
-    db.commit()
+    await db.commit()
+    await picture_detail_cache.delete(picture.id)
 
     return {
         "picture_edited_url": picture_edited_url,
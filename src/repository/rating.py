@@ -1,103 +1,180 @@
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import Rating, User
+from src.database.models import Rating, User, Picture
+from src.database.upsert import upsert_insert
+from src.services.cache import picture_detail_cache
 
 
-async def add_rating_to_picture(picture_id: int, rating: int, user: User, db: Session):
+async def _update_rating_aggregates(picture_id: int, sum_delta: int, count_delta: int, db: AsyncSession):
+    """
+    Applies an incremental change to the stored rating aggregates of a picture.
+
+    The update is done with a single `UPDATE ... SET col = col + delta` statement, so it is O(1)
+    and safe against concurrent updates of the same picture. The caller commits.
+
+    Parameters:
+        picture_id (int): The ID of the picture whose aggregates are to be updated.
+        sum_delta (int): The change of the sum of rating values.
+        count_delta (int): The change of the number of ratings.
+        db (AsyncSession): Database session object.
+    """
+    await db.execute(
+        update(Picture).where(Picture.id == picture_id).values(
+            rating_sum=Picture.rating_sum + sum_delta,
+            rating_count=Picture.rating_count + count_delta),
+        execution_options={"synchronize_session": False}
+    )
+
+
+async def _lock_picture_ratings(picture_id: int, db: AsyncSession):
+    """
+    Serializes the rating writes of a picture until the transaction ends.
+
+    A no-op `UPDATE` of the picture row takes its row lock on PostgreSQL and the database write lock
+    on SQLite, which ignores `SELECT ... FOR UPDATE` and only starts a transaction on the first
+    write. Statements run after it see the ratings committed before the lock was granted.
+
+    Parameters:
+        picture_id (int): The ID of the picture whose ratings are about to change.
+        db (AsyncSession): Database session object.
+    """
+    await db.execute(
+        update(Picture).where(Picture.id == picture_id).values(rating_count=Picture.rating_count),
+        execution_options={"synchronize_session": False}
+    )
+
+
+async def add_rating_to_picture(picture_id: int, rating: int, user: User, db: AsyncSession):
     """
     Adds or updates a rating for a picture by a specific user.
 
+    The rating is written with a single `INSERT ... ON CONFLICT DO UPDATE` on the unique
+    `(picture_id, user_id)` index, so concurrent requests of the same user cannot create
+    duplicate ratings. The picture row is locked first, so the previous rating read before the
+    upsert is current and the aggregates can be adjusted by the difference.
+
     Parameters:
         picture_id (int): The ID of the picture to rate.
         rating (int): The rating value.
         user (User): The user giving the rating.
-        db (Session): Database session object.
+        db (AsyncSession): Database session object.
 
     Returns:
         dict: A message indicating that the rating was successfully created or updated.
     """
-    rating_record = db.query(Rating).filter(and_(Rating.picture_id == picture_id, Rating.user_id == user.id)).first()
-    if rating_record:
-        rating_record.rat = rating
+    await _lock_picture_ratings(picture_id, db)
+    previous = await db.scalar(select(Rating.rat).where(Rating.picture_id == picture_id,
+                                                        Rating.user_id == user.id))
+
+    insert = upsert_insert(db)
+    statement = insert(Rating).values(picture_id=picture_id, user_id=user.id, rat=rating)
+    await db.execute(statement.on_conflict_do_update(index_elements=[Rating.picture_id, Rating.user_id],
+                                                     set_={"rat": statement.excluded.rat}))
+    if previous is None:
+        await _update_rating_aggregates(picture_id, rating, 1, db)
     else:
-        new_rating = Rating(picture_id=picture_id, rat=rating, user_id=user.id)
-        db.add(new_rating)
-    db.commit()
+        await _update_rating_aggregates(picture_id, rating - previous, 0, db)
+    await db.commit()
+    await picture_detail_cache.delete(picture_id)
     return {"message": "The rating was successfully created or updated."}
 
 
-async def remove_rating_from_picture(picture_id: int, user: User, db: Session):
+async def remove_rating_from_picture(picture_id: int, user: User, db: AsyncSession):
     """
         Removes a rating from a picture by a specific user.
 
         Parameters:
             picture_id (int): The ID of the picture from which to remove the rating.
             user (User): The user whose rating is to be removed.
-            db (Session): Database session object.
+            db (AsyncSession): Database session object.
 
         Returns:
             dict: A message indicating the outcome of the operation.
         """
-    rating_record = db.query(Rating).filter(and_(Rating.picture_id == picture_id, Rating.user_id == user.id)).first()
-    if rating_record:
-        db.delete(rating_record)
-        db.commit()
+    if await remove_rating(picture_id, user.id, db):
         return {"message": "Rating removed successfully."}
     else:
         return {"message": "No rating found for this user and picture."}
 
-async def remove_rating_from_picture_admin(picture_id: int, user_id: int, db: Session):
+async def remove_rating_from_picture_admin(picture_id: int, user_id: int, db: AsyncSession):
     """
         Removes a rating from a picture by a specific user.
 
         Parameters:
             picture_id (int): The ID of the picture from which to remove the rating.
             user_id (User): The user whose rating is to be removed.
-            db (Session): Database session object.
+            db (AsyncSession): Database session object.
 
         Returns:
             dict: A message indicating the outcome of the operation.
         """
-    rating_record = db.query(Rating).filter(and_(Rating.picture_id == picture_id, Rating.user_id == user_id)).first()
-    if rating_record:
-        db.delete(rating_record)
-        db.commit()
+    if await remove_rating(picture_id, user_id, db):
         return {"message": "Rating removed successfully."}
     else:
         return {"message": "No rating found for this user and picture."}
 
 
-async def get_rating(picture_id: int, db: Session):
+async def remove_rating(picture_id: int, user_id: int, db: AsyncSession) -> bool:
+    """
+    Deletes the rating of a user for a picture and subtracts it from the picture's stored rating aggregates.
+
+    The rating is deleted under the picture lock and the aggregates change by the deleted value only, so
+    a concurrent re-rate or a second delete of the same rating cannot skew them.
+
+    Parameters:
+        picture_id (int): The ID of the rated picture.
+        user_id (int): The ID of the user whose rating is deleted.
+        db (AsyncSession): Database session object.
+
+    Returns:
+        bool: True if the rating was deleted, False if the user had not rated the picture.
+    """
+    await _lock_picture_ratings(picture_id, db)
+    deleted = (await db.execute(delete(Rating)
+                                .where(and_(Rating.picture_id == picture_id, Rating.user_id == user_id))
+                                .returning(Rating.rat),
+                                execution_options={"synchronize_session": False})).first()
+    if deleted is not None and deleted.rat is not None:
+        await _update_rating_aggregates(picture_id, -deleted.rat, -1, db)
+    await db.commit()
+    if deleted is None:
+        return False
+    await picture_detail_cache.delete(picture_id)
+    return True
+
+
+async def get_rating(picture_id: int, db: AsyncSession):
     """
     Retrieves all ratings for a specific picture.
 
     Parameters:
         picture_id (int): The ID of the picture whose ratings are to be retrieved.
-        db (Session): Database session object.
+        db (AsyncSession): Database session object.
 
     Returns:
         dict: A dictionary containing usernames as keys and their respective ratings as values.
     """
-    ratings = db.query(Rating).filter(Rating.picture_id == picture_id).all()
+    ratings = (await db.scalars(select(Rating).where(Rating.picture_id == picture_id))).all()
     ratings_dict = {rating.user_id: rating.rat for rating in ratings}
     return ratings_dict
 
 
-async def get_average_of_rating(picture_id: int, db: Session):
+async def get_average_of_rating(picture_id: int, db: AsyncSession):
     """
     Calculates the average rating for a specific picture.
 
     Parameters:
         picture_id (int): The ID of the picture whose average rating is to be calculated.
-        db (Session): Database session object.
+        db (AsyncSession): Database session object.
 
     Returns:
         dict: A message containing the average rating if available, otherwise indicating no ratings.
     """
-    ratings = db.query(Rating).filter(Rating.picture_id == picture_id).all()
-    if ratings:
-        average = sum(rating.rat for rating in ratings) / len(ratings)
+    result = await db.execute(select(Picture.rating_sum, Picture.rating_count).where(Picture.id == picture_id))
+    aggregates = result.first()
+    if aggregates and aggregates.rating_count:
+        average = aggregates.rating_sum / aggregates.rating_count
         return {"average_rating": average}
     else:
         return {"message": "No ratings available for this picture."}
\ No newline at end of file
@@ -1,11 +1,86 @@
-from collections import Counter, OrderedDict
+from collections import OrderedDict
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import Reaction, User
+from src.database.models import Comment, CommentReaction, CommentReactionCount, User
+from src.database.upsert import upsert_insert
+from src.schemas import ReactionName
+from src.services.cache import RedisCache, REACTION_COUNTS_CACHE_TTL, picture_detail_cache
 
+# Reaction counts by comment id, invalidated whenever a reaction to the comment changes.
+counts_cache = RedisCache("reaction_counts", ttl=REACTION_COUNTS_CACHE_TTL)
 
-async def add_reaction_to_comment(comment_id: int, reaction: str, user: User, db: Session):
+
+async def _change_reaction_count(comment_id: int, kind: str, delta: int, db: AsyncSession):
+    """
+    Applies an incremental change to the number of reactions of one kind to a comment.
+
+    Done with a single upsert of `count = count + delta`, so concurrent reactions from different
+    users are all counted. The caller commits.
+
+    Parameters:
+        comment_id (int): The id of the comment.
+        kind (str): The reaction whose count changes.
+        delta (int): The change of the count.
+        db (AsyncSession): Database session object.
+    """
+    insert = upsert_insert(db)
+    statement = insert(CommentReactionCount).values(comment_id=comment_id, kind=kind, count=delta)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[CommentReactionCount.comment_id, CommentReactionCount.kind],
+        set_={"count": CommentReactionCount.count + delta}))
+
+
+async def _lock_comment_reactions(comment_id: int, db: AsyncSession):
+    """
+    Serializes the reaction writes to a comment until the transaction ends.
+
+    A no-op `UPDATE` of the comment row takes its row lock on PostgreSQL and the database write lock
+    on SQLite, which ignores `SELECT ... FOR UPDATE`. Setting `updated_at` to itself keeps its
+    `onupdate` from firing. Statements run after it see the reactions committed before the lock was
+    granted, so the previous reaction of a user read under it is the one the counters include.
+
+    Parameters:
+        comment_id (int): The id of the comment.
+        db (AsyncSession): Database session object.
+    """
+    await db.execute(update(Comment).where(Comment.id == comment_id).values(updated_at=Comment.updated_at),
+                     execution_options={"synchronize_session": False})
+
+
+async def _delete_user_reaction(comment_id: int, user_id: int, db: AsyncSession) -> str | None:
+    """
+    Deletes the reaction of a user to a comment and uncounts it, under the comment lock. The caller commits.
+
+    Parameters:
+        comment_id (int): The id of the comment.
+        user_id (int): The id of the user.
+        db (AsyncSession): Database session object.
+
+    Returns:
+        str | None: The deleted reaction, or None if the user had not reacted to the comment.
+    """
+    await _lock_comment_reactions(comment_id, db)
+    kind = await db.scalar(delete(CommentReaction)
+                           .where(and_(CommentReaction.comment_id == comment_id, CommentReaction.user_id == user_id))
+                           .returning(CommentReaction.kind))
+    if kind is not None:
+        await _change_reaction_count(comment_id, kind, -1, db)
+    return kind
+
+
+async def _invalidate_comment(comment_id: int, db: AsyncSession):
+    """
+    Drops the cached counts of a comment and the cached page of its picture after a reaction changed.
+    """
+    await counts_cache.delete(comment_id)
+    picture_id = await db.scalar(select(Comment.picture_id).where(Comment.id == comment_id))
+    if picture_id is not None:
+        await picture_detail_cache.delete(picture_id)
+
+
+async def add_reaction_to_comment(comment_id: int, reaction: str, user: User, db: AsyncSession):
     """
     The add_reaction_to_comment function adds or updates a reaction to a comment.
         Parameters:
@@ -14,113 +89,135 @@ async def add_reaction_to_comment(comment_id: int, reaction: str, user: User, db
                             "wow" or "dislike".
             user (User): A User object representing the user who is adding the reaction. This should be obtained
                             from get_current_user().
-            db: Session: Access the database
+            db: AsyncSession: Access the database
         Returns:
             Information: "The reaction was added"
     """
-    reaction_record = db.query(Reaction).filter(Reaction.comment_id == comment_id).first()
-    if not reaction_record:
-        new_reaction = Reaction(comment_id=comment_id, data={reaction: [user.id]})
-        db.add(new_reaction)
-    else:
-        await update_reaction_to_comment(comment_id, reaction, user, db)
-    db.commit()
+    await update_reaction_to_comment(comment_id, reaction, user, db)
+    await db.commit()
+    await _invalidate_comment(comment_id, db)
     return {"message": "The reaction was added"}
 
 
-async def update_reaction_to_comment(comment_id: int, reaction: str, user: User, db: Session):
+async def update_reaction_to_comment(comment_id: int, reaction: str, user: User, db: AsyncSession):
     """
     The update_reaction_to_comment function updates reaction which was added to comment by user.
     Parameters:
         comment_id (int): Identify the comment that is being reacted to
         reaction (str): Determine which reaction to add
         user (User): Get the user id of the person who reacted to a comment
-        db (Session): Pass the database session to the function
-    Returns:
-        The updated reaction_data.
+        db (AsyncSession): Pass the database session to the function
+    The previous reaction of the user, if any, is replaced with an upsert and uncounted, under the comment
+    lock, so concurrent requests of the same user neither collide on the primary key nor miscount. The
+    caller commits.
     """
-    reaction_record = db.query(Reaction).filter(Reaction.comment_id == comment_id).first()
-    reaction_data = reaction_record.data
-    reaction_data_copy = reaction_data.copy()
-    for react, users in reaction_data_copy.items():
-        if user.id in users:
-            users.remove(user.id)
-        if not users:
-            del reaction_data[react]
-    if reaction not in reaction_data:
-        reaction_data[reaction] = [user.id]
-    else:
-        reaction_data[reaction].append(user.id)
-    db.query(Reaction).filter(Reaction.comment_id == comment_id).update({"data": reaction_data})
+    kind = ReactionName(reaction).value
+    await _lock_comment_reactions(comment_id, db)
+    previous = await db.scalar(select(CommentReaction.kind)
+                               .where(and_(CommentReaction.comment_id == comment_id,
+                                           CommentReaction.user_id == user.id)))
+    if previous == kind:
+        return
+
+    insert = upsert_insert(db)
+    statement = insert(CommentReaction).values(comment_id=comment_id, user_id=user.id, kind=kind)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[CommentReaction.comment_id, CommentReaction.user_id],
+        set_={"kind": statement.excluded.kind}))
+    if previous is not None:
+        await _change_reaction_count(comment_id, previous, -1, db)
+    await _change_reaction_count(comment_id, kind, 1, db)
 
 
-async def remove_reaction_from_comment(comment_id: int, user: User, db: Session):
+async def remove_reaction_from_comment(comment_id: int, user: User, db: AsyncSession):
     """
     The remove_reaction_from_comment function removes a reaction from a comment.
     Parameters:
     comment_id (int): Identify the comment that is being reacted to
     user (User): Get the user id of the user who is reacting to a comment
-    db (Session): Create a database session
+    db (AsyncSession): Create a database session
     Returns:
         A message if the comment has no reaction, else it removes the user's reaction from that comment
     """
-    reaction_record = db.query(Reaction).filter(Reaction.comment_id == comment_id).first()
-    if not reaction_record:
+    kind = await _delete_user_reaction(comment_id, user.id, db)
+    if kind is None:
         return {"message": "No reaction for comment"}
-    else:
-        reaction_data = reaction_record.data
-        reaction_data_copy = reaction_data.copy()
-        for react, users in reaction_data_copy.items():
-            if user.id in users:
-                users.remove(user.id)
-            if not users:
-                del reaction_data[react]
-            if reaction_data:
-                db.query(Reaction).filter(Reaction.comment_id == comment_id).update({"data": reaction_data})
-            else:
-                db.delete(reaction_record)
-        db.commit()
-        return {"message": "Reaction was deleted"}
-
-
-async def get_reactions(comment_id: int, db: Session):
+    await db.commit()
+    await _invalidate_comment(comment_id, db)
+    return {"message": "Reaction was deleted"}
+
+
+async def get_reactions_for_comments(comment_ids: list[int], db: AsyncSession) -> dict[int, dict[str, str]]:
+    """
+    The get_reactions_for_comments function returns users and their reactions for many comments at once.
+    The usernames of all reactors are resolved in the same query, so the number of queries does not grow
+    with the number of comments or reactions.
+    Parameters:
+        comment_ids (list[int]): The ids of the comments you want to get reactions for
+        db (AsyncSession): Access the database
+    Returns:
+        A dictionary mapping every requested comment id to a dictionary of the users and their reactions.
+    """
+    reactions = {comment_id: {} for comment_id in comment_ids}
+    if not reactions:
+        return reactions
+    result = await db.execute(select(CommentReaction.comment_id, User.username, CommentReaction.kind)
+                              .join(User, CommentReaction.user_id == User.id)
+                              .where(CommentReaction.comment_id.in_(reactions)))
+    for comment_id, username, kind in result.all():
+        reactions[comment_id][username] = kind
+    return reactions
+
+
+async def get_reactions(comment_id: int, db: AsyncSession):
     """
     The get_reactions function takes in a comment_id and returns users and their reactions for that comment.
     Parameters:
         comment_id (int): Specify the comment id of the comment you want to get reactions for
-        db (Session): Access the database
+        db (AsyncSession): Access the database
     Returns:
         A dictionary of the users and their reactions for the comment.
     """
-    reaction_record = db.query(Reaction).filter(Reaction.comment_id == comment_id).first()
-    if not reaction_record:
-        return {}
-    reaction_data = reaction_record.data
-    reactions = {}
-    for react, users in reaction_data.items():
-        for user_id in users:
-            user = db.query(User).filter(User.id == user_id).first()
-            if not user:
-                continue
-            reactions[user.username] = react
-    return reactions
+    reactions = await get_reactions_for_comments([comment_id], db)
+    return reactions[comment_id]
 
 
-async def get_number_of_reactions(comment_id: int, db: Session):
+async def get_reaction_counts(comment_ids: list[int], db: AsyncSession) -> dict[int, dict[str, int]]:
+    """
+    The get_reaction_counts function returns the numbers of reactions for many comments at once.
+    Counts are served from the cache; the comments that are not cached are read from the per-kind counters
+    in one query and cached.
+    Parameters:
+        comment_ids (list[int]): The ids of the comments you want to get numbers of reactions for
+        db (AsyncSession): Pass the database session to the function
+    Returns:
+        A dictionary mapping every requested comment id to its reactions and their numbers, most common first.
+    """
+    counts = await counts_cache.get_many(comment_ids)
+    missing = [comment_id for comment_id in dict.fromkeys(comment_ids) if comment_id not in counts]
+    if missing:
+        fresh = {comment_id: {} for comment_id in missing}
+        result = await db.execute(select(CommentReactionCount.comment_id, CommentReactionCount.kind,
+                                         CommentReactionCount.count)
+                                  .where(CommentReactionCount.comment_id.in_(missing), CommentReactionCount.count > 0)
+                                  .order_by(CommentReactionCount.count.desc(), CommentReactionCount.kind))
+        for comment_id, kind, count in result.all():
+            fresh[comment_id][kind] = count
+        await counts_cache.set_many(fresh)
+        counts.update(fresh)
+    return {comment_id: counts[comment_id] for comment_id in comment_ids}
+
+
+async def get_number_of_reactions(comment_id: int, db: AsyncSession):
     """
     The get_number_of_reactions function takes in a comment_id and returns the numbers of reactions for that comment.
     Parameters:
         comment_id (int): Specify the comment id of the comment you want to get numbers of reactions for
-        db: (Session): Pass the database session to the function
+        db: (AsyncSession): Pass the database session to the function
     Returns:
         A dictionary of reactions with the number of users who have reacted to a comment
     """
-    reaction_record = db.query(Reaction).filter(Reaction.comment_id == comment_id).first()
-    if not reaction_record:
+    counts = (await get_reaction_counts([comment_id], db))[comment_id]
+    if not counts:
         return {"message": "No reaction for comment"}
-    reaction_data = reaction_record.data
-    number_of_reactions = Counter()
-    for react, users in reaction_data.items():
-        number_of_reactions[react] = len(users)
-    return OrderedDict(number_of_reactions.most_common())
-
+    return OrderedDict(counts)
@@ -1,17 +1,24 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, Depends
 from typing import List, Optional
 from sqlalchemy import or_
 
-from src.database.models import Picture, Tag, PictureTagsAssociation
+from src.database import fulltext
+from src.database.models import Picture, Tag
 from src.database.db import get_db
+from src.repository.pictures import pictures_list_query
 from src.schemas import PictureResponse
 
+SEARCH_MAX_LIMIT = 100
+
 
 async def search_pictures(keyword: Optional[str] = None,
                           sort_by: Optional[str] = "created_at",
                           sort_order: Optional[str] = "desc",
-                          db: Session = Depends(get_db)
+                          min_rating: Optional[float] = None,
+                          skip: int = 0,
+                          limit: int = 20,
+                          db: AsyncSession = Depends(get_db)
                           ) -> List[PictureResponse]:
     """
     Searches for pictures based on keywords, sort criteria, and order. It allows for filtering pictures
@@ -22,61 +29,72 @@ async def search_pictures(keyword: Optional[str] = None,
     - `keyword` (Optional[str]): The keyword to search for within picture tags and descriptions.
                                  If None, the function will return all pictures.
     - `sort_by` (Optional[str]): The field by which the results should be sorted. Defaults to "created_at".
-                                 Allowed values are "rating" and "created_at".
+                                 Allowed values are "relevance", "rating" and "created_at". Without a keyword,
+                                 "relevance" falls back to "created_at".
     - `sort_order` (Optional[str]): The order in which the results should be sorted. Defaults to "desc" (descending).
                                     Allowed values are "asc" (ascending) and "desc" (descending).
-    - `db` (Session): The database session.
+    - `min_rating` (Optional[float]): If given, only pictures with an average rating of at least this value are returned.
+    - `skip` (int): The number of matching pictures to skip.
+    - `limit` (int): The maximum number of pictures to return, capped at SEARCH_MAX_LIMIT.
+    - `db` (AsyncSession): The database session.
 
     Returns:
     - List[PictureResponse]: A list of `PictureResponse` objects, each representing a picture that matches the search criteria.
                              Each `PictureResponse` includes picture ID, description, picture URL, average rating, creation date,
-                             user ID, associated tags IDs, and a QR code picture URL.
+                             associated tags, and a QR code picture URL.
 
     Raises:
     - HTTPException: If no pictures are found that match the search criteria, a 404 error is raised with the detail "Picture not found".
 
-    The function first filters tags by the keyword and then finds pictures associated with these tags. It also searches
-    within picture descriptions for the keyword. The resulting list of pictures is then sorted based on the specified
-    `sort_by` and `sort_order` parameters. If no keyword is provided, all pictures are considered in the search. The
-    function ensures that the sorting parameters are valid and defaults them if necessary.
+    The keyword is looked up in the full-text index of descriptions and tag names, matching every word
+    as a prefix and ranking tag matches above description matches. On databases without a full-text
+    backend, it falls back to a substring match. Filtering, ordering and LIMIT/OFFSET all run in the
+    database: the average rating is derived from the stored `rating_sum`/`rating_count` columns, so
+    sorting by rating never loads individual ratings. Unrated pictures are ordered last, and ties are broken by picture ID so that pages are stable. The function
+    ensures that the sorting parameters are valid and defaults them if necessary.
     """
 
-    if sort_by not in ["rating", "created_at"]:
+    if sort_by not in ["relevance", "rating", "created_at"]:
         sort_by = "created_at"
 
     if sort_order not in ["asc", "desc"]:
         sort_order = "desc"
 
-    tags_ids = [tag.id for tag in db.query(Tag).filter(Tag.name.like(f"%{keyword}%")).all()]
-
-    pictures_ids = [pic_id for (pic_id,) in db.query(PictureTagsAssociation.picture_id).filter(
-        PictureTagsAssociation.tag_id.in_(tags_ids)).all()]
-
-    pictures = db.query(Picture).filter(
-        or_(
-            Picture.description.like(f"%{keyword}%"),
-            Picture.id.in_(pictures_ids)
-        )
-    ).all()
+    statement = pictures_list_query()
+    match = None
+
+    if keyword:
+        dialect_name = db.get_bind().dialect.name
+        if fulltext.is_supported(dialect_name):
+            match = fulltext.match_pictures(keyword, dialect_name)
+            if match is None:
+                raise HTTPException(status_code=404, detail="Picture not found")
+            statement = statement.join(match, match.c.picture_id == Picture.id)
+        else:
+            statement = statement.where(
+                or_(
+                    Picture.description.like(f"%{keyword}%"),
+                    Picture.tags.any(Tag.name.like(f"%{keyword}%"))
+                )
+            )
+
+    if min_rating is not None:
+        statement = statement.where(Picture.average_rating >= min_rating)
+
+    if sort_by == "relevance" and match is not None:
+        sort_column = match.c.rank
+    elif sort_by == "rating":
+        sort_column = Picture.average_rating
+    else:
+        sort_column = Picture.created_at
+    sort_column = sort_column.desc() if sort_order == "desc" else sort_column.asc()
+    tie_breaker = Picture.id.desc() if sort_order == "desc" else Picture.id.asc()
+
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    result = await db.scalars(statement.order_by(sort_column.nulls_last(), tie_breaker).offset(skip).limit(limit))
+    pictures = result.all()
 
     if not pictures:
         raise HTTPException(status_code=404, detail="Picture not found")
 
-    pictures = sorted(pictures, key=lambda x: getattr(x, sort_by), reverse=(sort_order == "desc"))
-
-    picture_responses = []
-    for picture in pictures:
-        tag_ids = [tag.id for tag in picture.tags]
-        picture_response = PictureResponse(
-            id=picture.id,
-            description=picture.description,
-            picture_url=picture.picture_url,
-            average_rating=picture.average_rating,
-            created_at=picture.created_at,
-            user_id=picture.user_id,
-            tags=tag_ids,
-            qr_code_picture=picture.qr_code_picture
-        )
-        picture_responses.append(picture_response)
-
-    return picture_responses
+    return [PictureResponse.model_validate(picture) for picture in pictures]
@@ -1,48 +1,126 @@
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from src.database.models import Story, User
+from src.services.cache import RedisTimeline, STORY_CACHE_TTL
 
-async def create_story(image_url: str, user: User, db: Session, media_type: str = 'image', description: str = None) -> Story:
+STORY_LIFETIME = timedelta(hours=24)
+
+# Entries of the stories posted in the last `STORY_LIFETIME`, kept up to date by the functions below.
+active_stories_cache = RedisTimeline("active_stories", window=STORY_LIFETIME.total_seconds(), ttl=STORY_CACHE_TTL)
+
+story_user_options = joinedload(Story.user).load_only(User.id, User.username, User.avatar)
+
+
+def story_entry(story: Story, user: User) -> dict:
+    """
+    Builds the cached view of a story, with the author fields the stories bar shows.
+    """
+    return {
+        "id": story.id,
+        "image_url": story.image_url,
+        "media_type": story.media_type,
+        "description": story.description,
+        "created_at": story.created_at.isoformat(),
+        "user_id": story.user_id,
+        "user": {"id": user.id, "username": user.username, "avatar": user.avatar},
+    }
+
+async def create_story(image_url: str, user: User, db: AsyncSession, media_type: str = 'image', description: str = None) -> Story:
     """
     Creates a new story for the user.
     """
     story = Story(image_url=image_url, user_id=user.id, media_type=media_type, description=description)
     db.add(story)
-    db.commit()
-    db.refresh(story)
+    await db.commit()
+    await db.refresh(story)
+    await active_stories_cache.add(story.id, story.created_at.timestamp(), story_entry(story, user))
     return story
 
-async def get_one_story(story_id: int, db: Session) -> Story:
+async def get_one_story(story_id: int, db: AsyncSession) -> Story:
     """
     Retrieves a story with the specified ID from the database.
     """
-    return db.query(Story).filter(Story.id == story_id).first()
+    return await db.scalar(select(Story).where(Story.id == story_id))
 
-async def update_story(story_id: int, media_type: str, description: str, db: Session) -> Story | None:
+async def update_story(story_id: int, media_type: str, description: str, db: AsyncSession) -> Story | None:
     """
     Updates a story's media type and description.
     """
-    story = db.query(Story).filter(Story.id == story_id).first()
+    story = await db.scalar(select(Story).options(story_user_options).where(Story.id == story_id))
     if story:
         story.media_type = media_type
         story.description = description
-        db.commit()
-        db.refresh(story)
+        await db.commit()
+        await db.refresh(story)
+        await active_stories_cache.add(story.id, story.created_at.timestamp(), story_entry(story, story.user))
     return story
 
-async def delete_story(story_id: int, db: Session) -> Story | None:
+async def delete_story(story_id: int, db: AsyncSession) -> Story | None:
     """
     Deletes a story.
     """
-    story = db.query(Story).filter(Story.id == story_id).first()
+    story = await db.scalar(select(Story).where(Story.id == story_id))
     if story:
-        db.delete(story)
-        db.commit()
+        await db.delete(story)
+        await db.commit()
+        await active_stories_cache.remove(story.id)
     return story
 
-async def get_active_stories(db: Session):
+async def get_active_stories(db: AsyncSession) -> list[dict]:
+    """
+    Retrieves all stories posted in the last 24 hours, newest first.
+
+    The stories are served from `active_stories_cache`; the database is only read to load it, so
+    `db` must be a session of the primary: a lagging replica would drop recent stories until the
+    next reload.
+
+    A story committed after the read below but before the load replaces the timeline is dropped
+    from it until the next reload, at most `STORY_CACHE_TTL` seconds later; the window is the
+    time of one query, and the story stays readable from the database meanwhile.
+    """
+    stories = await active_stories_cache.recent()
+    if stories is not None:
+        return stories
+
+    day_ago = datetime.now() - STORY_LIFETIME
+    result = await db.scalars(select(Story)
+                              .options(story_user_options)
+                              .where(Story.created_at >= day_ago)
+                              .order_by(Story.created_at.desc()))
+    stories = result.all()
+    entries = [story_entry(story, story.user) for story in stories]
+    await active_stories_cache.load((story.id, story.created_at.timestamp(), entry)
+                                    for story, entry in zip(stories, entries))
+    return entries
+
+async def delete_expired_stories(before: datetime, limit: int, db: AsyncSession) -> list[tuple[str, str]]:
+    """
+    Deletes up to `limit` of the stories posted before `before`, oldest first, and commits.
+
+    Returns the image URL and media type of each deleted story, so their media can be deleted.
+    """
+    expired = select(Story.id).where(Story.created_at < before).order_by(Story.created_at).limit(limit)
+    result = await db.execute(delete(Story)
+                              .where(Story.id.in_(expired))
+                              .returning(Story.image_url, Story.media_type))
+    deleted = [tuple(row) for row in result.all()]
+    await db.commit()
+    return deleted
+
+def group_stories_by_user(stories: list[dict]) -> list[dict]:
+    """
+    Groups active stories by author for the stories bar, the most recent author first.
+    """
+    groups = {}
+    for story in stories:
+        groups.setdefault(story["user_id"], {"user": story["user"], "stories": []})["stories"].append(story)
+    return list(groups.values())
+
+async def get_user_stories(user_id: int, db: AsyncSession):
     """
-    Retrieves all stories posted in the last 24 hours.
+    Retrieves all stories posted by the user, newest first.
     """
-    day_ago = datetime.now() - timedelta(hours=24)
-    return db.query(Story).filter(Story.created_at >= day_ago).all()
+    result = await db.scalars(select(Story).where(Story.user_id == user_id).order_by(Story.created_at.desc()))
+    return result.all()
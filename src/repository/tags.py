@@ -1,9 +1,10 @@
 from typing import List
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.models import Tag, PictureTagsAssociation
 from src.schemas import TagModel, TagsResponseModel
 
-async def add_tags_to_db(picture_id: int, tags: List[str], db: Session) -> TagsResponseModel:
+async def add_tags_to_db(picture_id: int, tags: List[str], db: AsyncSession) -> TagsResponseModel:
     """
     Add new tags to the database.
 
@@ -14,7 +15,7 @@ async def add_tags_to_db(picture_id: int, tags: List[str], db: Session) -> TagsR
     - picture_id (int): The ID of the picture to which the tags will be associated.
     - tags (Union[List[str], str]): A list of tag names to be added to the database. If a single tag
       is provided as a string, it will be converted to a list internally.
-    - db (Session): The SQLAlchemy session used to interact with the database.
+    - db (AsyncSession): The SQLAlchemy session used to interact with the database.
 
     Returns:
     - TagsResponseModel: A response model containing two lists of TagModel instances,
@@ -36,32 +37,32 @@ async def add_tags_to_db(picture_id: int, tags: List[str], db: Session) -> TagsR
         raise TypeError("Picture_ID must be provided as an integer.")
 
 
-    existing_tags = db.query(Tag).filter(Tag.name.in_(tags)).all()
+    existing_tags = (await db.scalars(select(Tag).where(Tag.name.in_(tags)))).all()
     tag_name_to_id = {tag.name: tag.id for tag in existing_tags}
 
     new_tags = [Tag(name=tag_name) for tag_name in tags if tag_name not in tag_name_to_id]
     db.add_all(new_tags)
-    db.commit()
+    await db.commit()
 
     for tag in new_tags:
-        db.refresh(tag)
+        await db.refresh(tag)
 
-    all_tags = existing_tags + new_tags
+    all_tags = [*existing_tags, *new_tags]
 
-    existing_associations = db.query(PictureTagsAssociation).filter(
+    existing_associations = (await db.scalars(select(PictureTagsAssociation).where(
         PictureTagsAssociation.picture_id == picture_id
-    ).all()
+    ))).all()
 
     for association in existing_associations:
-        db.delete(association)
-    db.commit()
+        await db.delete(association)
+    await db.commit()
 
     associations_to_add = [
         PictureTagsAssociation(picture_id=picture_id, tag_id=tag.id)
         for tag in all_tags
     ]
     db.add_all(associations_to_add)
-    db.commit()
+    await db.commit()
 
     return TagsResponseModel(new_tags=[TagModel(id=tag.id, name=tag.name) for tag in new_tags],
                              existing_tags=[TagModel(id=tag.id, name=tag.name) for tag in existing_tags])
@@ -1,46 +1,47 @@
 from typing import Type, List
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
 from src.schemas import UserModel, UserDb
 from src.services.auth import auth_service
 
 
-async def get_user_by_email(email: str, db: Session) -> Type[User]:
+async def get_user_by_email(email: str, db: AsyncSession) -> Type[User]:
     """
     Get a user by their email address.
 
     Args:
         email (str): Email address of the user.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         Type[User]: The user object or None if not found.
     """
-    return db.query(User).filter(User.email == email).first()
+    return await db.scalar(select(User).where(User.email == email))
 
 
-async def create_user(body: UserModel, db: Session) -> User:
+async def create_user(body: UserModel, db: AsyncSession) -> User:
     """
     Create a new user.
 
     Args:
         body (UserModel): Data for the new user.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         User: The created user.
     """
     new_user = User(**body.dict())
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
 async def get_user_by_id(user_id: int,
-                         db: Session
+                         db: AsyncSession
                          ) -> UserDb:
 
     """
@@ -52,7 +53,7 @@ async def get_user_by_id(user_id: int,
 
     Args:
         user_id (int): The unique identifier of the user to retrieve.
-        db (Session): The database session used to execute the query.
+        db (AsyncSession): The database session used to execute the query.
 
     Returns:
         UserDb: A Pydantic model representing the retrieved user's data.
@@ -60,13 +61,13 @@ async def get_user_by_id(user_id: int,
     Raises:
         HTTPException: A 400 error if the user with the specified ID does not exist.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=400, detail="User not found")
     return UserDb.from_orm(user)
 
 
-async def list_all_users(db: Session) -> List[User]:
+async def list_all_users(db: AsyncSession) -> List[User]:
     """
     Asynchronously retrieves a list of all users from the database.
 
@@ -74,19 +75,19 @@ async def list_all_users(db: Session) -> List[User]:
     instances representing all users in the database.
 
     Args:
-        db (Session): The database session used to execute the query.
+        db (AsyncSession): The database session used to execute the query.
 
     Returns:
         List[User]: A list of all user instances in the database.
 
     """
-    users = db.query(User).all()
+    users = (await db.scalars(select(User))).all()
     return users
 
 
 async def update_user_name(user_id: int,
                            new_name: str,
-                           db: Session
+                           db: AsyncSession
                            ) -> UserDb:
     """
     Asynchronously updates the name of a specific user identified by their user ID.
@@ -98,7 +99,7 @@ async def update_user_name(user_id: int,
     Args:
         user_id (int): The unique identifier of the user whose name is to be updated.
         new_name (str): The new name to assign to the user.
-        db (Session): The database session used to execute the update operation.
+        db (AsyncSession): The database session used to execute the update operation.
 
     Returns:
         UserDb: A Pydantic model representing the updated user's data.
@@ -106,16 +107,17 @@ async def update_user_name(user_id: int,
     Raises:
         HTTPException: A 404 error if no user with the specified ID exists.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.username = new_name
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await auth_service.invalidate_user(user.email)
+    await db.refresh(user)
     return UserDb.from_orm(user)
 
 
-async def ban_user(user_id: int, db: Session, current_user: User) -> None:
+async def ban_user(user_id: int, db: AsyncSession, current_user: User) -> None:
     """
     Ban a specific user identified by their user ID.
 
@@ -125,7 +127,7 @@ async def ban_user(user_id: int, db: Session, current_user: User) -> None:
 
     Args:
         user_id (int): The unique identifier of the user to ban.
-        db (Session): The database session used to execute the ban operation.
+        db (AsyncSession): The database session used to execute the ban operation.
         current_user (User): The current authenticated user.
 
     Returns:
@@ -135,7 +137,7 @@ async def ban_user(user_id: int, db: Session, current_user: User) -> None:
         HTTPException: A 404 error if no user with the specified ID exists.
                       A 403 error if the current user is not authorized to ban the account.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -143,67 +145,71 @@ async def ban_user(user_id: int, db: Session, current_user: User) -> None:
         raise HTTPException(status_code=403, detail="You are not authorized to ban accounts.")
 
     user.ban_status = True
-    db.commit()
+    await db.commit()
+    await auth_service.invalidate_user(user.email)
 
 
-async def update_token(user: User, token: str | None, db: Session) -> None:
+async def update_token(user: User, token: str | None, db: AsyncSession) -> None:
     """
     Update the refresh token for a user.
 
     Args:
         user (User): The user for whom to update the token.
         token (str | None): The new refresh token or None to clear the existing token.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
     """
     user.refresh_token = token
-    db.commit()
+    await db.commit()
 
 
-async def confirmed_email(email: str, db: Session) -> None:
+async def confirmed_email(email: str, db: AsyncSession) -> None:
     """
     Confirm the email address for a user.
 
     Args:
         email (str): Email address to confirm.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
     """
     user = await get_user_by_email(email, db)
     user.confirmed = True
-    db.commit()
+    await db.commit()
+    await auth_service.invalidate_user(email)
 
 
-async def update_avatar(email, url: str, db: Session) -> User:
+async def update_avatar(email, url: str, db: AsyncSession) -> User:
     """
     Update the avatar for a user.
 
     Args:
         email (str): Email address of the user.
         url (str): New avatar URL.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         User: The updated user object.
     """
     user = await get_user_by_email(email, db)
     user.avatar = url
-    db.commit()
+    await db.commit()
+    await auth_service.invalidate_user(email)
     return user
 
 
-async def upgrade_password(user: UserModel, new_password: str, db: Session):
+async def upgrade_password(user: UserModel, new_password: str, db: AsyncSession):
     """
     Upgrade the password for a user.
 
     Args:
         user (UserModel): The user for whom to upgrade the password.
         new_password (str): The new password.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
     """
-    user.password = auth_service.get_password_hash(new_password)
-    db.commit()
+    user.password = await auth_service.get_password_hash(new_password)
+    await db.commit()
+    await auth_service.invalidate_user(user.email)
 
 
-async def get_user_by_username(username: str, db: Session):
+async def get_user_by_username(username: str, db: AsyncSession):
     """
     Asynchronously retrieves a user by their username from the database.
 
@@ -213,7 +219,7 @@ async def get_user_by_username(username: str, db: Session):
 
     Args:
         username (str): The unique username of the user to retrieve.
-        db (Session): The database session used to execute the query.
+        db (AsyncSession): The database session used to execute the query.
 
     Returns:
         UserDb: A Pydantic model representing the retrieved user's data.
@@ -222,7 +228,7 @@ async def get_user_by_username(username: str, db: Session):
 +        HTTPException: A 404 error if the user with the specified username does not exist.
 -        HTTPException: A 400 error if the user with the specified username does not exist.
     """
-    user = db.query(User).filter(User.username == username).first()
+    user = await db.scalar(select(User).where(User.username == username))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return UserDb.from_orm(user)
@@ -3,7 +3,7 @@ from fastapi.security import OAuth2PasswordRequestForm, HTTPAuthorizationCredent
 from fastapi.responses import JSONResponse, HTMLResponse
 from fastapi.templating import Jinja2Templates
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
 from src.services.email import send_verification_email, send_reset_email
@@ -20,7 +20,7 @@ templates = Jinja2Templates(directory="templates")
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def signup(body: UserModel,
                  background_tasks: BackgroundTasks,
-                 request: Request, db: Session = Depends(get_db)) -> JSONResponse | dict:
+                 request: Request, db: AsyncSession = Depends(get_db)) -> JSONResponse | dict:
     """
     Sign up a new user.
 
@@ -28,7 +28,7 @@ async def signup(body: UserModel,
         body (UserModel): Data for the new user.
         background_tasks (BackgroundTasks): Background tasks to execute.
         request (Request): The incoming request.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         dict: Response containing the new user and a confirmation message.
@@ -38,7 +38,7 @@ async def signup(body: UserModel,
     if exist_user:
         return JSONResponse(status_code=409, content={"detail": "Account already exists."})
 
-    body.password = auth_service.get_password_hash(body.password)
+    body.password = await auth_service.get_password_hash(body.password)
     new_user = await repository_users.create_user(body, db)
     background_tasks.add_task(send_verification_email, new_user.email, str(request.base_url))
 
@@ -47,13 +47,13 @@ async def signup(body: UserModel,
 
 @router.post("/login", response_model=TokenModel)
 async def login(body: OAuth2PasswordRequestForm = Depends(),
-                db: Session = Depends(get_db)) -> JSONResponse | dict:
+                db: AsyncSession = Depends(get_db)) -> JSONResponse | dict:
     """
     Log in a user and generate access and refresh tokens.
 
     Args:
         body (OAuth2PasswordRequestForm): Form containing user credentials.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         dict: Response containing access and refresh tokens.
@@ -66,7 +66,7 @@ async def login(body: OAuth2PasswordRequestForm = Depends(),
     if not user.confirmed:
         return JSONResponse(status_code=401, content={"detail": "Email not confirmed."})
 
-    if not auth_service.verify_password(body.password, user.password):
+    if not await auth_service.authenticate_password(user, body.password, db):
         return JSONResponse(status_code=401, content={"detail": "Invalid password."})
 
     if user.ban_status:
@@ -82,13 +82,13 @@ async def login(body: OAuth2PasswordRequestForm = Depends(),
 
 @router.get('/refresh_token', response_model=TokenModel)
 async def refresh_token(credentials: HTTPAuthorizationCredentials = Security(security),
-                        db: Session = Depends(get_db)) -> JSONResponse | dict:
+                        db: AsyncSession = Depends(get_db)) -> JSONResponse | dict:
     """
     Refresh the access token using a valid refresh token.
 
     Args:
         credentials (HTTPAuthorizationCredentials): Credentials containing the refresh token.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         dict: Response containing a new access token and refresh token.
@@ -110,13 +110,13 @@ async def refresh_token(credentials: HTTPAuthorizationCredentials = Security(sec
 
 @router.get('/confirmed_email/{token}', response_model=None)
 async def confirmed_email(token: str,
-                          db: Session = Depends(get_db)) -> JSONResponse | dict:
+                          db: AsyncSession = Depends(get_db)) -> JSONResponse | dict:
     """
     Confirm the email address for a user using a confirmation token.
 
     Args:
         token (str): Confirmation token.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         dict: Response message.
@@ -137,7 +137,7 @@ async def confirmed_email(token: str,
 async def request_email(body: RequestEmail,
                         background_tasks: BackgroundTasks,
                         request: Request,
-                        db: Session = Depends(get_db)) -> dict:
+                        db: AsyncSession = Depends(get_db)) -> dict:
     """
     Request email confirmation for a user.
 
@@ -145,7 +145,7 @@ async def request_email(body: RequestEmail,
         body (RequestEmail): Request body containing user email.
         background_tasks (BackgroundTasks): Background tasks to execute.
         request (Request): The incoming request.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         dict: Response message.
@@ -163,7 +163,7 @@ async def request_email(body: RequestEmail,
 async def request_password_reset(body: RequestEmail,
                                  background_tasks: BackgroundTasks,
                                  request: Request,
-                                 db: Session = Depends(get_db)) -> JSONResponse:
+                                 db: AsyncSession = Depends(get_db)) -> JSONResponse:
     """
     Request email reset password for a user.
 
@@ -171,7 +171,7 @@ async def request_password_reset(body: RequestEmail,
         body (RequestEmail): Request body containing user email.
         background_tasks (BackgroundTasks): Background tasks to execute.
         request (Request): The incoming request.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         dict: Response message.
@@ -207,7 +207,7 @@ async def reset_password(request: Request, token: str, error: str = None):
 @router.post('/reset_password/{token}', response_model=None)
 async def reset_password_post(token: str,
                               password_data: ResetPasswordModel,
-                              db: Session = Depends(get_db)) -> JSONResponse | dict:
+                              db: AsyncSession = Depends(get_db)) -> JSONResponse | dict:
     """
     Handle the submission of the password reset form.
     """
@@ -225,7 +225,7 @@ async def reset_password_post(token: str,
 
 @router.post('/change_password')
 async def change_password(change_password_data: ChangePasswordModel,
-                          db: Session = Depends(get_db),
+                          db: AsyncSession = Depends(get_db),
                           current_user: User = Depends(auth_service.get_current_user)
                           ) -> JSONResponse:
     """
@@ -236,14 +236,16 @@ async def change_password(change_password_data: ChangePasswordModel,
     new_password = change_password_data.new_password
     confirm_password = change_password_data.confirm_password
 
-    if not auth_service.verify_password(current_password, current_user.password):
+    # The authenticated user may come from the cache, which does not hold the password hash.
+    user = await repository_users.get_user_by_email(current_user.email, db)
+    if not await auth_service.verify_password(current_password, user.password):
         return JSONResponse(status_code=401,
                             content={"detail": "Current password is incorrect."})
     elif new_password != confirm_password:
         return JSONResponse(status_code=400,
                             content={"message": "The provided passwords do not match."})
 
-    await auth_service.upgrade_password(current_user, new_password, db)
+    await auth_service.upgrade_password(user, new_password, db)
     return JSONResponse(status_code=200,
                         content={"message": "Password changed successfully."})
 
@@ -2,9 +2,9 @@ from typing import List
 
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.services.auth_roles import is_admin_or_moderator
-from src.database.db import get_db
+from src.database.db import get_db, get_db_read
 from src.database.models import User
 from src.schemas import CommentModel, CommentResponse
 from src.repository import comments as repository_comments
@@ -16,14 +16,14 @@ router = APIRouter(prefix="/comments", tags=["comments"])
 @router.get("/{comment_id}", response_model=CommentResponse)
 async def read_comment(
         comment_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db_read),
         current_user: User = Depends(auth_service.get_current_user)
 ):
     """
     The read_comment function will return a comment object with the given id.
     Parameters:
         comment_id (int): Specify the comment id that we want to read
-        db (Session): The SQLAlchemy session used to interact with the database.
+        db (AsyncSession): The SQLAlchemy session used to interact with the database.
         current_user (User): Get the current user
     Returns:
         The comment object that matches the given id
@@ -39,7 +39,7 @@ async def read_comments(
         picture_id: int,
         skip: int = 0,
         limit: int = 20,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db_read)
 ):
     """
     The read_comments function will return a list of comments for the picture with the given id.
@@ -47,7 +47,7 @@ async def read_comments(
     picture_id (int): Get the comments for a specific picture
     skip (int): Skip a number of comments
     limit (int): Limit the number of comments that are returned
-    db (Session): The SQLAlchemy session used to interact with the database.
+    db (AsyncSession): The SQLAlchemy session used to interact with the database.
     Returns:
     A list of comments for a given picture_id
     """
@@ -60,7 +60,7 @@ async def read_comments(
 async def create_comment(
         body: CommentModel,
         picture_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(auth_service.get_current_user)
 ):
     """
@@ -70,7 +70,7 @@ async def create_comment(
     Parameters:
         body (CommentModel): Get the body of the comment
         picture_id (int): Take the picture id for which the comment is created
-        db (Session): Access the database
+        db (AsyncSession): Access the database
         current_user (User): The User who created this comment.
     Returns:
         A new comment object.
@@ -82,7 +82,7 @@ async def create_comment(
 async def update_comment(
         comment_id: int,
         body: CommentModel,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(auth_service.get_current_user)
 ):
     """
@@ -91,7 +91,7 @@ async def update_comment(
     Parameters:
         comment_id (int): the id of the comment to be updated.
         body (CommentModel): an object containing all fields that can be updated for a given comment.
-        db (Session): The SQLAlchemy session used to interact with the database.
+        db (AsyncSession): The SQLAlchemy session used to interact with the database.
         current_user (User): Get the current user
     Returns:
         The updated comment.
@@ -105,7 +105,7 @@ async def update_comment(
 @router.delete("/{contact_id}")
 async def remove_contact(
         comment_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(is_admin_or_moderator)
 ):
     """
@@ -113,7 +113,7 @@ async def remove_contact(
     object with status code 200 if successful, or 403 if not.
     Parameters:
         comment_id (int): Get the comment id.
-        db (Session): Pass the database session to the function.
+        db (AsyncSession): Pass the database session to the function.
         current_user (User): Get the current user.
     Returns:
         The message the comment deleted successfully or not.
@@ -1,8 +1,8 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
+from src.database.db import get_db, get_db_read
 from src.schemas import PictureDescription
 from src.repository import descriptions as repository_descriptions
 from src.repository import pictures as repository_pictures
@@ -18,7 +18,7 @@ async def upload_description(
         picture_id: int,
         description: str,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """
     Upload a description for a picture to the database.
@@ -28,7 +28,7 @@ async def upload_description(
     Parameters:
     - picture_id (int): The ID of the picture for which the description is being uploaded.
     - description (str): The description to be associated with the picture.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
       injection system.
 
     Returns:
@@ -47,7 +47,7 @@ async def get_all_descriptions(
         skip: int = 0,
         limit: int = 20,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db_read)
 ) -> list[str]:
     """
     Retrieve all picture descriptions from the database.
@@ -57,7 +57,7 @@ async def get_all_descriptions(
     Parameters:
     - skip (int): Number of records to skip for pagination.
     - limit (int): Maximum number of records to retrieve for pagination.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
       injection system.
 
     Returns:
@@ -75,7 +75,7 @@ async def get_all_descriptions(
 async def get_one_description(
         picture_id: int,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db_read)
 ):
     """
     Retrieve a specific picture description from the database.
@@ -84,7 +84,7 @@ async def get_one_description(
 
     Parameters:
     - picture_id (int): The ID of the picture for which the description is being retrieved.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
       injection system.
 
     Returns:
@@ -105,7 +105,7 @@ async def update_description(
         picture_id: int,
         new_description: str,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """
     Update the description for a picture in the database.
@@ -115,7 +115,7 @@ async def update_description(
     Parameters:
     - picture_id (int): The ID of the picture for which the description is being updated.
     - new_description (str): The new description to replace the existing one.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
       injection system.
 
     Returns:
@@ -139,7 +139,7 @@ async def update_description(
 async def delete_description(
         picture_id: int,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """
     Delete the description for a picture from the database.
@@ -148,7 +148,7 @@ async def delete_description(
 
     Parameters:
     - picture_id (int): The ID of the picture for which the description is being deleted.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
       injection system.
 
     Returns:
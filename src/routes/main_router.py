@@ -1,108 +1,131 @@
 from datetime import datetime
 
-from fastapi import Request, HTTPException, APIRouter, Form, UploadFile, File
+from fastapi import Request, HTTPException, APIRouter, Form, UploadFile, File, BackgroundTasks
 from fastapi.params import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 from starlette.responses import HTMLResponse, RedirectResponse, Response
 from starlette.templating import Jinja2Templates
 
-from src.database.db import get_db
+from src.database.db import get_db, get_db_read
 from src.database.models import User, Picture, Comment, Rating
 from src.services.auth import auth_service
 import src.repository.pictures as picture_repository
 import src.repository.rating as rating_repository
+import src.repository.reactions as reactions_repository
 import src.repository.stories as story_repository
-from src.conf.cloudinary import configure_cloudinary, generate_random_string
-from src.services.qr import generate_qr_and_upload_to_cloudinary
-import cloudinary
-import cloudinary.uploader
+from src.conf.cloudinary import generate_random_string
+from src.services.cache import picture_detail_cache
+from src.services.storage import storage_service
+from src.services.uploads import UploadTimings, upload_post_media, attach_qr
 from fastapi import HTTPException, status
 
 templates = Jinja2Templates(directory='templates')
 router = APIRouter()
 
 
+def has_posted_bereal(user: User) -> bool:
+    """
+    Check if the user has posted a BeReal in the last 24 hours.
+    """
+    if user.last_bereal_post_at:
+        time_diff = datetime.now() - user.last_bereal_post_at
+        return time_diff.total_seconds() < 24 * 3600
+    return False
+
+
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request,
-                db: Session = Depends(get_db),
+                db: AsyncSession = Depends(get_db_read),
+                # The stories timeline reloads from the primary, so replica lag is never cached. The session
+                # only connects on a reload.
+                primary_db: AsyncSession = Depends(get_db),
                 current_user: User = Depends(auth_service.get_current_user_optional)
                 ):
 
     if current_user is None:
         return RedirectResponse(url='/login', status_code=status.HTTP_302_FOUND)
 
-    user = db.query(User).filter(User.id == current_user.id).first()
-    pictures = db.query(Picture).order_by(Picture.created_at.desc()).all()
-    stories = await story_repository.get_active_stories(db)
-
-    # Check if user has posted a BeReal in the last 24 hours
-    user_has_posted_bereal = False
-    if user.last_bereal_post_at:
-        time_diff = datetime.now() - user.last_bereal_post_at
-        if time_diff.total_seconds() < 24 * 3600:
-            user_has_posted_bereal = True
+    pictures, next_cursor = await picture_repository.get_pictures_feed(limit=picture_repository.FEED_PAGE_SIZE, db=db)
+    stories = story_repository.group_stories_by_user(await story_repository.get_active_stories(primary_db))
 
     context = {
         'request': request,
-        'user': user,
+        'user': current_user,
         'pictures': pictures,
+        'next_cursor': next_cursor,
         'stories': stories,
-        'user_has_posted_bereal': user_has_posted_bereal
+        'user_has_posted_bereal': has_posted_bereal(current_user)
     }
     return templates.TemplateResponse('home.html', context)
 
 
+@router.get("/feed", response_class=HTMLResponse)
+async def feed_page(request: Request,
+                    cursor: str,
+                    db: AsyncSession = Depends(get_db_read),
+                    current_user: User = Depends(auth_service.get_current_user_optional)
+                    ):
+
+    if current_user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
+
+    pictures, next_cursor = await picture_repository.get_pictures_feed(limit=picture_repository.FEED_PAGE_SIZE,
+                                                                       db=db,
+                                                                       cursor=cursor)
+
+    context = {
+        'request': request,
+        'user': current_user,
+        'pictures': pictures,
+        'next_cursor': next_cursor,
+        'user_has_posted_bereal': has_posted_bereal(current_user)
+    }
+    return templates.TemplateResponse('feed_items.html', context)
+
+
 @router.get('/users')
 async def users(request: Request,
-                db: Session = Depends(get_db),
+                db: AsyncSession = Depends(get_db),
                 current_user: User = Depends(auth_service.get_current_user_optional),
                 ):
 
     if current_user is None or not current_user.admin:
         return RedirectResponse(url='/login', status_code=status.HTTP_401_UNAUTHORIZED)
 
-    if current_user:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if user.admin:
-            users_details = db.query(User).all()
-            context = {'request': request, 'user': user, 'users_details': users_details}
-            return templates.TemplateResponse('users.html', context)
-
-    return RedirectResponse(url='/', status_code=status.HTTP_401_UNAUTHORIZED)
+    users_details = (await db.scalars(select(User))).all()
+    context = {'request': request, 'user': current_user, 'users_details': users_details}
+    return templates.TemplateResponse('users.html', context)
 
 
 @router.get("/users/{user_id}")
 async def show_user(request: Request,
                     user_id: int,
-                    db: Session = Depends(get_db),
+                    db: AsyncSession = Depends(get_db_read),
                     current_user: User = Depends(auth_service.get_current_user_optional)
                     ):
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    uploaded_images_count = db.query(Picture).filter(Picture.user_id == user_id).count()
-    added_comments_count = db.query(Comment).filter(Comment.user_id == user_id).count()
+    added_comments_count = await db.scalar(select(func.count(Comment.id)).where(Comment.user_id == user_id))
 
-    # Fetch user's content
-    user_pictures = db.query(Picture).filter(Picture.user_id == user_id, Picture.media_type == 'image').all()
-    user_videos = db.query(Picture).filter(Picture.user_id == user_id, Picture.media_type == 'video').all()
-    user_reels = db.query(Picture).filter(Picture.user_id == user_id, Picture.media_type == 'reel').all()
-    user_gifs = db.query(Picture).filter(Picture.user_id == user_id, Picture.media_type == 'gif').all()
-    user_stories = db.query(Story).filter(Story.user_id == user_id).all()
+    # Fetch user's content in one query and split it by media type
+    content = await picture_repository.get_user_pictures(user_id=user_id, db=db)
+    user_stories = await story_repository.get_user_stories(user_id=user_id, db=db)
 
     context = {
         "request": request,
         "user": user,
         'current_user': current_user,
-        "uploaded_images_count": uploaded_images_count,
+        "uploaded_images_count": len(content),
         "added_comments_count": added_comments_count,
-        "user_pictures": user_pictures,
-        "user_videos": user_videos,
-        "user_reels": user_reels,
-        "user_gifs": user_gifs,
+        "user_pictures": [item for item in content if item.media_type == 'image'],
+        "user_videos": [item for item in content if item.media_type == 'video'],
+        "user_reels": [item for item in content if item.media_type == 'reel'],
+        "user_gifs": [item for item in content if item.media_type == 'gif'],
         "user_stories": user_stories
     }
 
@@ -111,27 +134,28 @@ async def show_user(request: Request,
 
 @router.post("/users/toggle-ban/{user_id}", response_class=HTMLResponse)
 async def toggle_ban_user_by_admin(user_id: int,
-                                   db: Session = Depends(get_db),
+                                   db: AsyncSession = Depends(get_db),
                                    current_user: User = Depends(auth_service.get_current_user_optional)
                                    ):
     if not current_user or not current_user.admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="You do not have permission to perform this action.")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
 
     # Toggle the ban status
     user.ban_status = not user.ban_status
-    db.commit()
+    await db.commit()
+    await auth_service.invalidate_user(user.email)
 
     return RedirectResponse(url="/users", status_code=status.HTTP_303_SEE_OTHER)
 
 
 @router.post("/users/delete/{user_id}")
 async def delete_user(user_id: int,
-                      db: Session = Depends(get_db),
+                      db: AsyncSession = Depends(get_db),
                       current_user: User = Depends(auth_service.get_current_user_optional)
                       ):
 
@@ -143,12 +167,13 @@ async def delete_user(user_id: int,
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="You do not have permission to perform this action.")
 
-    user_to_delete = db.query(User).filter(User.id == user_id).first()
+    user_to_delete = await db.scalar(select(User).where(User.id == user_id))
     if not user_to_delete:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
 
-    db.delete(user_to_delete)
-    db.commit()
+    await db.delete(user_to_delete)
+    await db.commit()
+    await auth_service.invalidate_user(user_to_delete.email)
 
     if current_user.admin:
         return RedirectResponse(url="/users", status_code=status.HTTP_303_SEE_OTHER)
@@ -170,6 +195,7 @@ async def story_upload_page(request: Request):
 
 @router.post("/picture/upload", response_class=HTMLResponse)
 async def upload_picture(request: Request,
+                         background_tasks: BackgroundTasks,
                          picture: UploadFile = File(...),
                          picture_secondary: UploadFile = File(None),
                          is_bereal: bool = Form(False),
@@ -178,83 +204,65 @@ async def upload_picture(request: Request,
                          metadata: str = Form("{}"),
                          qr_code: UploadFile = File(None),
                          current_user: User = Depends(auth_service.get_current_user_optional),
-                         db: Session = Depends(get_db)
+                         db: AsyncSession = Depends(get_db)
                          ):
 
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
 
-    configure_cloudinary()
-
-    # Upload main picture
-    picture_name = generate_random_string()
+    timings = UploadTimings()
     resource_type = 'video' if media_type in ['video', 'gif', 'reel'] else 'image'
-    picture_uploaded = cloudinary.uploader.upload(picture.file, public_id=picture_name, folder='picture', overwrite=True, resource_type=resource_type)
-    version = picture_uploaded.get('version')
-    picture_url = cloudinary.CloudinaryImage(picture_uploaded['public_id'], resource_type=resource_type).build_url(version=version)
-
-    # Upload secondary picture if provided
-    picture_secondary_url = None
-    if picture_secondary and picture_secondary.filename:
-        sec_picture_name = generate_random_string()
-        sec_uploaded = cloudinary.uploader.upload(picture_secondary.file, public_id=sec_picture_name, folder='picture', overwrite=True)
-        picture_secondary_url = cloudinary.CloudinaryImage(sec_uploaded['public_id']).build_url(version=sec_uploaded.get('version'))
-
-    qr = await generate_qr_and_upload_to_cloudinary(picture_url, picture_uploaded)
-
-    uploaded_picture = await picture_repository.upload_picture(
-        picture_url=picture_url,
-        picture_json=picture_uploaded,
-        user=current_user,
-        description=description,
-        qr=qr,
-        db=db,
-        picture_secondary_url=picture_secondary_url,
-        is_bereal=is_bereal,
-        media_type=media_type
-    )
-
-    if is_bereal:
-        current_user.last_bereal_post_at = datetime.now()
-        db.commit()
+    media = await upload_post_media(picture, picture_secondary, resource_type, timings, db)
+
+    with timings.stage("db"):
+        uploaded_picture = await picture_repository.upload_picture(
+            picture_url=media.picture_url,
+            picture_json=media.picture_json,
+            user=current_user,
+            description=description,
+            qr=media.qr,
+            db=db,
+            picture_secondary_url=media.picture_secondary_url,
+            is_bereal=is_bereal,
+            media_type=media_type
+        )
+
+        if is_bereal:
+            await db.execute(update(User).where(User.id == current_user.id).values(last_bereal_post_at=datetime.now()))
+            await db.commit()
+            await auth_service.invalidate_user(current_user.email)
+
+    if media.qr is None:
+        background_tasks.add_task(attach_qr, uploaded_picture.id, media, timings)
+    else:
+        timings.log(uploaded_picture.id)
 
-    return RedirectResponse(url=f"/picture/{uploaded_picture.id}", status_code=status.HTTP_303_SEE_OTHER)
+    return RedirectResponse(url=f"/picture/{uploaded_picture.id}", status_code=status.HTTP_303_SEE_OTHER,
+                            headers={"Server-Timing": timings.server_timing()})
 
 
 @router.get("/picture/{picture_id}", response_class=HTMLResponse)
 async def get_picture(request: Request,
                       picture_id: int,
-                      db: Session = Depends(get_db),
+                      # Cache misses refill from the primary, so replica lag is never cached.
+                      db: AsyncSession = Depends(get_db),
                       current_user: User = Depends(auth_service.get_current_user_optional)
                       ):
 
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
 
-    picture = await picture_repository.get_one_picture(picture_id=picture_id, db=db)
-    username_uploader = db.query(User.username).join(Picture, Picture.user_id == User.id).filter(Picture.id == picture_id).first()[0]
-    comments = db.query(Comment.content,
-                        User.username,
-                        Comment.id,
-                        Comment.user_id,
-    ).join(User).filter(Comment.picture_id == picture_id).order_by(Comment.id.desc()).all()
-
-    average_rating = await rating_repository.get_average_of_rating(picture_id=picture_id, db=db)
+    detail = await picture_repository.get_picture_detail(picture_id=picture_id, db=db)
 
-    if average_rating.get('message'):
-        average_rating = 0
-    else:
-        average_rating = average_rating.get('average_rating')
-
-    if not picture:
+    if not detail:
         raise HTTPException(status_code=status.HTTP_204_NO_CONTENT)
 
     context = {'request': request,
-               'picture': picture,
+               'picture': detail['picture'],
                'user': current_user,
-               'comments': comments,
-               'username_uploader': username_uploader,
-               "average_rating": average_rating,
+               'comments': detail['comments'],
+               'username_uploader': detail['username_uploader'],
+               "average_rating": detail['average_rating'],
                }
     return templates.TemplateResponse('picture.html', context)
 
@@ -262,39 +270,40 @@ async def get_picture(request: Request,
 @router.post("/picture/comments/add")
 async def add_comment(picture_id: int = Form(...),
                       content: str = Form(...),
-                      db: Session = Depends(get_db),
+                      db: AsyncSession = Depends(get_db),
                       current_user: User = Depends(auth_service.get_current_user_optional)
                       ):
 
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
 
-    picture = db.query(Picture).filter(Picture.id == picture_id).first()
+    picture = await db.scalar(select(Picture).where(Picture.id == picture_id))
     if not picture:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Picture not found.")
 
     comment = Comment(user_id=current_user.id,
                       content=content,
-                      picture=picture,
+                      picture_id=picture.id,
                       created_at=datetime.now())
 
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
+    await db.refresh(comment)
+    await picture_detail_cache.delete(picture_id)
     return RedirectResponse(url=f"/picture/{picture_id}", status_code=status.HTTP_303_SEE_OTHER)
 
 
 @router.get("/comment/edit/{comment_id}", response_class=HTMLResponse)
 async def edit_comment_form(request: Request,
                             comment_id: int,
-                            db: Session = Depends(get_db),
+                            db: AsyncSession = Depends(get_db),
                             current_user: User = Depends(auth_service.get_current_user_optional)
                             ):
 
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="You must be logged in to edit comments.")
 
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = await db.scalar(select(Comment).where(Comment.id == comment_id))
 
     if not comment or comment.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only edit your own comments.")
@@ -305,25 +314,26 @@ async def edit_comment_form(request: Request,
 @router.post("/comment/edit/{comment_id}")
 async def submit_edit_comment(comment_id: int,
                               content: str = Form(...),
-                              db: Session = Depends(get_db),
+                              db: AsyncSession = Depends(get_db),
                               current_user: User = Depends(auth_service.get_current_user_optional)
                               ):
 
-    comment = db.query(Comment).filter(Comment.id == comment_id, Comment.user_id == current_user.id).first()
+    comment = await db.scalar(select(Comment).where(Comment.id == comment_id, Comment.user_id == current_user.id))
 
     if not comment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found.")
 
     comment.content = content
     comment.updated_at = datetime.now()
-    db.commit()
+    await db.commit()
+    await picture_detail_cache.delete(comment.picture_id)
 
     return RedirectResponse(url=f"/picture/{comment.picture_id}", status_code=status.HTTP_303_SEE_OTHER)
 
 
 @router.post("/comment/delete/{comment_id}")
 async def delete_comment(comment_id: int,
-                         db: Session = Depends(get_db),
+                         db: AsyncSession = Depends(get_db),
                          current_user: User = Depends(auth_service.get_current_user_optional)):
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Musisz być zalogowany.")
@@ -331,27 +341,29 @@ async def delete_comment(comment_id: int,
     if not current_user.admin and not current_user.moderator:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Brak uprawnień do usunięcia komentarza.")
 
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = await db.scalar(select(Comment).where(Comment.id == comment_id))
 
     if not comment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Komentarz nie został znaleziony.")
 
-    db.delete(comment)
-    db.commit()
+    await db.delete(comment)
+    await db.commit()
+    await reactions_repository.counts_cache.delete(comment_id)
+    await picture_detail_cache.delete(comment.picture_id)
 
     return RedirectResponse(url=f"/picture/{comment.picture_id}", status_code=status.HTTP_303_SEE_OTHER)
 
 
 @router.post("/picture/delete/{picture_id}")
 async def delete_picture(picture_id: int,
-                         db: Session = Depends(get_db),
+                         db: AsyncSession = Depends(get_db),
                          current_user: User = Depends(auth_service.get_current_user_optional)
                          ):
 
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
 
-    picture = db.query(Picture).filter(Picture.id == picture_id).first()
+    picture = await db.scalar(select(Picture).where(Picture.id == picture_id))
     if not picture:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Picture not found.")
 
@@ -360,8 +372,9 @@ async def delete_picture(picture_id: int,
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="You do not have permission to perform this action.")
 
-    db.delete(picture)
-    db.commit()
+    await db.delete(picture)
+    await db.commit()
+    await picture_detail_cache.delete(picture_id)
 
     return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -369,16 +382,16 @@ async def delete_picture(picture_id: int,
 @router.get("/picture/edit/{picture_id}", response_class=HTMLResponse)
 async def edit_picture_form(request: Request,
                             picture_id: int,
-                            db: Session = Depends(get_db),
+                            db: AsyncSession = Depends(get_db),
                             current_user: User = Depends(auth_service.get_current_user_optional)):
 
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
 
     if current_user.admin:
-        picture = db.query(Picture).filter(Picture.id == picture_id).first()
+        picture = await db.scalar(select(Picture).where(Picture.id == picture_id))
     else:
-        picture = db.query(Picture).filter(Picture.id == picture_id, Picture.user_id == current_user.id).first()
+        picture = await db.scalar(select(Picture).where(Picture.id == picture_id, Picture.user_id == current_user.id))
 
     if not picture:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Picture not found or you don't have permission to edit it.")
@@ -390,13 +403,13 @@ async def edit_picture_form(request: Request,
 async def submit_edit_picture(picture_id: int,
                               description: str = Form(...),
                               media_type: str = Form(None),
-                              db: Session = Depends(get_db),
+                              db: AsyncSession = Depends(get_db),
                               current_user: User = Depends(auth_service.get_current_user_optional)):
 
     if current_user.admin:
-        picture = db.query(Picture).filter(Picture.id == picture_id).first()
+        picture = await db.scalar(select(Picture).where(Picture.id == picture_id))
     else:
-        picture = db.query(Picture).filter(Picture.id == picture_id, Picture.user_id == current_user.id).first()
+        picture = await db.scalar(select(Picture).where(Picture.id == picture_id, Picture.user_id == current_user.id))
 
     if not picture:
         raise HTTPException(status_code=404, detail="Picture not found or you don't have permission to edit it.")
@@ -404,7 +417,8 @@ async def submit_edit_picture(picture_id: int,
     picture.description = description
     if media_type:
         picture.media_type = media_type
-    db.commit()
+    await db.commit()
+    await picture_detail_cache.delete(picture_id)
 
     return RedirectResponse(url=f"/picture/{picture_id}", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -415,17 +429,16 @@ async def upload_story(request: Request,
                        media_type: str = Form('image'),
                        description: str = Form(None),
                        current_user: User = Depends(auth_service.get_current_user_optional),
-                       db: Session = Depends(get_db)
+                       db: AsyncSession = Depends(get_db)
                        ):
 
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
 
-    configure_cloudinary()
     public_id = generate_random_string()
     resource_type = 'video' if media_type in ['video', 'gif', 'reel'] else 'image'
 
-    uploaded = cloudinary.uploader.upload(
+    uploaded = await storage_service.upload(
         story_image.file,
         public_id=public_id,
         folder='stories',
@@ -433,10 +446,7 @@ async def upload_story(request: Request,
         resource_type=resource_type
     )
 
-    image_url = cloudinary.CloudinaryImage(
-        uploaded['public_id'],
-        resource_type=resource_type
-    ).build_url(version=uploaded.get('version'))
+    image_url = storage_service.url(uploaded['public_id'], resource_type=resource_type, version=uploaded.get('version'))
 
     await story_repository.create_story(
         image_url=image_url,
@@ -452,7 +462,7 @@ async def upload_story(request: Request,
 @router.get("/story/edit/{story_id}", response_class=HTMLResponse)
 async def edit_story_form(request: Request,
                           story_id: int,
-                          db: Session = Depends(get_db),
+                          db: AsyncSession = Depends(get_db),
                           current_user: User = Depends(auth_service.get_current_user_optional)):
 
     if not current_user:
@@ -469,7 +479,7 @@ async def edit_story_form(request: Request,
 async def submit_edit_story(story_id: int,
                             description: str = Form(None),
                             media_type: str = Form('image'),
-                            db: Session = Depends(get_db),
+                            db: AsyncSession = Depends(get_db),
                             current_user: User = Depends(auth_service.get_current_user_optional)):
 
     story = await story_repository.get_one_story(story_id, db)
@@ -483,7 +493,7 @@ async def submit_edit_story(story_id: int,
 
 @router.post("/story/delete/{story_id}")
 async def delete_story(story_id: int,
-                       db: Session = Depends(get_db),
+                       db: AsyncSession = Depends(get_db),
                        current_user: User = Depends(auth_service.get_current_user_optional)):
 
     story = await story_repository.get_one_story(story_id, db)
@@ -498,7 +508,7 @@ async def delete_story(story_id: int,
 @router.post("/picture/rate/{picture_id}")
 async def rate_picture(picture_id: int,
                        rating: int = Form(...),
-                       db: Session = Depends(get_db),
+                       db: AsyncSession = Depends(get_db),
                        current_user: User = Depends(auth_service.get_current_user_optional)
                        ):
     if not current_user:
@@ -512,17 +522,17 @@ async def rate_picture(picture_id: int,
 @router.get("/picture/{picture_id}/ratings", response_class=HTMLResponse)
 async def view_picture_ratings(request: Request,
                                picture_id: int,
-                               db: Session = Depends(get_db),
+                               db: AsyncSession = Depends(get_db_read),
                                current_user: User = Depends(auth_service.get_current_user_optional)
                                ):
 
     if not (current_user.admin or current_user.moderator):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions.")
 
-    ratings = (db.query(Rating, User.username)
-               .join(User, Rating.user_id == User.id)
-               .filter(Rating.picture_id == picture_id)
-               .all())
+    result = await db.execute(select(Rating, User.username)
+                              .join(User, Rating.user_id == User.id)
+                              .where(Rating.picture_id == picture_id))
+    ratings = result.all()
 
     return templates.TemplateResponse("ratings.html", {"request": request, "ratings": ratings,
                                                        "picture_id": picture_id, "user": current_user})
@@ -530,12 +540,12 @@ async def view_picture_ratings(request: Request,
 
 @router.post("/rating/{rating_id}/delete")
 async def delete_rating(rating_id: int,
-                        db: Session = Depends(get_db),
+                        db: AsyncSession = Depends(get_db),
                         current_user: User = Depends(auth_service.get_current_user_optional)):
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
 
-    rating = db.query(Rating).filter(Rating.id == rating_id).first()
+    rating = await db.scalar(select(Rating).where(Rating.id == rating_id))
 
     if not rating:
         raise HTTPException(status_code=404, detail="Rating not found.")
@@ -545,8 +555,7 @@ async def delete_rating(rating_id: int,
                             detail="You do not have permission to delete this rating.")
 
     picture_id = rating.picture_id
-    db.delete(rating)
-    db.commit()
+    await rating_repository.remove_rating(picture_id, rating.user_id, db)
 
     return RedirectResponse(url=f"/picture/{picture_id}", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -558,14 +567,14 @@ async def authentication_page(request: Request):
 
 @router.post("/login", response_class=HTMLResponse)
 async def login_form(request: Request,
-                     db: Session = Depends(get_db)
+                     db: AsyncSession = Depends(get_db)
                      ):
 
     form = await request.form()
     email = form.get('email')
     password = form.get('password')
 
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(User.email == email))
 
     if user:
         if user.ban_status:
@@ -573,13 +582,15 @@ async def login_form(request: Request,
             context = {'request': request, 'msg': msg}
             return templates.TemplateResponse('login.html', context)
 
-        if auth_service.verify_password(password, user.password):
+        if await auth_service.authenticate_password(user, password, db):
             data = {"sub": email}
             jwt_token = auth_service.create_access_token(data=data)
             jwt_refresh_token = auth_service.create_refresh_token(data=data)
-            pictures = db.query(Picture).all()
+            pictures, next_cursor = await picture_repository.get_pictures_feed(limit=picture_repository.FEED_PAGE_SIZE,
+                                                                               db=db)
 
-            context = {'request': request, 'user': user, 'pictures': pictures}
+            context = {'request': request, 'user': user, 'pictures': pictures, 'next_cursor': next_cursor,
+                       'user_has_posted_bereal': has_posted_bereal(user)}
             response = templates.TemplateResponse('home.html', context)
             response.set_cookie(key='access_token', value=f'Bearer {jwt_token}', httponly=True)
             response.set_cookie(key="refresh_token", value=jwt_refresh_token, httponly=True)
@@ -612,12 +623,12 @@ async def register_user(request: Request,
                         email: str = Form(...),
                         password: str = Form(...),
                         password2: str = Form(),
-                        db: Session = Depends(get_db)
+                        db: AsyncSession = Depends(get_db)
                         ):
 
-    validation1 = db.query(User).filter(User.username == username).first()
+    validation1 = await db.scalar(select(User).where(User.username == username))
 
-    validation2 = db.query(User).filter(User.email == email).first()
+    validation2 = await db.scalar(select(User).where(User.email == email))
 
     if password != password2 or validation1 is not None or validation2 is not None:
         msg = 'Invalid registration request'
@@ -628,12 +639,12 @@ async def register_user(request: Request,
     user_model = User()
     user_model.username = username
     user_model.email = email
-    user_model.password = auth_service.get_password_hash(password)
+    user_model.password = await auth_service.get_password_hash(password)
     user_model.confirmed = True
     user_model.crated_at = datetime.now()
 
     db.add(user_model)
-    db.commit()
+    await db.commit()
 
     msg = 'User successfully created'
     context = {'request': request, 'msg': msg}
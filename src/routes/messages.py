@@ -2,7 +2,7 @@ from typing import List
 
 from fastapi import APIRouter, HTTPException
 from fastapi.params import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
 from src.schemas import MessageModel, MessageResponse, MessageSend
@@ -16,7 +16,7 @@ router = APIRouter(prefix='/messages', tags=["messages"])
 @router.post('/', response_model=MessageModel)
 async def create_message(
         body: MessageSend,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(auth_service.get_current_user)
 ):
     """
@@ -29,7 +29,7 @@ async def create_message(
     Parameters:
     - body (MessageModel): A Pydantic model that includes the sender_id, receiver_id, and content
       of the message. This is parsed from the request body.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
       injection system.
 
     Returns:
@@ -48,7 +48,7 @@ async def create_message(
 
 @router.get('/user/{user_id}', response_model=List[MessageResponse])
 async def get_messages_for_user(
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(auth_service.get_current_user)
 ) -> List[MessageResponse]:
     """
@@ -60,7 +60,7 @@ async def get_messages_for_user(
     Parameters:
     - user_id (int): The ID of the user whose messages are to be retrieved. This is captured
       from the URL path.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
       injection system.
 
     Returns:
@@ -0,0 +1,90 @@
+import os
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.database.db import async_engine, replica_router
+from src.database.pool import pool_stats
+from src.services.auth import auth_service
+
+router = APIRouter(tags=["metrics"])
+
+# name: (stat, type, help)
+POOL_METRICS = {
+    "db_pool_up": ("up", "gauge", "1 if the database is in rotation, 0 if its health checks fail."),
+    "db_pool_size": ("size", "gauge", "Configured number of persistent connections in the pool."),
+    "db_pool_checked_in": ("checked_in", "gauge", "Idle connections in the pool."),
+    "db_pool_checked_out": ("checked_out", "gauge", "Connections currently in use."),
+    "db_pool_overflow": ("overflow", "gauge", "Connections open beyond the pool size; negative while filling up."),
+    "db_pool_checkouts_total": ("checkouts", "counter", "Connections handed out by the pool."),
+    "db_pool_timeouts_total": ("timeouts", "counter", "Checkouts that timed out waiting for a connection."),
+    "db_pool_wait_seconds_total": ("wait_seconds_total", "counter", "Total time spent waiting for a connection."),
+    "db_pool_wait_seconds_max": ("wait_seconds_max", "gauge", "Longest time spent waiting for a connection."),
+}
+
+# name: (stat, type, help)
+CACHE_METRICS = {
+    "cache_hits_total": ("hits", "counter", "Lookups answered from the in-process cache."),
+    "cache_misses_total": ("misses", "counter", "Lookups that found no live entry in the in-process cache."),
+    "cache_entries": ("entries", "gauge", "Entries in the in-process cache, including expired ones not yet evicted."),
+}
+
+
+def render_pool_metrics(pools: dict) -> str:
+    """
+    Format connection pool stats in the Prometheus text exposition format.
+
+    Args:
+        pools (dict): Stats returned by `pool_stats`, by pool name.
+
+    Returns:
+        str: The metrics, labelled with the pool name and the worker's process ID.
+    """
+    worker = os.getpid()
+    lines = []
+    for name, (stat, metric_type, description) in POOL_METRICS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for pool, stats in pools.items():
+            if stat in stats:
+                lines.append(f'{name}{{pool="{pool}",worker="{worker}"}} {stats[stat]}')
+    return "\n".join(lines) + "\n"
+
+
+def render_cache_metrics(caches: dict) -> str:
+    """
+    Format the hit and miss counts of in-process caches in the Prometheus text exposition format.
+
+    Args:
+        caches (dict): Stats returned by `MemoryCache.stats`, by cache name.
+
+    Returns:
+        str: The metrics, labelled with the cache name and the worker's process ID.
+    """
+    worker = os.getpid()
+    lines = []
+    for name, (stat, metric_type, description) in CACHE_METRICS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for cache, stats in caches.items():
+            lines.append(f'{name}{{cache="{cache}",worker="{worker}"}} {stats[stat]}')
+    return "\n".join(lines) + "\n"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> str:
+    """
+    Expose the database connection pool stats of this worker for Prometheus, for the primary and
+    each read replica, and the hit rates of the in-process authentication caches.
+
+    Every gunicorn worker has its own pool, so a scrape reports the worker that served it, as the
+    `worker` label shows.
+
+    Returns:
+        str: The metrics in the Prometheus text exposition format.
+    """
+    pools = {"primary": pool_stats(async_engine.sync_engine)}
+    for index, engine in enumerate(replica_router.engines):
+        pools[f"replica{index}"] = {"up": int(replica_router.is_healthy(index)), **pool_stats(engine.sync_engine)}
+    caches = {"token": auth_service.token_cache.stats(), "session": auth_service.session_cache.stats()}
+    return render_pool_metrics(pools) + render_cache_metrics(caches)
@@ -1,16 +1,18 @@
-from typing import List, Type
-from fastapi import APIRouter, Depends, HTTPException,  UploadFile, File, status
-from sqlalchemy.orm import Session
+from typing import List, Optional, Type
+from fastapi import APIRouter, Depends, HTTPException,  UploadFile, File, status, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 import cloudinary
 import cloudinary.uploader
 
-from src.database.db import get_db
+from src.database.db import get_db, get_db_read
 from src.database.models import User, Picture
 from src.schemas import PictureDB, PictureEdit, PictureResponse
 from src.repository import pictures as repository_pictures
 from src.services.auth import auth_service
 from src.services.qr import generate_qr_and_upload_to_cloudinary
-from src.conf.cloudinary import configure_cloudinary, generate_random_string
+from src.services.storage import storage_service
+from src.services.uploads import UploadTimings, upload_post_media
+from src.conf.cloudinary import configure_cloudinary
 
 
 router = APIRouter(prefix='/pictures', tags=["pictures"])
@@ -22,18 +24,19 @@ async def upload_picture(
         description: str = None,
         media_type: str = 'image',
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ) -> PictureDB:
     """
     Upload a picture to the database.
 
-    This endpoint uploads a picture file to the cloud storage using Cloudinary. It then associates
-    the uploaded picture with the current user and saves the picture data to the database.
+    This endpoint uploads a picture file to the media storage, unless the same content was uploaded
+    before, in which case the stored file and its QR code are reused. It then associates the picture
+    with the current user and saves the picture data to the database.
 
     Parameters:
     - picture (UploadFile): The picture file to be uploaded.
     - current_user (User): The current user authenticated via the authentication service.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
       injection system.
 
     Returns:
@@ -42,49 +45,57 @@ async def upload_picture(
     if not current_user.confirmed:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized access to upload picture")
 
-    configure_cloudinary()
-    picture_name = generate_random_string()
+    timings = UploadTimings()
     resource_type = 'video' if media_type in ['video', 'gif', 'reel'] else 'image'
-    picture = cloudinary.uploader.upload(picture.file, public_id=picture_name, folder='picture', overwrite=True, resource_type=resource_type)
-    version = picture.get('version')
-
-    picture_url = cloudinary.CloudinaryImage(picture['public_id'], resource_type=resource_type).build_url(version=version)
-    qr = await generate_qr_and_upload_to_cloudinary(picture_url, picture)
+    media = await upload_post_media(picture, None, resource_type, timings, db, defer_qr=False)
 
     picture_in_db = await repository_pictures.upload_picture(
-        picture_url=picture_url,
-        picture_json=picture,
+        picture_url=media.picture_url,
+        picture_json=media.picture_json,
         user=current_user,
-        qr=qr,
+        qr=media.qr,
         db=db,
         description=description,
         media_type=media_type
     )
+    timings.log(picture_in_db.id)
 
     return picture_in_db
 
 
 @router.get("/", response_model=List[PictureResponse])
 async def get_all_pictures(
+        response: Response,
         skip: int = 0,
         limit: int = 20,
-        db: Session = Depends(get_db)
+        cursor: Optional[str] = None,
+        db: AsyncSession = Depends(get_db_read)
 ) -> list[Type[Picture]]:
     """
     Retrieve all pictures from the database.
 
     This endpoint retrieves all pictures stored in the database, with optional pagination support.
+    Passing `cursor` switches to keyset pagination: pictures are returned newest first, `skip` is
+    ignored, and the cursor of the next page is sent in the `X-Next-Cursor` response header.
+    An empty `cursor` requests the first page; the header is omitted on the last page.
 
     Parameters:
     - skip (int): The number of pictures to skip.
     - limit (int): The maximum number of pictures to retrieve.
+    - cursor (Optional[str]): The cursor returned with the previous page.
     - current_user (User): The current user authenticated via the authentication service.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
       injection system.
 
     Returns:
     - A list of PictureDB instances representing the retrieved pictures.
     """
+    if cursor is not None:
+        pictures, next_cursor = await repository_pictures.get_pictures_feed(limit=limit, db=db, cursor=cursor)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return pictures
+
     pictures = await repository_pictures.get_all_pictures(skip=skip, limit=limit, db=db)
 
     return pictures
@@ -94,7 +105,7 @@ async def get_all_pictures(
 async def get_one_picture(
         picture_id: int,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db_read)
 ) -> PictureResponse:
     """
     Retrieve a specific picture from the database.
@@ -104,7 +115,7 @@ async def get_one_picture(
     Parameters:
     - picture_id (int): The ID of the picture to retrieve.
     - current_user (User): The current user authenticated via the authentication service.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
       injection system.
 
     Returns:
@@ -127,7 +138,7 @@ async def update_picture(
         picture: UploadFile = File(),
         media_type: str = 'image',
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ) -> PictureDB:
     """
     Update a picture in the database.
@@ -138,17 +149,13 @@ async def update_picture(
     - picture_id (int): The ID of the picture to update.
     - picture (UploadFile): The new picture file to upload.
     - current_user (User): The current user authenticated via the authentication service.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
       injection system.
 
     Returns:
     - The URL of the updated picture as a PictureDB instance.
     """
 
-    configure_cloudinary()
-
-    random_string = generate_random_string()
-
     picture_data = await repository_pictures.get_one_picture(picture_id, db)
 
     if not picture_data:
@@ -158,8 +165,8 @@ async def update_picture(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not allowed to update this picture")
 
     resource_type = 'video' if media_type in ['video', 'gif', 'reel'] else 'image'
-    picture_uploaded = cloudinary.uploader.upload(picture.file, public_id=f'picture/{current_user.email}', overwrite=True, resource_type=resource_type)
-    url = cloudinary.CloudinaryImage(f'picture/{random_string}', resource_type=resource_type).build_url(version=picture_uploaded.get('version'))
+    picture_uploaded = await storage_service.upload(picture.file, public_id=f'picture/{current_user.email}', overwrite=True, resource_type=resource_type)
+    url = storage_service.url(picture_uploaded['public_id'], resource_type=resource_type, version=picture_uploaded.get('version'))
 
     picture_url = await repository_pictures.update_picture(picture_id=picture_id, url=url, user=current_user, db=db, media_type=media_type)
 
@@ -170,7 +177,7 @@ async def update_picture(
 async def delete_picture(
         picture_id: int,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ) -> PictureDB:
     """
     Delete a picture from the database.
@@ -180,7 +187,7 @@ async def delete_picture(
     Parameters:
     - picture_id (int): The ID of the picture to delete.
     - current_user (User): The current user authenticated via the authentication service.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
       injection system.
 
     Returns:
@@ -205,7 +212,7 @@ async def edit_picture(
         picture_id: int,
         picture_edit: PictureEdit,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """
     Edit a picture based on the specified parameters.
@@ -223,7 +230,7 @@ async def edit_picture(
         - gen_replace (str): A string representing the replacement transformation. If specified, 'gen_remove' should not be provided.
         - gen_remove (str): A string representing the removal transformation. If specified, 'gen_replace' should not be provided.
     - current_user (User): The current user authenticated via the authentication service.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency injection system.
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency injection system.
 
     Returns:
     - The edited URL of the picture as a string.
@@ -240,6 +247,9 @@ async def edit_picture(
     if not current_user.id == picture_db.user_id and not current_user.admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not allowed to update this picture")
 
+    if not storage_service.supports_transformations:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Picture editing requires Cloudinary storage")
+
     configure_cloudinary()
 
     await repository_pictures.validate_edit_parameters(picture_edit)
@@ -250,8 +260,11 @@ async def edit_picture(
     transformation = await repository_pictures.parse_transform_effects(picture_edit)
     transformation_url = cloudinary.utils.cloudinary_url(picture_public_id, transformation=transformation)[0]
 
-    picture_edited = cloudinary.uploader.upload(transformation_url, version=picture_version, public_id=f'{picture_public_id}_edited', overwrite=True)
-    picture_edited_url = cloudinary.CloudinaryImage(picture_edited['public_id']).build_url(version=picture_version)
+    # Deduplicated pictures share their upload, so the edit is stored under this picture's id; the QR code is
+    # named after it as well.
+    picture_edited = await storage_service.upload(transformation_url, version=picture_version,
+                                                  public_id=f'{picture_public_id}_{picture_db.id}_edited', overwrite=True)
+    picture_edited_url = storage_service.url(picture_edited['public_id'], version=picture_version)
 
     qr = await generate_qr_and_upload_to_cloudinary(picture_edited_url, picture_edited, picture_version)
 
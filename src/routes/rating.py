@@ -1,7 +1,8 @@
 from fastapi import Depends, HTTPException, status, APIRouter
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
+from src.database.db import get_db, get_db_read
 from src.database.models import User
 from src.repository.rating import add_rating_to_picture, remove_rating_from_picture, get_rating, get_average_of_rating, \
     remove_rating_from_picture_admin
@@ -16,7 +17,7 @@ router = APIRouter(prefix="/rating", tags=["rating"])
 async def create_rating(
         data: Rating,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """
     Creates a new rating for a specific picture by the current user. This endpoint requires
@@ -39,7 +40,7 @@ async def create_rating(
 async def delete_rating(
         picture_id: int,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """
     Removes a rating for a specific picture made by the current user. This endpoint requires
@@ -63,14 +64,14 @@ async def delete_admin_rating(
         picture_id: int,
         user_id: int,
         current_user: User = Depends(is_admin_or_moderator),
-        db: Session = Depends(get_db)):
+        db: AsyncSession = Depends(get_db)):
     """
     Removes a user's rating for a picture.
 
     - **picture_id**: The identifier of the picture from which the rating is to be removed.
     - **user_id**: The identifier of the user whose rating is to be removed (only accessible by admin).
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -81,7 +82,7 @@ async def delete_admin_rating(
 @router.post("/picture")
 async def get_ratings(
         data: RatingPicture,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db_read)
 ):
     """
     Retrieves all ratings associated with a specific picture. This endpoint is open and does not
@@ -102,7 +103,7 @@ async def get_ratings(
 @router.post("/average/picture")
 async def get_average_rating(
         data: RatingPicture,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db_read)
 ):
     """
     Calculates and returns the average rating for a specific picture. This endpoint is open and
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, status, Depends
-from sqlalchemy.orm import Session
+from typing import List
 
-from src.database.db import get_db
+from fastapi import APIRouter, HTTPException, Query, status, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.db import get_db, get_db_read
 from src.database.models import User
 from src.schemas import ReactionName
 from src.services.auth import auth_service
@@ -10,13 +12,15 @@ from src.repository import reactions as repository_reactions
 
 router = APIRouter(prefix="/reactions", tags=["reactions"])
 
+MAX_COMMENT_IDS = 200
+
 
 @router.post("/{reaction}", status_code=status.HTTP_201_CREATED)
 async def add_reaction_to_comment(
         comment_id: int,
         reaction: ReactionName,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """
     The add_reaction_to_comment function adds a reaction to a comment.
@@ -24,7 +28,7 @@ async def add_reaction_to_comment(
         comment_id (int): Specify the comment to which we want to add a reaction
         reaction (ReactionName): Get the reaction name from the user
         current_user (User): Get the user who is logged in
-        db (Session): Get a database session
+        db (AsyncSession): Get a database session
     Returns:
         Information: "The reaction was added"
     """
@@ -35,30 +39,68 @@ async def add_reaction_to_comment(
 async def remove_reaction(
         comment_id: int,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """
     The remove_reaction function removes a reaction from a comment.
     Parameters:
         comment_id (int): The id of the comment to remove the reaction from.
         current_user (User): The user removing the reaction.
-        db (Session): Get the database session
+        db (AsyncSession): Get the database session
     Returns:
         A message if the comment has no reaction, else it removes the user's reaction from that comment
     """
     return await repository_reactions.remove_reaction_from_comment(comment_id, current_user, db)
 
 
+@router.get("/")
+async def get_reactions_for_comments(
+        comment_ids: List[int] = Query(...),
+        db: AsyncSession = Depends(get_db_read)
+):
+    """
+    The get_reactions_for_comments function returns the users and their reactions for many comments at once.
+    Parameters:
+        comment_ids (List[int]): The ids of the comments, e.g. ?comment_ids=1&comment_ids=2
+        db (AsyncSession): Get the database session
+    Returns:
+        A dict of comment ids, each with the users and their reactions for that comment
+    """
+    if len(comment_ids) > MAX_COMMENT_IDS:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"At most {MAX_COMMENT_IDS} comment ids can be requested at once.")
+    return await repository_reactions.get_reactions_for_comments(comment_ids, db)
+
+
+@router.get("/counts")
+async def get_reaction_counts(
+        comment_ids: List[int] = Query(...),
+        db: AsyncSession = Depends(get_db_read)
+):
+    """
+    The get_reaction_counts function returns the numbers of reactions for many comments at once.
+    Parameters:
+        comment_ids (List[int]): The ids of the comments, e.g. ?comment_ids=1&comment_ids=2
+        db (AsyncSession): Get the database session
+    Returns:
+        A dict of comment ids, each with the numbers of reactions for that comment, most common first
+    """
+    if len(comment_ids) > MAX_COMMENT_IDS:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"At most {MAX_COMMENT_IDS} comment ids can be requested at once.")
+    return await repository_reactions.get_reaction_counts(comment_ids, db)
+
+
 @router.get("/{comment_id}")
 async def get_reactions(
         comment_id: int,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db_read)
 ):
     """
     The get_reactions function returns a dict of all users and their reactions for a given comment.
     Parameters:
         comment_id (int): Get the reactions of a specific comment
-        db (Session): Get the database session
+        db (AsyncSession): Get the database session
     Returns:
         A list of users with their reactions for a comment
     """
@@ -69,13 +111,13 @@ async def get_reactions(
 @router.get("/number/{comment_id}")
 async def get_number_of_reactions(
         comment_id: int,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db_read)
 ):
     """
     The get_number_of_reactions function returns the numbers of reactions for a given comment.
     Parameters:
         comment_id (int): The id of the comment to get reactions from.
-        db (Session): Pass the database session to the function
+        db (AsyncSession): Pass the database session to the function
     Returns:
         The numbers of reactions for a comment
     """
@@ -1,23 +1,13 @@
 from datetime import datetime
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Query
 from typing import List, Optional
 
-from src.database.db import get_db
-from src.schemas import PictureResponse, PictureSearch, UserSearch, UserResponse
+from src.database.db import get_db_read
+from src.schemas import PictureResponse, UserSearchPage
 from src.repository import search as repository_search
 from src.services.auth import auth_service
-from src.database.models import User
-
-
-router = APIRouter(prefix="/search",tags=["search"])
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends
-from typing import List, Optional
-
-from src.database.db import get_db
-from src.schemas import PictureResponse
-from src.repository import search as repository_search
+from src.services.search import UserSearchService, UserPictureSearchService
 
 
 router = APIRouter(prefix="/search", tags=["search"])
@@ -28,7 +18,10 @@ async def search_pictures(
         keyword: Optional[str] = None,
         sort_by: Optional[str] = "created_at",
         sort_order: Optional[str] = "desc",
-        db: Session = Depends(get_db)
+        min_rating: Optional[float] = None,
+        skip: int = 0,
+        limit: int = 20,
+        db: AsyncSession = Depends(get_db_read)
 ):
     """
     Searches for images matching the provided keyword and returns a list of image responses.
@@ -37,66 +30,93 @@ async def search_pictures(
 
     Args:
         keyword (Optional[str]): The keyword used to filter images. Defaults to `None`.
-        sort_by (Optional[str]): The field by which results should be sorted. Possible values are "rating" or "created_at". Defaults to "created_at".
+        sort_by (Optional[str]): The field by which results should be sorted. Possible values are "relevance", "rating" or "created_at". Defaults to "created_at".
         sort_order (Optional[str]): Specifies whether results should be sorted in ascending ("asc") or descending ("desc") order. Defaults to "desc".
-        db (Session): Database session, a dependency injected by FastAPI.
+        min_rating (Optional[float]): Only return images with at least this average rating. Defaults to `None`.
+        skip (int): The number of matching images to skip. Defaults to 0.
+        limit (int): The maximum number of images to return. Defaults to 20.
+        db (AsyncSession): Database session, a dependency injected by FastAPI.
 
     Returns:
         List[PictureResponse]: A list of PictureResponse objects representing images that meet the search criteria.
     """
-    pictures = await repository_search.search_pictures(keyword=keyword, sort_by=sort_by, sort_order=sort_order, db=db)
+    pictures = await repository_search.search_pictures(keyword=keyword, sort_by=sort_by, sort_order=sort_order,
+                                                       min_rating=min_rating, skip=skip, limit=limit, db=db)
 
     return pictures
 
 
-# def search_pictures(search_params: PictureSearch, sort_by: Optional[str] = "created_at", sort_order: Optional[str] = "desc", db: Session = Depends(get_db)) -> List[PictureResponse]:
-#     """
-#     A function that searches for pictures based on the provided search parameters and returns a list of PictureResponse objects.
-    
-#     Args:
-#         search_params (PictureSearch): The search parameters used to filter the pictures.
-#         sort_by (Optional[str]): The field to sort the pictures by (default is "created_at").
-#         sort_order (Optional[str]): The order in which the pictures are sorted (default is "desc").
-#         db (Session): The database session used for the operation.
-        
-#     Returns:
-#         List[PictureResponse]: A list of PictureResponse objects that match the search criteria.
-#     """
-#     picture_search_service = PictureSearchService(db)
-#     return picture_search_service.search_pictures(search_params, sort_by, sort_order)
-
-# router.get("/pictures", response_model=List[PictureResponse])(search_pictures)
-
-#     Returns:
-#         List[PictureResponse]: A list of PictureResponse objects representing images that meet the search criteria.
-#     """
-#     pictures = await repository_search.search_pictures(keyword=keyword, sort_by=sort_by, sort_order=sort_order, db=db)
-
-def search_users(search_params: UserSearch, db: Session = Depends(get_db)) -> List[UserResponse]:
-    """
-    Perform a search for users based on the provided search parameters and return a list of UserResponse objects.
-    
-    Parameters:
-    - search_params: UserSearch object containing the parameters for the user search
-    - db: Optional Session object obtained from the get_db dependency
-    
-    Returns:
-    - List of UserResponse objects resulting from the user search
+
+@router.get("/users",
+            response_model=UserSearchPage,
+            dependencies=[Depends(auth_service.require_role(required_role="moderator"))])
+async def search_users(
+        keyword: Optional[str] = None,
+        username: Optional[str] = None,
+        email: Optional[str] = None,
+        limit: int = Query(20, ge=1),
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+        db: AsyncSession = Depends(get_db_read)
+) -> UserSearchPage:
     """
-    user_search_service = UserSearchService(db)
-    return user_search_service.search_users(search_params)
+    Searches for users by username or email. Available to moderators and administrators.
 
-router.get("/users", response_model=List[UserResponse])(search_users)
+    Results are ordered by user ID and paginated with a cursor: pass the `next_cursor` of a page
+    to get the next one.
 
+    Args:
+        keyword (Optional[str]): Return users whose username or email contains this keyword. Defaults to `None`.
+        username (Optional[str]): Return users whose username contains this value. Defaults to `None`.
+        email (Optional[str]): Return users whose email contains this value. Defaults to `None`.
+        limit (int): The maximum number of users on the page. Defaults to 20.
+        cursor (Optional[str]): The `next_cursor` of the previous page. Defaults to `None`.
+        with_total (bool): Whether to also count every matching user. Defaults to `False`.
+        db (AsyncSession): Database session, a dependency injected by FastAPI.
 
-def search_users_by_picture(user_id: Optional[int] = None, picture_id: Optional[int] = None, rating: Optional[int] = None, added_after: Optional[datetime] = None, db: Session = Depends(get_db), current_user: User = Depends(auth_service.get_current_user)) -> List[UserResponse]:
+    Returns:
+        UserSearchPage: The users on the page, the cursor of the next page and, if requested, the total.
     """
-    A function that searches for users by picture, with optional parameters for user ID, picture ID, rating, and added date. It requires a database session and the current user as dependencies. Returns a list of UserResponse objects.
+    query = UserSearchService(db).keyword(keyword).username(username).email(email)
+    return await query.page(limit=limit, cursor=cursor, with_total=with_total)
+
+
+@router.get("/user/_by_picture",
+            tags=["users"],
+            response_model=UserSearchPage,
+            dependencies=[Depends(auth_service.require_role(required_role="moderator"))])
+async def search_users_by_picture(
+        user_id: Optional[int] = None,
+        picture_id: Optional[int] = None,
+        min_rating: Optional[float] = None,
+        added_after: Optional[datetime] = None,
+        limit: int = Query(20, ge=1),
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+        db: AsyncSession = Depends(get_db_read)
+) -> UserSearchPage:
     """
-    if not (current_user.is_moderator or current_user.is_admin):
-        raise HTTPException(status_code=403, detail="User filtering is only available to moderators and administrators.")
+    Searches for users through the pictures they uploaded. Available to moderators and administrators.
 
-    user_picture_search_service = UserPictureSearchService(db)
-    return user_picture_search_service.search_users_by_picture(user_id, picture_id, rating, added_after)
+    Each matching user is returned once, with the number of their pictures that matched the filters.
+    Results are ordered by user ID and paginated with a cursor.
 
-router.get("/user/_by_picture", tags=["users"], response_model=List[UserResponse])(search_users_by_picture)
+    Args:
+        user_id (Optional[int]): Only consider pictures uploaded by this user. Defaults to `None`.
+        picture_id (Optional[int]): Only consider the picture with this ID. Defaults to `None`.
+        min_rating (Optional[float]): Only consider pictures with at least this average rating. Defaults to `None`.
+        added_after (Optional[datetime]): Only consider pictures created at or after this time. Defaults to `None`.
+        limit (int): The maximum number of users on the page. Defaults to 20.
+        cursor (Optional[str]): The `next_cursor` of the previous page. Defaults to `None`.
+        with_total (bool): Whether to also count every matching user. Defaults to `False`.
+        db (AsyncSession): Database session, a dependency injected by FastAPI.
+
+    Returns:
+        UserSearchPage: The users on the page, the cursor of the next page and, if requested, the total.
+    """
+    query = (UserPictureSearchService(db)
+             .user_id(user_id)
+             .picture_id(picture_id)
+             .min_rating(min_rating)
+             .added_after(added_after))
+    return await query.page(limit=limit, cursor=cursor, with_total=with_total)
@@ -1,15 +1,14 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
-from sqlalchemy.orm import Session
-import cloudinary
-import cloudinary.uploader
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
 from src.database.models import User, Story
 from src.schemas import StoryResponse
 from src.repository import stories as repository_stories
 from src.services.auth import auth_service
-from src.conf.cloudinary import configure_cloudinary, generate_random_string
+from src.services.storage import storage_service
+from src.conf.cloudinary import generate_random_string
 
 router = APIRouter(prefix='/stories', tags=["stories"])
 
@@ -19,17 +18,16 @@ async def upload_story(
         media_type: str = 'image',
         description: str = None,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """
     Upload a story image or video.
     """
-    configure_cloudinary()
     public_id = generate_random_string()
 
     resource_type = 'video' if media_type in ['video', 'gif', 'reel'] else 'image'
 
-    uploaded = cloudinary.uploader.upload(
+    uploaded = await storage_service.upload(
         story_image.file,
         public_id=public_id,
         folder='stories',
@@ -37,10 +35,7 @@ async def upload_story(
         resource_type=resource_type
     )
 
-    image_url = cloudinary.CloudinaryImage(
-        uploaded['public_id'],
-        resource_type=resource_type
-    ).build_url(version=uploaded.get('version'))
+    image_url = storage_service.url(uploaded['public_id'], resource_type=resource_type, version=uploaded.get('version'))
 
     return await repository_stories.create_story(
         image_url=image_url,
@@ -56,7 +51,7 @@ async def update_story(
         media_type: str,
         description: str,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """
     Update a story.
@@ -74,7 +69,7 @@ async def update_story(
 async def delete_story(
         story_id: int,
         current_user: User = Depends(auth_service.get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a story.
@@ -90,7 +85,10 @@ async def delete_story(
     return None
 
 @router.get("/", response_model=List[StoryResponse])
-async def get_stories(db: Session = Depends(get_db)):
+async def get_stories(
+        # The timeline reloads from the primary, so replica lag is never cached.
+        db: AsyncSession = Depends(get_db)
+):
     """
     Retrieve all active stories.
     """
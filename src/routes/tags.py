@@ -1,7 +1,7 @@
 from typing import List
 
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.schemas import TagModel, TagsResponseModel
 from src.repository import tags as repository_tags
@@ -13,7 +13,7 @@ router = APIRouter(prefix='/tags', tags=["tags"])
 async def add_tags(
         picture_id: int, 
         tags: List[str],
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
 ):
     """
     Create new tags in the database.
@@ -24,7 +24,7 @@ async def add_tags(
     Parameters:
     - picture_id (int): The ID of the picture to which the tags will be associated.
     - tags (List[str]): A list of tag names to be created.
-    - db (Session, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
+    - db (AsyncSession, optional): An SQLAlchemy database session instance provided by the FastAPI dependency
       injection system.
 
     Returns:
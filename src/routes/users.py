@@ -1,16 +1,15 @@
 from typing import List
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
 from fastapi_limiter.depends import RateLimiter
-from sqlalchemy.orm import Session
-import cloudinary
-import cloudinary.uploader
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.db import get_db
 from src.database.models import User
 from src.repository import users as repository_users
 from src.repository.users import get_user_by_id, list_all_users, update_user_name, ban_user, get_user_by_username
 from src.services.auth import auth_service
+from src.services.storage import storage_service
 from src.schemas import UserDb, UserUpdateName
-from src.conf.cloudinary import configure_cloudinary, generate_random_string
+from src.conf.cloudinary import generate_random_string
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -34,24 +33,22 @@ async def read_users_me(current_user: User = Depends(auth_service.get_current_us
 @router.patch('/avatar', response_model=UserDb)
 async def update_avatar_user(file: UploadFile = File(),
                              current_user: User = Depends(auth_service.get_current_user),
-                             db: Session = Depends(get_db)) -> UserDb:
+                             db: AsyncSession = Depends(get_db)) -> UserDb:
     """
     Update the avatar for the authenticated user.
 
     Args:
         file (UploadFile): Uploaded file containing the new avatar image.
         current_user (User): The authenticated user.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         UserDb: The updated user profile.
     """
-    configure_cloudinary()
     random_string = generate_random_string()
 
-    r = cloudinary.uploader.upload(file.file, public_id=f'avatars/{random_string}', overwrite=True)
-    src_url = cloudinary.CloudinaryImage(f'avatars/{random_string}') \
-        .build_url(width=250, height=250, crop='fill', version=r.get('version'))
+    r = await storage_service.upload(file.file, public_id=f'avatars/{random_string}', overwrite=True)
+    src_url = storage_service.url(r['public_id'], width=250, height=250, crop='fill', version=r.get('version'))
     user = await repository_users.update_avatar(current_user.email, src_url, db)
     return user
 
@@ -59,7 +56,7 @@ async def update_avatar_user(file: UploadFile = File(),
 @router.get('/all',
             response_model=List[UserDb],
             dependencies=[Depends(auth_service.require_role(required_role="moderator"))])
-async def read_all_users(db: Session = Depends(get_db),
+async def read_all_users(db: AsyncSession = Depends(get_db),
                          ) -> List[UserDb]:
     """
     Asynchronously retrieves all users from the database.
@@ -68,7 +65,7 @@ async def read_all_users(db: Session = Depends(get_db),
     conforming to `UserDb`. This operation is non-blocking and is performed asynchronously.
 
     Args:
-        db (Session): The database session dependency injected by FastAPI.
+        db (AsyncSession): The database session dependency injected by FastAPI.
 
     Returns:
         List[UserDb]: A list of users represented as Pydantic models.
@@ -80,7 +77,7 @@ async def read_all_users(db: Session = Depends(get_db),
 @router.patch('/update/{user_id}', response_model=UserDb)
 async def update_user_name_route(user_id: int,
                                  user_name_update: UserUpdateName,
-                                 db: Session = Depends(get_db)
+                                 db: AsyncSession = Depends(get_db)
                                  ) -> UserDb:
     """
     Asynchronously updates the name of a specific user identified by their user ID.
@@ -92,7 +89,7 @@ async def update_user_name_route(user_id: int,
     Args:
         user_id (int): The unique identifier of the user whose name is to be updated.
         user_name_update (UserUpdateName): The new name to assign to the user, received as request body.
-        db (Session): The database session dependency injected by FastAPI.
+        db (AsyncSession): The database session dependency injected by FastAPI.
 
     Returns:
         UserDb: The updated user data as a Pydantic model.
@@ -102,7 +99,7 @@ async def update_user_name_route(user_id: int,
 
 
 @router.post("/ban/{user_id}")
-async def ban_user_route(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(auth_service.get_current_user)):
+async def ban_user_route(user_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(auth_service.get_current_user)):
     """
     Ban a specific user identified by their user ID.
 
@@ -111,7 +108,7 @@ async def ban_user_route(user_id: int, db: Session = Depends(get_db), current_us
 
     Args:
         user_id (int): The unique identifier of the user to ban.
-        db (Session): The SQLAlchemy database session used to execute the ban operation.
+        db (AsyncSession): The SQLAlchemy database session used to execute the ban operation.
         current_user (User): The current authenticated user. Must be an admin.
 
     Returns:
@@ -129,7 +126,7 @@ async def ban_user_route(user_id: int, db: Session = Depends(get_db), current_us
 
 
 @router.delete("/delete_account")
-async def delete_own_account(current_user: User = Depends(auth_service.get_current_user), db: Session = Depends(get_db)):
+async def delete_own_account(current_user: User = Depends(auth_service.get_current_user), db: AsyncSession = Depends(get_db)):
     """
     Delete the authenticated user's own account.
 
@@ -137,29 +134,31 @@ async def delete_own_account(current_user: User = Depends(auth_service.get_curre
 
     Args:
         current_user (User): The authenticated user.
-        db (Session): The SQLAlchemy database session used to execute the delete operation.
+        db (AsyncSession): The SQLAlchemy database session used to execute the delete operation.
 
     Returns:
         dict: A confirmation message indicating successful deletion.
     """
     try:
 
-        db.delete(current_user)
-        db.commit()
-        
+        user = await db.get(User, current_user.id)
+        await db.delete(user)
+        await db.commit()
+        await auth_service.invalidate_user(user.email)
+
         return {"message": "Your account has been successfully deleted."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/name/{username}", response_model=UserDb)
-async def read_user_by_username(username: str, db: Session = Depends(get_db)) -> UserDb:
+async def read_user_by_username(username: str, db: AsyncSession = Depends(get_db)) -> UserDb:
     """
     Read the user's profile by their unique username.
 
     Args:
         username (str): The unique username of the user.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         UserDb: The user's profile as a Pydantic model.
@@ -173,7 +172,7 @@ async def read_user_by_username(username: str, db: Session = Depends(get_db)) ->
 
 @router.get('/{user_id}', response_model=UserDb)
 async def read_user(user_id: int,
-                    db: Session = Depends(get_db)
+                    db: AsyncSession = Depends(get_db)
                     ) -> UserDb:
     """
     Asynchronously retrieves a user by their ID from the database.
@@ -183,7 +182,7 @@ async def read_user(user_id: int,
 
     Args:
         user_id (int): The unique identifier of the user to retrieve.
-        db (Session): The database session dependency injected by FastAPI.
+        db (AsyncSession): The database session dependency injected by FastAPI.
 
     Returns:
         UserDb: The requested user's data as a Pydantic model.
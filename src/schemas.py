@@ -36,6 +36,29 @@ class UserResponse(BaseModel):
     detail: str = "User successfully created"
 
 
+class UserSearchResponse(BaseModel):
+    """
+    Schema for a user found by a moderator search.
+    """
+    id: int
+    username: str
+    email: str
+    avatar: str | None
+    picture_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class UserSearchPage(BaseModel):
+    """
+    Schema for one page of user search results.
+    """
+    items: List[UserSearchResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
 class UserSearch(UserModel):
     id: Optional[List[int]] | None
     username: Optional[List[str]] | None
@@ -109,6 +132,9 @@ class TagModel(BaseModel):
     id: int
     name: str
 
+    class Config:
+        from_attributes = True
+
 
 class TagsResponseModel(BaseModel):
     """
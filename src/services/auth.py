@@ -1,13 +1,13 @@
 from typing import Optional, Dict, Union, Callable, Literal
 
-import redis as redis
 from jose import JWTError, jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-import pickle
+import hashlib
+import time
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from starlette.requests import Request
 
@@ -15,13 +15,70 @@ from src.database.db import get_db
 from src.database.models import User
 from src.repository import users as repository_users
 
+from src.services.cache import MemoryCache, RedisCache, RedisVersions
+from src.services.passwords import password_service
 from src.services.secrets_manager import SecretsManager
 
-REDIS_HOST = SecretsManager.get_secret("REDIS_HOST")
-REDIS_PORT = SecretsManager.get_secret("REDIS_PORT")
-REDIS_PASSWORD = SecretsManager.get_secret("REDIS_PASSWORD")
 SECRET_KEY = SecretsManager.get_secret("SECRET_KEY")
 ALGORITHM = SecretsManager.get_secret("ALGORITHM")
+USER_CACHE_TTL = int(SecretsManager.get_secret("USER_CACHE_TTL"))
+SESSION_CACHE_TTL = float(SecretsManager.get_secret("SESSION_CACHE_TTL"))
+SESSION_CACHE_SIZE = int(SecretsManager.get_secret("SESSION_CACHE_SIZE"))
+TOKEN_CACHE_TTL = float(SecretsManager.get_secret("TOKEN_CACHE_TTL"))
+TOKEN_CACHE_SIZE = int(SecretsManager.get_secret("TOKEN_CACHE_SIZE"))
+
+# Bump when the fields of the cached user record change, so records written by older code are
+# treated as misses instead of being read with the wrong shape.
+USER_RECORD_VERSION = 2
+USER_RECORD_FIELDS = ("id", "username", "email", "avatar", "confirmed", "admin", "moderator", "ban_status")
+USER_RECORD_DATETIMES = ("created_at", "last_bereal_post_at")
+
+
+def token_fingerprint(token: str) -> str:
+    """
+    Key a cache by token without keeping the token itself in memory.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def user_to_record(user: User) -> dict:
+    """
+    Serialize the fields authentication and authorization need from a user.
+
+    Args:
+        user (User): The user loaded from the database.
+
+    Returns:
+        dict: A JSON-serializable record tagged with `USER_RECORD_VERSION`.
+    """
+    record = {field: getattr(user, field) for field in USER_RECORD_FIELDS}
+    for field in USER_RECORD_DATETIMES:
+        value = getattr(user, field)
+        record[field] = value.isoformat() if value else None
+    record["v"] = USER_RECORD_VERSION
+    return record
+
+
+def user_from_record(record: dict) -> User | None:
+    """
+    Rebuild a detached user from a cached record.
+
+    Only the recorded fields are set; the others are unloaded, so reading them raises instead of
+    returning stale or empty values.
+
+    Args:
+        record (dict): A record produced by `user_to_record`.
+
+    Returns:
+        User | None: The user, or None if the record was written with another schema version.
+    """
+    if record.get("v") != USER_RECORD_VERSION:
+        return None
+    user = User(**{field: record[field] for field in USER_RECORD_FIELDS})
+    for field in USER_RECORD_DATETIMES:
+        setattr(user, field, datetime.fromisoformat(record[field]) if record[field] else None)
+    make_transient_to_detached(user)
+    return user
 
 
 class Auth:
@@ -29,32 +86,38 @@ class Auth:
     Authentication service class.
 
     Attributes:
-        pwd_context (CryptContext): Password hashing context.
+        password_service (PasswordService): Hashes and verifies passwords off the event loop.
         SECRET_KEY (str): Secret key for token encoding and decoding.
         ALGORITHM (str): Algorithm used for token encoding and decoding.
         oauth2_scheme (OAuth2PasswordBearer): OAuth2 password bearer for token retrieval.
-        r (redis.Redis): Redis instance for caching user data.
+        user_cache (RedisCache): Records of authenticated users by email.
+        session_cache (MemoryCache): Records of the users of HTML sessions, with the version of
+            the user they were read at, by refresh token fingerprint, local to the worker.
+        user_versions (RedisVersions): Versions of users by email, bumped by `invalidate_user` to
+            invalidate `session_cache` entries on every worker.
+        token_cache (MemoryCache): Claims of verified tokens by token fingerprint, local to the
+            worker.
     """
 
-    def __init__(self, db: Session = Depends(get_db)):
+    def __init__(self, db: AsyncSession = Depends(get_db)):
         """
         Initializes the Auth class with a database session.
 
         Args:
-            db (Session): A SQLAlchemy Session instance.
+            db (AsyncSession): A SQLAlchemy Session instance.
         """
         self.db = db
 
-    pwd_context = CryptContext(schemes=["bcrypt"],
-                               deprecated="auto")
+    password_service = password_service
     SECRET_KEY = SECRET_KEY
     ALGORITHM = ALGORITHM
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
-    r = redis.Redis(host=REDIS_HOST,
-                    port=REDIS_PORT,
-                    password=REDIS_PASSWORD)
+    user_cache = RedisCache("auth_user", ttl=USER_CACHE_TTL)
+    session_cache = MemoryCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL)
+    user_versions = RedisVersions("auth_user_version")
+    token_cache = MemoryCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """
         Verify the plain password against the hashed password.
 
@@ -65,9 +128,9 @@ class Auth:
         Returns:
             bool: True if passwords match, False otherwise.
         """
-        return self.pwd_context.verify(plain_password, hashed_password)
+        return await self.password_service.verify(plain_password, hashed_password)
 
-    def get_password_hash(self, password: str) -> str:
+    async def get_password_hash(self, password: str) -> str:
         """
         Generate a hashed password.
 
@@ -77,12 +140,31 @@ class Auth:
         Returns:
             str: The hashed password.
         """
-        return self.pwd_context.hash(password)
+        return await self.password_service.hash(password)
+
+    async def authenticate_password(self, user: User, password: str, db: AsyncSession) -> bool:
+        """
+        Verify a login password, rehashing it if the user's hash was made with another cost.
+
+        Args:
+            user (User): The user logging in.
+            password (str): The plain text password.
+            db (AsyncSession): The session the user was loaded with.
 
-    async def upgrade_password(self, user: User, password: str, db: Session) -> None:
-        password_hash = self.get_password_hash(password)
+        Returns:
+            bool: True if the password matches.
+        """
+        valid, new_hash = await self.password_service.verify_and_update(password, user.password)
+        if valid and new_hash:
+            user.password = new_hash
+            await db.commit()
+        return valid
+
+    async def upgrade_password(self, user: User, password: str, db: AsyncSession) -> None:
+        password_hash = await self.get_password_hash(password)
         user.password = password_hash
-        db.commit()
+        await db.commit()
+        await self.invalidate_user(user.email)
 
     def create_access_token(self, data: Dict[str, Union[str, int]], expires_delta: Optional[float] = None) -> str:
         """
@@ -124,6 +206,32 @@ class Auth:
         encoded_refresh_token = jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
         return encoded_refresh_token
 
+    def decode_token(self, token: str) -> dict:
+        """
+        Verify a token and return its claims.
+
+        The claims of a token never change, so verified tokens are kept in `token_cache` until they
+        expire, and a token sent again skips the signature check and JSON parsing. Only tokens that
+        verified are cached; invalid ones are checked on every call.
+
+        Args:
+            token (str): The encoded token.
+
+        Returns:
+            dict: The verified claims.
+
+        Raises:
+            JWTError: If the signature is invalid or the token has expired.
+        """
+        fingerprint = token_fingerprint(token)
+        claims = self.token_cache.get(fingerprint)
+        if claims is None:
+            claims = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            # `exp` is compared with the clock the same way `jwt.decode` does.
+            lifetime = claims["exp"] - time.time() if "exp" in claims else None
+            self.token_cache.set(fingerprint, claims, ttl=lifetime)
+        return claims
+
     async def decode_refresh_token(self, refresh_token: str) -> str:
         """
         Decode a refresh token.
@@ -138,7 +246,7 @@ class Auth:
             HTTPException: If decoding fails or the token scope is invalid.
         """
         try:
-            payload = jwt.decode(refresh_token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            payload = self.decode_token(refresh_token)
             if payload['scope'] == 'refresh_token':
                 email = payload['sub']
                 return email
@@ -147,28 +255,28 @@ class Auth:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate credentials')
 
     async def get_current_user(
-        self, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-    ) -> Dict:
+        self, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+    ) -> User:
         """
         Validate user credentials and return the user.
 
         This function uses the JWT token to authenticate the user
         and retrieve their data from the database if it's not
-        already cached in Redis.
+        already cached in Redis. A cached user is detached and
+        carries only the fields in `USER_RECORD_FIELDS`.
 
         The function also checks if the user is banned and raises
         an HTTPException if they are.
 
         Args:
             token (str, optional): The JWT token. Defaults to Depends(oauth2_scheme).
-            db (Session, optional): The database session. Defaults to Depends(get_db).
+            db (AsyncSession, optional): The database session. Defaults to Depends(get_db).
 
         Raises:
             HTTPException: If the token is invalid or the user is banned.
 
         Returns:
-            Dict: The
- user data.
+            User: The user data.
         """
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -176,7 +284,7 @@ class Auth:
             headers={"WWW-Authenticate": "Bearer"},
         )
         try:
-            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            payload = self.decode_token(token)
             if payload["scope"] != "access_token":
                 raise credentials_exception
             email = payload["sub"]
@@ -186,32 +294,85 @@ class Auth:
         except JWTError as e:
             raise credentials_exception
 
-
-        user = self.r.get(f"user:{email}")
+        record = await self.user_cache.get(email)
+        user = user_from_record(record) if record else None
 
         if user is None:
-
             user = await repository_users.get_user_by_email(email, db)
             if user is None:
                 raise credentials_exception
-            self.r.set(f"user:{email}", pickle.dumps(user))
-            self.r.expire(f"user:{email}", 900)
-        else:
-            user = pickle.loads(user)
+            await self.user_cache.set(email, user_to_record(user))
         if user.ban_status:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You have been banned")
 
         return user
 
+    async def invalidate_user(self, email: str) -> None:
+        """
+        Drop the cached records of a user. Called after committing a change to the user's
+        profile, credentials, roles or ban status, or deleting the user, so the next request reads
+        them from the database.
+
+        Bumping the user's version invalidates the session cache entries of every worker; only
+        when Redis is unavailable do other workers keep serving them, for at most `SESSION_CACHE_TTL`.
+
+        Args:
+            email (str): Email address of the user.
+        """
+        await self.user_cache.delete(email)
+        await self.user_versions.bump(email)
+        self.session_cache.delete_where(lambda entry: entry["record"]["email"] == email)
+
+    async def get_current_user_optional(self, request: Request,
+                                        db: AsyncSession = Depends(get_db)) -> User | None:
+        """
+        Resolve the user of an HTML session from the refresh token cookie.
+
+        The user is resolved once per request and kept in `request.state.user`. Across requests the
+        record is served from `session_cache` for up to `SESSION_CACHE_TTL` seconds, and never past
+        the expiry of the token, as long as the user's version in `user_versions` is unchanged. Most
+        page views thus cost one Redis read instead of decoding the token and querying the database.
+        Without Redis, every view reads the database. The returned user is detached and carries the
+        fields in `USER_RECORD_FIELDS` and `USER_RECORD_DATETIMES`.
+
+        Args:
+            request (Request): The incoming request.
+            db (AsyncSession, optional): The database session. Defaults to Depends(get_db).
+
+        Returns:
+            User | None: The user, or None if there is no session or its user no longer exists.
+
+        Raises:
+            HTTPException: If the refresh token is invalid.
+        """
+        if hasattr(request.state, "user"):
+            return request.state.user
 
-    async def get_current_user_optional(self, request: Request, db: Session = Depends(get_db)):
+        user = None
         refresh_token = request.cookies.get("refresh_token", None)
         if refresh_token:
-            user_email = await auth_service.decode_refresh_token(refresh_token)
-            user = db.query(User).filter(User.email == user_email).first()
-            return user
-
-        return None
+            fingerprint = token_fingerprint(refresh_token)
+            entry = self.session_cache.get(fingerprint)
+            if entry and entry["version"] == await self.user_versions.get(entry["record"]["email"]):
+                user = user_from_record(entry["record"])
+            if user is None:
+                user_email = await self.decode_refresh_token(refresh_token)
+                # Read before the user, so an invalidation committed meanwhile changes it.
+                version = await self.user_versions.get(user_email)
+                user = await repository_users.get_user_by_email(user_email, db)
+                if user is not None:
+                    # Handlers get a detached user on hits and misses alike.
+                    record = user_to_record(user)
+                    if version is not None:
+                        # Verified above, so the claims come from `token_cache`.
+                        expires = self.decode_token(refresh_token).get("exp")
+                        lifetime = SESSION_CACHE_TTL if expires is None else min(SESSION_CACHE_TTL,
+                                                                                 expires - time.time())
+                        self.session_cache.set(fingerprint, {"version": version, "record": record}, ttl=lifetime)
+                    user = user_from_record(record)
+
+        request.state.user = user
+        return user
 
     def create_email_token(self, data: Dict[str, Union[str, int]]) -> str:
         """
@@ -299,7 +460,7 @@ class Auth:
             HTTPException: If the token is invalid or could not be verified.
         """
         try:
-            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            payload = self.decode_token(token)
             email = payload["sub"]
             return email
         except JWTError as e:
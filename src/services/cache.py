@@ -0,0 +1,340 @@
+"""
+Read-through caches of JSON values in Redis, a Redis timeline of recent entries, version counters
+that invalidate in-process caches across workers, and a small in-process cache for values read on
+nearly every request.
+
+The caches are an optimization only: when Redis is unreachable, reads miss and writes are skipped,
+so requests fall back to the database instead of failing.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from src.services.secrets_manager import SecretsManager
+
+REDIS_HOST = SecretsManager.get_secret("REDIS_HOST")
+REDIS_PORT = SecretsManager.get_secret("REDIS_PORT")
+REDIS_PASSWORD = SecretsManager.get_secret("REDIS_PASSWORD")
+PICTURE_CACHE_TTL = int(SecretsManager.get_secret("PICTURE_CACHE_TTL"))
+STORY_CACHE_TTL = int(SecretsManager.get_secret("STORY_CACHE_TTL"))
+REACTION_COUNTS_CACHE_TTL = int(SecretsManager.get_secret("REACTION_COUNTS_CACHE_TTL"))
+
+logger = logging.getLogger(__name__)
+
+redis_client = redis.Redis(host=REDIS_HOST,
+                           port=REDIS_PORT,
+                           password=REDIS_PASSWORD,
+                           decode_responses=True)
+
+
+class RedisCache:
+    """
+    Cache of JSON-serializable values under `<prefix>:<name>` keys.
+
+    Attributes:
+        prefix (str): Namespace of the keys of this cache.
+        ttl (int): Seconds after which an entry expires, bounding how long a missed invalidation
+            can serve stale data.
+        client (redis.Redis): Async Redis client with `decode_responses=True`.
+    """
+
+    def __init__(self, prefix: str, ttl: int, client: redis.Redis = redis_client):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.client = client
+
+    def key(self, name) -> str:
+        return f"{self.prefix}:{name}"
+
+    async def get_many(self, names: Iterable) -> dict:
+        """
+        Read several entries with one MGET.
+
+        Args:
+            names (Iterable): Names of the entries.
+
+        Returns:
+            dict: The cached values by name; names that are not cached are left out.
+        """
+        names = list(names)
+        if not names:
+            return {}
+        try:
+            values = await self.client.mget([self.key(name) for name in names])
+        except RedisError as error:
+            logger.warning("redis cache %s unavailable: %s", self.prefix, error)
+            return {}
+        return {name: json.loads(value) for name, value in zip(names, values) if value is not None}
+
+    async def get(self, name) -> Any:
+        return (await self.get_many([name])).get(name)
+
+    async def set_many(self, values: dict) -> None:
+        """
+        Store several entries, each with the cache's TTL, in one round trip.
+
+        Args:
+            values (dict): Values by name.
+        """
+        if not values:
+            return
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for name, value in values.items():
+                    pipe.set(self.key(name), json.dumps(value), ex=self.ttl)
+                await pipe.execute()
+        except RedisError as error:
+            logger.warning("redis cache %s unavailable: %s", self.prefix, error)
+
+    async def set(self, name, value) -> None:
+        await self.set_many({name: value})
+
+    async def delete(self, *names) -> None:
+        """
+        Invalidate entries. Called after the change they depend on is committed.
+
+        Args:
+            *names: Names of the entries.
+        """
+        if not names:
+            return
+        try:
+            await self.client.delete(*(self.key(name) for name in names))
+        except RedisError as error:
+            logger.warning("redis cache %s unavailable: %s", self.prefix, error)
+
+
+class RedisTimeline:
+    """
+    JSON entries in Redis that drop out once they are older than a fixed window: a sorted set of
+    entry ids scored by their Unix time, next to a hash of the entries by id.
+
+    Entries older than the window are trimmed on every read, so they expire on their own. The whole
+    timeline is reloaded from the database every `ttl` seconds, which bounds how long a missed
+    update, or a change to data copied into the entries, can serve stale data.
+
+    Attributes:
+        prefix (str): Namespace of the keys of this timeline.
+        window (float): Seconds an entry stays in the timeline.
+        ttl (int): Seconds after which the timeline has to be reloaded.
+        client (redis.Redis): Async Redis client with `decode_responses=True`.
+    """
+
+    def __init__(self, prefix: str, window: float, ttl: int, client: redis.Redis = redis_client):
+        self.prefix = prefix
+        self.window = window
+        self.ttl = ttl
+        self.client = client
+
+    @property
+    def ids_key(self) -> str:
+        return f"{self.prefix}:ids"
+
+    @property
+    def entries_key(self) -> str:
+        return f"{self.prefix}:entries"
+
+    @property
+    def loaded_key(self) -> str:
+        return f"{self.prefix}:loaded"
+
+    async def recent(self) -> list | None:
+        """
+        Read the entries of the window, newest first, in two round trips.
+
+        Returns:
+            list | None: The entries, or None if the timeline has to be loaded or Redis is
+                unavailable.
+        """
+        start = time.time() - self.window
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.exists(self.loaded_key)
+                pipe.zremrangebyscore(self.ids_key, "-inf", f"({start}")
+                pipe.zrevrangebyscore(self.ids_key, "+inf", start)
+                loaded, _, ids = await pipe.execute()
+            if not loaded:
+                return None
+            values = await self.client.hmget(self.entries_key, ids) if ids else []
+        except RedisError as error:
+            logger.warning("redis timeline %s unavailable: %s", self.prefix, error)
+            return None
+        return [json.loads(value) for value in values if value is not None]
+
+    async def load(self, entries: Iterable[tuple[Any, float, Any]]) -> None:
+        """
+        Replace the timeline with the entries read from the database, atomically.
+
+        `add` and `remove` calls made between the database read and this call are overwritten,
+        until the next load; read from the primary just before loading to keep that window short.
+
+        Args:
+            entries (Iterable[tuple[Any, float, Any]]): (id, Unix time, value) of each entry.
+        """
+        entries = list(entries)
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.delete(self.ids_key, self.entries_key)
+                if entries:
+                    pipe.zadd(self.ids_key, {entry_id: score for entry_id, score, _ in entries})
+                    pipe.hset(self.entries_key,
+                              mapping={entry_id: json.dumps(value) for entry_id, _, value in entries})
+                pipe.set(self.loaded_key, 1, ex=self.ttl)
+                await pipe.execute()
+        except RedisError as error:
+            logger.warning("redis timeline %s unavailable: %s", self.prefix, error)
+
+    async def add(self, entry_id, score: float, value) -> None:
+        """
+        Add or replace an entry. Called after the change it reflects is committed.
+
+        Args:
+            entry_id: Id of the entry.
+            score (float): Unix time of the entry, from which its window is counted.
+            value: The JSON-serializable entry.
+        """
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.hset(self.entries_key, entry_id, json.dumps(value))
+                pipe.zadd(self.ids_key, {entry_id: score})
+                await pipe.execute()
+        except RedisError as error:
+            logger.warning("redis timeline %s unavailable: %s", self.prefix, error)
+
+    async def remove(self, entry_id) -> None:
+        """
+        Remove an entry. Called after the deletion is committed.
+
+        Args:
+            entry_id: Id of the entry.
+        """
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.zrem(self.ids_key, entry_id)
+                pipe.hdel(self.entries_key, entry_id)
+                await pipe.execute()
+        except RedisError as error:
+            logger.warning("redis timeline %s unavailable: %s", self.prefix, error)
+
+
+class RedisVersions:
+    """
+    Version counters under `<prefix>:<name>` keys, bumped whenever what they version changes.
+
+    An in-process cache stores the version it read before loading each entry and compares it on a
+    hit, so a bump made by any worker invalidates the entry on all of them.
+
+    Attributes:
+        prefix (str): Namespace of the keys of the counters.
+        client (redis.Redis): Async Redis client with `decode_responses=True`.
+    """
+
+    def __init__(self, prefix: str, client: redis.Redis = redis_client):
+        self.prefix = prefix
+        self.client = client
+
+    def key(self, name) -> str:
+        return f"{self.prefix}:{name}"
+
+    async def get(self, name) -> int | None:
+        """
+        Read a version; a counter never bumped is at 0.
+
+        Returns:
+            int | None: The version, or None if Redis is unavailable.
+        """
+        try:
+            value = await self.client.get(self.key(name))
+        except RedisError as error:
+            logger.warning("redis versions %s unavailable: %s", self.prefix, error)
+            return None
+        return int(value or 0)
+
+    async def bump(self, name) -> None:
+        """
+        Increment a version. Called after the change it reflects is committed.
+        """
+        try:
+            await self.client.incr(self.key(name))
+        except RedisError as error:
+            logger.warning("redis versions %s unavailable: %s", self.prefix, error)
+
+
+class MemoryCache:
+    """
+    Bounded in-process LRU cache whose entries expire.
+
+    Each worker process has its own copy, so an invalidation only reaches the worker that made it;
+    keep `ttl` short for values other workers may change.
+
+    Attributes:
+        maxsize (int): Number of entries kept; the least recently used one is evicted first.
+        ttl (float): Seconds after which an entry expires.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that found no live entry.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, name) -> Any:
+        entry = self._entries.get(name)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[name]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(name)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, name, value, ttl: float | None = None) -> None:
+        """
+        Store an entry, evicting the least recently used one when the cache is full.
+
+        Args:
+            name: Key of the entry.
+            value: The value; None cannot be told apart from a miss.
+            ttl (float | None): Seconds the entry lives if shorter than the cache's TTL.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._entries[name] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(name)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, name) -> None:
+        self._entries.pop(name, None)
+
+    def delete_where(self, predicate: Callable[[Any], bool]) -> None:
+        """
+        Invalidate the entries whose value matches a predicate. Scans the whole cache, so use it for
+        rare changes only.
+        """
+        for name in [name for name, (_, value) in self._entries.items() if predicate(value)]:
+            del self._entries[name]
+
+    def stats(self) -> dict:
+        """
+        Hit and miss counts since startup, and the number of entries held, including expired ones
+        not yet evicted.
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# View model of the picture detail page by picture id. Shared by the repositories that change what
+# the page shows, which invalidate it after committing.
+picture_detail_cache = RedisCache("picture_detail", ttl=PICTURE_CACHE_TTL)
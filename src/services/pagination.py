@@ -0,0 +1,74 @@
+import base64
+import binascii
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """
+    Encode a keyset position into an opaque, URL-safe cursor.
+
+    Args:
+        created_at (datetime): Creation timestamp of the last item on the page.
+        item_id (int): Primary key of the last item on the page.
+
+    Returns:
+        str: The encoded cursor.
+    """
+    raw = f"{created_at.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor received from the client.
+
+    Returns:
+        tuple[datetime, int]: The creation timestamp and primary key of the last item already seen.
+
+    Raises:
+        HTTPException: A 400 error if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def encode_id_cursor(item_id: int) -> str:
+    """
+    Encode the primary key of the last item on a page into an opaque cursor.
+
+    Args:
+        item_id (int): Primary key of the last item on the page.
+
+    Returns:
+        str: The encoded cursor.
+    """
+    return base64.urlsafe_b64encode(str(item_id).encode()).decode().rstrip("=")
+
+
+def decode_id_cursor(cursor: str) -> int:
+    """
+    Decode a cursor produced by `encode_id_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor received from the client.
+
+    Returns:
+        int: The primary key of the last item already seen.
+
+    Raises:
+        HTTPException: A 400 error if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
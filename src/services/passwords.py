@@ -0,0 +1,99 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from passlib.context import CryptContext
+
+from src.services.secrets_manager import SecretsManager
+
+PASSWORD_HASH_ROUNDS = int(SecretsManager.get_secret("PASSWORD_HASH_ROUNDS"))
+PASSWORD_HASH_WORKERS = int(SecretsManager.get_secret("PASSWORD_HASH_WORKERS"))
+
+
+class PasswordService:
+    """
+    Hashes and verifies passwords with bcrypt off the event loop.
+
+    A bcrypt hash at the default cost takes a few hundred milliseconds of CPU. Run inside an
+    `async def` handler, every login or registration would stall all other requests on the worker
+    for that long, so the work runs on a bounded thread pool instead; bcrypt releases the GIL while
+    hashing. The pool size caps how many hashes run at once, so a login storm queues up instead of
+    starving the rest of the application.
+
+    Hashes made with another cost than `rounds` still verify, and are reported for rehashing, so
+    changing the cost upgrades stored passwords as users log in.
+
+    Attributes:
+        context (CryptContext): The bcrypt context, for synchronous use outside request handling.
+        max_workers (int): The maximum number of hashes computed at the same time.
+    """
+
+    def __init__(self, rounds: int, max_workers: int):
+        self.context = CryptContext(schemes=["bcrypt"],
+                                    deprecated="auto",
+                                    bcrypt__default_rounds=rounds,
+                                    bcrypt__min_rounds=rounds,
+                                    bcrypt__max_rounds=rounds)
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="passwords")
+        return self._executor
+
+    async def run(self, func: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args))
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured cost.
+
+        Args:
+            password (str): The plain text password.
+
+        Returns:
+            str: The bcrypt hash.
+        """
+        return await self.run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        Verify a password against a hash.
+
+        Args:
+            password (str): The plain text password.
+            hashed_password (str): The stored hash.
+
+        Returns:
+            bool: True if the password matches.
+        """
+        return await self.run(self.context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """
+        Verify a password and rehash it if the stored hash uses another cost.
+
+        Args:
+            password (str): The plain text password.
+            hashed_password (str): The stored hash.
+
+        Returns:
+            tuple[bool, str | None]: Whether the password matches, and the hash to store instead of
+                `hashed_password`, or None if it is up to date.
+        """
+        return await self.run(self.context.verify_and_update, password, hashed_password)
+
+    def shutdown(self) -> None:
+        """
+        Wait for running hashes to finish and release the thread pool.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_service = PasswordService(rounds=PASSWORD_HASH_ROUNDS, max_workers=PASSWORD_HASH_WORKERS)
@@ -1,22 +1,46 @@
-import cloudinary.uploader
 import qrcode
 import io
-from src.conf.cloudinary import configure_cloudinary, generate_random_string
+from urllib.parse import urlsplit
+from src.conf.cloudinary import generate_random_string
+from src.services.secrets_manager import SecretsManager
+from src.services.storage import storage_service
 from fastapi import HTTPException, status
 
+PUBLIC_BASE_URL = SecretsManager.get_secret("PUBLIC_BASE_URL")
+
+
+def qr_target(url: str, base_url: str | None = None) -> str:
+    """
+    Make the URL a QR code points to absolute, as a scanner cannot open a path such as the
+    `/media/...` URLs of local storage. Relative URLs are resolved against PUBLIC_BASE_URL.
+
+    Raises:
+        ValueError: If the URL is relative and no base URL is configured.
+    """
+    if urlsplit(url).scheme:
+        return url
+    base_url = PUBLIC_BASE_URL if base_url is None else base_url
+    if not base_url:
+        raise ValueError(f"QR codes need an absolute URL; set PUBLIC_BASE_URL to serve {url}")
+    return f"{base_url.rstrip('/')}/{url.lstrip('/')}"
+
+
+def render_qr(url: str) -> io.BytesIO:
+    """Render a QR code for the URL as an in-memory JPEG."""
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(url)
+    qr.make(fit=True)
+    qr_img = qr.make_image(fill_color="black", back_color="white")
+    qr_bytes = io.BytesIO()
+    qr_img.save(qr_bytes, format='JPEG')
+    qr_bytes.seek(0)
+    return qr_bytes
+
+
 async def generate_qr_and_upload_to_cloudinary(url: str, picture: dict = None, version: str = None) -> str:
     
-    configure_cloudinary()
-    random_string = generate_random_string()
-
     try:
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(url)
-        qr.make(fit=True)
-        qr_img = qr.make_image(fill_color="black", back_color="white")
-        qr_bytes = io.BytesIO()
-        qr_img.save(qr_bytes, format='JPEG')
-        qr_bytes.seek(0)
+        qr_bytes = await storage_service.run(render_qr, qr_target(url))
 
         if picture:
             picture_folder = picture['folder']
@@ -24,15 +48,15 @@ async def generate_qr_and_upload_to_cloudinary(url: str, picture: dict = None, v
             picture_name = picture_public_id.replace(picture_folder + "/", "")
             version = version or picture['version']
 
-            qr_upload = cloudinary.uploader.upload(qr_bytes, folder='qr_code', public_id=picture_name, version=version, overwrite=True)
+            qr_upload = await storage_service.upload(qr_bytes, folder='qr_code', public_id=picture_name, version=version, overwrite=True)
             qr_public_id = qr_upload['public_id']
 
-            qr_url = cloudinary.CloudinaryImage(qr_public_id).build_url(version=version)
+            qr_url = storage_service.url(qr_public_id, version=version)
         else:
             picture_name = generate_random_string()
-            qr_upload = cloudinary.uploader.upload(qr_bytes, folder='profile_qr_code', public_id=picture_name, overwrite=True)
+            qr_upload = await storage_service.upload(qr_bytes, folder='profile_qr_code', public_id=picture_name, overwrite=True)
             qr_public_id = qr_upload['public_id']
-            qr_url = cloudinary.CloudinaryImage(qr_public_id).build_url(version=qr_upload['version'])
+            qr_url = storage_service.url(qr_public_id, version=qr_upload['version'])
             
         return qr_url
 
@@ -1,146 +1,203 @@
-from sqlalchemy import or_, func
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import OAuth2PasswordBearer
-from typing import List, Optional, Dict
+from abc import ABC, abstractmethod
 from datetime import datetime
+from typing import Optional, Self
 
-from src.database.models import Picture, Tag, User
-from src.database.db import get_db
-from src.schemas import PictureResponse, PictureSearch, UserResponse, UserSearch
-from src.services.auth import Auth
+from sqlalchemy import Select, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.database.models import Picture, User
+from src.repository.search import SEARCH_MAX_LIMIT
+from src.services.pagination import encode_id_cursor, decode_id_cursor
 
-get_current_user = Auth.get_current_user
 
+class SearchQuery(ABC):
+    """
+    Immutable, composable search query with keyset pagination.
 
-router = APIRouter(tags=["search"])
-    
-    
-class PictureSearchService:
-    def __init__(self, db: Session):
-        self.db = db
-
-    def search_pictures(self, search_params: PictureSearch, rating: Optional[int] = None, added_after: Optional[datetime] = None, sort_by: Optional[str] = "created_at", sort_order: Optional[str] = "desc") -> List[PictureResponse]:
-        query = self.db.query(Picture)
-
-        self._apply_keyword_filter(query, search_params)
-        self._apply_tag_filter(query, search_params)
-        self._apply_rating_filter(query, rating)
-        self._apply_added_after_filter(query, added_after)
-        self._apply_sorting(query, sort_by, sort_order)
-
-        pictures = query.all()
-        pydantic_pictures = [picture.to_pydantic() for picture in pictures]
-
-        return pydantic_pictures
-
-    def _apply_keyword_filter(self, query, search_params):
-        if search_params.keywords:
-            query = query.filter(Picture.description.ilike(f"%{search_params.keywords}%"))
-
-    def _apply_tag_filter(self, query, search_params):
-        if search_params.tags:
-            tag_query = self.db.query(Tag)
-            tag_ids = [tag.id for tag in tag_query.filter(Tag.name.in_(search_params.tags)).all()]
-            query = query.join(Picture.tags).filter(Tag.id.in_(tag_ids))
-
-    def _apply_rating_filter(self, query, rating):
-        if rating is not None:
-            query = query.filter(Picture.rating >= rating)
+    Every filter method returns a new query wrapping a new `Select`; the receiver is never
+    modified, so a partially filtered query can be shared and extended freely. Subclasses
+    define the base statement, the keyset order and how rows are turned into results.
 
-    def _apply_added_after_filter(self, query, added_after):
-        if added_after is not None:
-            query = query.filter(Picture.created_at >= added_after)
+    Attributes:
+        db (AsyncSession): The database session used to execute the query.
+        statement (Select): The filtered statement, without ordering or limits.
+    """
 
-    def _apply_sorting(self, query, sort_by, sort_order):
-        if sort_by not in ["rating", "created_at"]:
-            sort_by = "created_at"
-
-        if sort_order not in ["asc", "desc"]:
-            sort_order = "desc"
-
-        query = query.order_by(getattr(Picture, sort_by).desc() if sort_order == "desc" else getattr(Picture, sort_by))
-
-
-class UserSearchService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, statement: Optional[Select] = None):
         self.db = db
-
-    def search_users(self, search_params: UserSearch, username: Optional[str] = None, email: Optional[str] = None) -> List[UserResponse]:
-        query = self.db.query(User)
-
-        self._apply_keyword_filter(query, search_params)
-        self._apply_username_filter(query, username)
-        self._apply_email_filter(query, email)
-
-        users = query.all()
-        pydantic_users = [
-            UserResponse(
-                id=user.id,
-                username=user.username,
-                email=user.email,
-                avatar=user.avatar,
-                picture_count=len(user.pictures),
-            ) for user in users
-        ]
-
-        return pydantic_users
-
-    def _apply_keyword_filter(self, query, search_params):
-        if search_params.keywords:
-            query = query.filter(
-                or_(User.username.ilike(f"%{search_params.keywords}%"), User.email.ilike(f"%{search_params.keywords}%"))
-            )
-
-    def _apply_username_filter(self, query, username):
-        if username:
-            query = query.filter(User.username.ilike(f"%{username}%"))
-
-    def _apply_email_filter(self, query, email):
-        if email:
-            query = query.filter(User.email.ilike(f"%{email}%"))
-
-
-class UserPictureSearchService:
-    def __init__(self, db: Session):
-        self.db = db
-
-    def search_users_by_picture(self, user_id: Optional[int] = None, picture_id: Optional[int] = None, rating: Optional[int] = None, added_after: Optional[datetime] = None) -> List[UserResponse]:
-        query = self.db.query(Picture.user_id, func.count(Picture.id).label("picture_count"))
-
-        self._apply_user_id_filter(query, user_id)
-        self._apply_picture_id_filter(query, picture_id)
-        self._apply_rating_filter(query, rating)
-        self._apply_added_after_filter(query, added_after)
-
-        query = query.group_by(Picture.user_id)
-        users = query.all()
-
-        pydantic_users = [
-            UserResponse(
-                id=user.user_id,
-                username=user.user.username,
-                email=user.user.email,
-                avatar=user.user.avatar,
-                picture_count=user.picture_count,
-            ) for user in users
-        ]
-
-        return pydantic_users
-
-    def _apply_user_id_filter(self, query, user_id):
-        if user_id is not None:
-            query = query.filter(Picture.user_id == user_id)
-
-    def _apply_picture_id_filter(self, query, picture_id):
-        if picture_id is not None:
-            query = query.filter(Picture.rating >= picture_id)
-
-    def _apply_rating_filter(self, query, rating):
-        if rating is not None:
-            query = query.filter(Picture.rating >= rating)
-
-    def _apply_added_after_filter(self, query, added_after):
-        if added_after is not None:
-            query = query.filter(Picture.created_at >= added_after)
\ No newline at end of file
+        self.statement = statement if statement is not None else self._base_statement()
+
+    @abstractmethod
+    def _base_statement(self) -> Select:
+        """
+        Return the unfiltered statement of the query.
+        """
+
+    @abstractmethod
+    def _order_by(self) -> tuple:
+        """
+        Return the keyset order; its columns must identify a row uniquely.
+        """
+
+    @abstractmethod
+    def _after(self, cursor: str):
+        """
+        Return the criterion selecting the rows after the one `cursor` was made from.
+        """
+
+    @abstractmethod
+    def _cursor_of(self, row) -> str:
+        """
+        Return the cursor of a row, for the page that follows it.
+        """
+
+    def _results(self, rows) -> list:
+        return list(rows)
+
+    def _derive(self, statement: Select) -> Self:
+        return type(self)(self.db, statement)
+
+    def where(self, *criteria) -> Self:
+        """
+        Return a new query with the given criteria added.
+        """
+        return self._derive(self.statement.where(*criteria))
+
+    async def count(self) -> int:
+        """
+        Count all results matching the filters, ignoring pagination.
+        """
+        return await self.db.scalar(select(func.count()).select_from(self.statement.order_by(None).subquery()))
+
+    async def page(self, limit: int = 20, cursor: Optional[str] = None, with_total: bool = False) -> dict:
+        """
+        Execute the query and return one page of results.
+
+        Args:
+            limit (int): The maximum number of results, capped at SEARCH_MAX_LIMIT.
+            cursor (Optional[str]): The cursor returned with the previous page.
+            with_total (bool): Whether to also count every matching result.
+
+        Returns:
+            dict: `items` on this page, `next_cursor` (None on the last page) and `total`
+            (None unless requested).
+        """
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+        statement = self.statement
+        if cursor:
+            statement = statement.where(self._after(cursor))
+
+        result = await self.db.execute(statement.order_by(*self._order_by()).limit(limit + 1))
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._cursor_of(rows[-1])
+
+        return {
+            "items": self._results(rows),
+            "next_cursor": next_cursor,
+            "total": await self.count() if with_total else None,
+        }
+
+
+class UserSearchService(SearchQuery):
+    """
+    Search query over users, in ID order, with the number of pictures each user uploaded.
+    """
+
+    def _base_statement(self) -> Select:
+        picture_count = (select(func.count(Picture.id))
+                         .where(Picture.user_id == User.id)
+                         .scalar_subquery())
+        return select(User.id, User.username, User.email, User.avatar, picture_count.label("picture_count"))
+
+    def _order_by(self) -> tuple:
+        return User.id,
+
+    def _after(self, cursor: str):
+        return User.id > decode_id_cursor(cursor)
+
+    def _cursor_of(self, row) -> str:
+        return encode_id_cursor(row.id)
+
+    def keyword(self, keyword: Optional[str]) -> Self:
+        """
+        Keep users whose username or email contains the keyword.
+        """
+        if not keyword:
+            return self
+        return self.where(or_(User.username.ilike(f"%{keyword}%"), User.email.ilike(f"%{keyword}%")))
+
+    def username(self, username: Optional[str]) -> Self:
+        """
+        Keep users whose username contains `username`.
+        """
+        if not username:
+            return self
+        return self.where(User.username.ilike(f"%{username}%"))
+
+    def email(self, email: Optional[str]) -> Self:
+        """
+        Keep users whose email contains `email`.
+        """
+        if not email:
+            return self
+        return self.where(User.email.ilike(f"%{email}%"))
+
+
+class UserPictureSearchService(SearchQuery):
+    """
+    Search query over users through the pictures they uploaded.
+
+    Filters apply to pictures; each user is returned once, with the number of their pictures
+    that matched.
+    """
+
+    def _base_statement(self) -> Select:
+        return (select(User.id, User.username, User.email, User.avatar,
+                       func.count(Picture.id).label("picture_count"))
+                .join(Picture, Picture.user_id == User.id)
+                .group_by(User.id, User.username, User.email, User.avatar))
+
+    def _order_by(self) -> tuple:
+        return User.id,
+
+    def _after(self, cursor: str):
+        return User.id > decode_id_cursor(cursor)
+
+    def _cursor_of(self, row) -> str:
+        return encode_id_cursor(row.id)
+
+    def user_id(self, user_id: Optional[int]) -> Self:
+        """
+        Keep pictures uploaded by the user.
+        """
+        if user_id is None:
+            return self
+        return self.where(Picture.user_id == user_id)
+
+    def picture_id(self, picture_id: Optional[int]) -> Self:
+        """
+        Keep only the picture with this ID.
+        """
+        if picture_id is None:
+            return self
+        return self.where(Picture.id == picture_id)
+
+    def min_rating(self, rating: Optional[float]) -> Self:
+        """
+        Keep pictures whose average rating is at least `rating`.
+        """
+        if rating is None:
+            return self
+        return self.where(Picture.average_rating >= rating)
+
+    def added_after(self, added_after: Optional[datetime]) -> Self:
+        """
+        Keep pictures created at or after `added_after`.
+        """
+        if added_after is None:
+            return self
+        return self.where(Picture.created_at >= added_after)
@@ -19,6 +19,32 @@ class SecretsManager:
             "CLOUDINARY_NAME": "dummy",
             "CLOUDINARY_API_KEY": "dummy",
             "CLOUDINARY_API_SECRET": "dummy",
+            "STORAGE_MAX_WORKERS": "8",
+            "STORAGE_BACKEND": "cloudinary",
+            "MEDIA_ROOT": "media",
+            "MEDIA_URL": "/media",
+            "PUBLIC_BASE_URL": "",
+            "UPLOAD_DEFER_QR": "true",
+            "DB_POOL_SIZE": "5",
+            "DB_MAX_OVERFLOW": "10",
+            "DB_POOL_TIMEOUT": "30",
+            "DB_POOL_RECYCLE": "1800",
+            "DB_POOL_PRE_PING": "true",
+            "SQLALCHEMY_REPLICA_URLS": "",
+            "DB_REPLICA_CHECK_INTERVAL": "10",
+            "DB_REPLICA_PIN_SECONDS": "5",
+            "PICTURE_CACHE_TTL": "300",
+            "STORY_CACHE_TTL": "300",
+            "REACTION_COUNTS_CACHE_TTL": "300",
+            "STORY_PURGE_INTERVAL": "3600",
+            "STORY_PURGE_BATCH_SIZE": "500",
+            "USER_CACHE_TTL": "900",
+            "PASSWORD_HASH_ROUNDS": "12",
+            "PASSWORD_HASH_WORKERS": "4",
+            "SESSION_CACHE_TTL": "30",
+            "SESSION_CACHE_SIZE": "10000",
+            "TOKEN_CACHE_TTL": "300",
+            "TOKEN_CACHE_SIZE": "10000",
             "SQLALCHEMY_DATABASE_URL": "sqlite:///./test.db"
         }
         return defaults.get(key)
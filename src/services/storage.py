@@ -0,0 +1,282 @@
+import asyncio
+import hashlib
+import io
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, BinaryIO, Callable, Optional
+
+import cloudinary
+import cloudinary.api
+import cloudinary.uploader
+
+from src.conf.cloudinary import configure_cloudinary
+from src.services.secrets_manager import SecretsManager
+
+STORAGE_BACKEND = SecretsManager.get_secret("STORAGE_BACKEND")
+STORAGE_MAX_WORKERS = int(SecretsManager.get_secret("STORAGE_MAX_WORKERS"))
+MEDIA_ROOT = SecretsManager.get_secret("MEDIA_ROOT")
+MEDIA_URL = SecretsManager.get_secret("MEDIA_URL")
+
+CHUNK_SIZE = 1024 * 1024
+
+# Leading bytes of the media formats the app accepts, used to give stored files an extension.
+SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+    (b"\x1aE\xdf\xa3", ".webm"),
+)
+
+
+def guess_extension(head: bytes) -> str:
+    """Guess a file extension from the first bytes of a media file."""
+    for signature, extension in SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[4:8] == b"ftyp":
+        return ".mov" if head[8:10] == b"qt" else ".mp4"
+    return ".bin"
+
+
+def hash_file(file: BinaryIO) -> str:
+    """
+    Compute the SHA-256 hex digest of a file, reading it in chunks, and rewind it for the upload.
+    """
+    sha256 = hashlib.sha256()
+    file.seek(0)
+    while chunk := file.read(CHUNK_SIZE):
+        sha256.update(chunk)
+    file.seek(0)
+    return sha256.hexdigest()
+
+
+class CloudinaryBackend:
+    """
+    Stores media on Cloudinary.
+    """
+
+    supports_transformations = True
+    # Most public IDs `cloudinary.api.delete_resources` accepts per call.
+    delete_batch_size = 100
+
+    def upload(self, file, **options) -> dict:
+        configure_cloudinary()
+        return cloudinary.uploader.upload(file, **options)
+
+    def url(self, public_id: str, resource_type: str = 'image', version: Any = None, **transformation) -> str:
+        return cloudinary.CloudinaryImage(public_id, resource_type=resource_type) \
+            .build_url(version=version, **transformation)
+
+    def public_id(self, url: str) -> Optional[str]:
+        match = re.search(r"/upload/(?:v\d+/)?(.+)$", url)
+        return match.group(1) if match else None
+
+    def delete(self, public_ids: list[str], resource_type: str = 'image') -> None:
+        configure_cloudinary()
+        for start in range(0, len(public_ids), self.delete_batch_size):
+            cloudinary.api.delete_resources(public_ids[start:start + self.delete_batch_size],
+                                            resource_type=resource_type)
+
+
+class LocalBackend:
+    """
+    Stores media on the local filesystem, content-addressed by SHA-256.
+
+    A file is stored once as `<root>/<aa>/<bb>/<sha256><ext>`, whatever name or folder it was
+    uploaded under, and served from `base_url`, either the app's `/media` route or a CDN origin
+    that mirrors the root. Uploads are streamed to a temporary file while hashing and then moved
+    into place atomically, so a file is never held in memory whole and readers never see a
+    partially written file.
+
+    Upload responses mimic the fields of a Cloudinary response that the app reads.
+
+    Attributes:
+        root (str): Directory that holds the stored files.
+        base_url (str): URL prefix under which `root` is served.
+    """
+
+    supports_transformations = False
+
+    def __init__(self, root: str, base_url: str):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def upload(self, file, folder: Optional[str] = None, resource_type: str = 'image', **options) -> dict:
+        if isinstance(file, bytes):
+            file = io.BytesIO(file)
+        elif isinstance(file, str):
+            raise ValueError("Local storage can only store file contents, not URLs")
+
+        digest, extension, temp_path = self._write_temporary(file)
+        public_id = f"{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+        path = os.path.join(self.root, public_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+
+        return {
+            "public_id": public_id,
+            "folder": folder,
+            "version": None,
+            "resource_type": resource_type,
+            "bytes": os.path.getsize(path),
+            "secure_url": self.url(public_id),
+        }
+
+    def url(self, public_id: str, resource_type: str = 'image', version: Any = None, **transformation) -> str:
+        return f"{self.base_url}/{public_id}"
+
+    def public_id(self, url: str) -> Optional[str]:
+        prefix = f"{self.base_url}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+    def delete(self, public_ids: list[str], resource_type: str = 'image') -> None:
+        for public_id in public_ids:
+            try:
+                os.remove(os.path.join(self.root, public_id))
+            except FileNotFoundError:
+                pass
+
+    def _write_temporary(self, file: BinaryIO) -> tuple[str, str, str]:
+        os.makedirs(self.root, exist_ok=True)
+        sha256 = hashlib.sha256()
+        extension = None
+        fd, temp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                while chunk := file.read(CHUNK_SIZE):
+                    if extension is None:
+                        extension = guess_extension(chunk[:16])
+                    sha256.update(chunk)
+                    temp_file.write(chunk)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return sha256.hexdigest(), extension or ".bin", temp_path
+
+
+def create_backend(name: str):
+    """
+    Create the storage backend configured by STORAGE_BACKEND ('cloudinary' or 'local').
+    """
+    if name == "local":
+        return LocalBackend(root=MEDIA_ROOT, base_url=MEDIA_URL)
+    if name == "cloudinary":
+        return CloudinaryBackend()
+    raise ValueError(f"Unknown storage backend: {name}")
+
+
+class StorageService:
+    """
+    Runs blocking media I/O off the event loop.
+
+    Storage backends only offer synchronous calls: the Cloudinary SDK makes blocking HTTP requests
+    and the local backend writes to disk. Calling them from an `async def` handler stalls every
+    other request on the worker until the upload finishes, so they are run on a bounded thread
+    pool instead. The pool size caps the number of concurrent uploads; further uploads queue until
+    a thread is free, while the event loop keeps serving other requests.
+
+    Attributes:
+        backend: The storage backend that stores the files and builds their URLs.
+        max_workers (int): The maximum number of uploads running at the same time.
+    """
+
+    def __init__(self, backend, max_workers: int):
+        self.backend = backend
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="storage")
+        return self._executor
+
+    @property
+    def supports_transformations(self) -> bool:
+        return self.backend.supports_transformations
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking function on the storage thread pool and wait for its result.
+
+        Args:
+            func (Callable): The blocking function to run.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            Any: The function's return value. Exceptions raised by the function are re-raised.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    async def upload(self, file, **options) -> dict:
+        """
+        Store a file without blocking the event loop.
+
+        Args:
+            file: A file object or bytes; the Cloudinary backend also accepts a URL.
+            **options: Upload options, as accepted by `cloudinary.uploader.upload`.
+
+        Returns:
+            dict: The upload response, with at least `public_id`, `folder` and `version`.
+        """
+        return await self.run(self.backend.upload, file, **options)
+
+    def url(self, public_id: str, resource_type: str = 'image', version: Any = None, **transformation) -> str:
+        """
+        Build the public URL of a stored file.
+
+        Args:
+            public_id (str): The `public_id` returned by `upload`.
+            resource_type (str): 'image' or 'video'.
+            version: The `version` returned by `upload`.
+            **transformation: Cloudinary delivery transformations; ignored by the local backend.
+
+        Returns:
+            str: The URL of the file.
+        """
+        return self.backend.url(public_id, resource_type=resource_type, version=version, **transformation)
+
+    def public_id(self, url: str) -> Optional[str]:
+        """
+        Recover the `public_id` of a file from a URL built by `url` without transformations.
+
+        Args:
+            url (str): The URL of the file.
+
+        Returns:
+            Optional[str]: The public ID, or None if the URL does not point to this storage.
+        """
+        return self.backend.public_id(url)
+
+    async def delete(self, public_ids: list[str], resource_type: str = 'image') -> None:
+        """
+        Delete stored files without blocking the event loop, in as few calls as the backend allows.
+
+        Files shared by content (see `LocalBackend`) must only be deleted once nothing refers to
+        them any more.
+
+        Args:
+            public_ids (list[str]): The `public_id`s returned by `upload`.
+            resource_type (str): 'image' or 'video'; all files must be of this type.
+        """
+        if public_ids:
+            await self.run(self.backend.delete, list(public_ids), resource_type=resource_type)
+
+    def shutdown(self) -> None:
+        """
+        Wait for running uploads to finish and release the thread pool.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+storage_service = StorageService(create_backend(STORAGE_BACKEND), max_workers=STORAGE_MAX_WORKERS)
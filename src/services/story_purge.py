@@ -0,0 +1,180 @@
+"""
+Purge of expired stories and their media.
+
+Stories are shown for `STORY_LIFETIME` only; afterwards they are deleted in batches, each committed
+on its own so the purge never holds locks for long, and the media nothing else refers to any more
+are deleted from storage with one call per batch.
+
+The app runs the purge every `STORY_PURGE_INTERVAL` seconds. Every worker schedules it, but a lock in
+Redis lets only one of them run it per interval, so workers never race over the same batches. Set the
+interval to 0 to run it from cron instead, once per call, with `python -m src.services.story_purge`.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from sqlalchemy import select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.db import AsyncSessionLocal, async_engine
+from src.database.models import MediaAsset, Picture, Story, User
+from src.repository import stories as repository_stories
+from src.services.cache import redis_client
+from src.services.secrets_manager import SecretsManager
+from src.services.storage import storage_service
+
+STORY_PURGE_INTERVAL = float(SecretsManager.get_secret("STORY_PURGE_INTERVAL"))
+STORY_PURGE_BATCH_SIZE = int(SecretsManager.get_secret("STORY_PURGE_BATCH_SIZE"))
+
+logger = logging.getLogger(__name__)
+
+# Storage is content-addressed, so a story's file can also be any of these.
+MEDIA_URL_COLUMNS = (
+    Story.image_url,
+    Picture.picture_url,
+    Picture.picture_secondary_url,
+    Picture.picture_edited_url,
+    Picture.qr_code_picture,
+    Picture.qr_code_picture_edited,
+    MediaAsset.url,
+    MediaAsset.qr_code,
+    User.avatar,
+)
+
+
+async def delete_orphaned_media(stories: list[tuple[str, str]], db: AsyncSession) -> None:
+    """
+    Delete the media of purged stories, except files still referred to from any column of
+    `MEDIA_URL_COLUMNS`; identical uploads can share one file.
+
+    A failure is logged and leaves the files in storage, as the stories are already gone.
+
+    Args:
+        stories (list[tuple[str, str]]): Image URL and media type of each purged story.
+        db (AsyncSession): The database session.
+    """
+    urls = {url for url, _ in stories}
+    referenced = set(await db.scalars(union(*(select(column).where(column.in_(urls))
+                                              for column in MEDIA_URL_COLUMNS))))
+
+    public_ids = defaultdict(set)
+    for url, media_type in stories:
+        public_id = storage_service.public_id(url)
+        if public_id and url not in referenced:
+            # Stories are uploaded with the resource type their media type maps to.
+            resource_type = 'video' if media_type in ['video', 'gif', 'reel'] else 'image'
+            public_ids[resource_type].add(public_id)
+
+    for resource_type, ids in public_ids.items():
+        try:
+            await storage_service.delete(sorted(ids), resource_type=resource_type)
+        except Exception:
+            logger.exception("failed to delete the media of %d purged stories", len(ids))
+
+
+async def purge_expired_stories(db: AsyncSession, batch_size: int = STORY_PURGE_BATCH_SIZE) -> int:
+    """
+    Delete the stories older than `STORY_LIFETIME`, `batch_size` at a time, and their media.
+
+    Args:
+        db (AsyncSession): The database session.
+        batch_size (int): Stories deleted per commit and media deleted per storage call.
+
+    Returns:
+        int: The number of stories deleted.
+    """
+    before = datetime.now() - repository_stories.STORY_LIFETIME
+    purged = 0
+    while True:
+        stories = await repository_stories.delete_expired_stories(before, batch_size, db)
+        if stories:
+            purged += len(stories)
+            await delete_orphaned_media(stories, db)
+        if len(stories) < batch_size:
+            break
+    if purged:
+        logger.info("purged %d expired stories", purged)
+    return purged
+
+
+class StoryPurger:
+    """
+    Runs `purge_expired_stories` in the background at a fixed interval.
+
+    Each worker process runs a purger. Before purging, a purger sets a Redis key that expires after
+    the interval, only if it is not set yet, so one purge runs per interval across all workers.
+    When Redis is unavailable, the purge is skipped until it is back.
+
+    Attributes:
+        client (redis.Redis): Async Redis client holding the lock.
+    """
+
+    lock_key = "story_purge:lock"
+
+    def __init__(self, client: redis.Redis = redis_client):
+        self.client = client
+        self._task: Optional[asyncio.Task] = None
+
+    async def _acquire(self, interval: float) -> bool:
+        try:
+            return bool(await self.client.set(self.lock_key, 1, nx=True, px=max(1, int(interval * 1000))))
+        except RedisError as error:
+            logger.warning("story purge lock unavailable: %s", error)
+            return False
+
+    async def run_once(self, interval: float) -> int | None:
+        """
+        Purge expired stories, unless another worker already did in the last `interval` seconds.
+
+        Returns:
+            int | None: The number of stories deleted, or None if the purge was left to another worker.
+        """
+        if not await self._acquire(interval):
+            return None
+        async with AsyncSessionLocal() as db:
+            return await purge_expired_stories(db)
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            try:
+                await self.run_once(interval)
+            except Exception:
+                logger.exception("story purge failed")
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float) -> None:
+        """
+        Start purging every `interval` seconds in the background; an interval of 0 disables it.
+        """
+        if interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        """
+        Stop the background purge.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+story_purger = StoryPurger()
+
+
+async def main() -> None:
+    async with AsyncSessionLocal() as db:
+        await purge_expired_stories(db)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
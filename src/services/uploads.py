@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from fastapi import UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.cloudinary import generate_random_string
+from src.database.db import AsyncSessionLocal
+from src.database.models import MediaAsset
+from src.repository import media as repository_media
+from src.repository import pictures as repository_pictures
+from src.services.qr import generate_qr_and_upload_to_cloudinary
+from src.services.secrets_manager import SecretsManager
+from src.services.storage import storage_service, hash_file
+
+UPLOAD_DEFER_QR = SecretsManager.get_secret("UPLOAD_DEFER_QR").lower() in ("1", "true", "yes")
+
+logger = logging.getLogger(__name__)
+
+
+class UploadTimings:
+    """
+    Wall-clock duration of each stage of an upload, in milliseconds.
+
+    Stages that run concurrently are timed separately, so their sum can exceed the total.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = (time.perf_counter() - start) * 1000
+
+    def total(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        """
+        Format the stages as a `Server-Timing` header value.
+        """
+        stages = [*self.stages.items(), ("total", self.total())]
+        return ", ".join(f"{name};dur={duration:.1f}" for name, duration in stages)
+
+    def log(self, picture_id: int) -> None:
+        logger.info("upload timings picture=%s %s", picture_id, self.server_timing())
+
+
+class UploadedMedia:
+    """
+    Result of uploading a post's media.
+
+    Attributes:
+        picture_url (str): URL of the main media.
+        picture_json (dict): Storage upload response of the main media.
+        asset_id (int): ID of the main media's entry in the content index.
+        picture_secondary_url (Optional[str]): URL of the BeReal secondary picture, if any.
+        qr (Optional[str]): URL of the QR code, or None if its generation was deferred.
+    """
+
+    def __init__(self, picture_url: str, picture_json: dict, asset_id: int,
+                 picture_secondary_url: Optional[str] = None, qr: Optional[str] = None):
+        self.picture_url = picture_url
+        self.picture_json = picture_json
+        self.asset_id = asset_id
+        self.picture_secondary_url = picture_secondary_url
+        self.qr = qr
+
+
+async def store_media(file: UploadFile, resource_type: str, stage: str, timings: UploadTimings,
+                      db: AsyncSession) -> MediaAsset:
+    """
+    Store a file unless identical content was stored before.
+
+    The file is hashed before the upload and looked up in the content index; on a match the stored
+    asset is returned and nothing is uploaded.
+
+    Args:
+        file (UploadFile): The file to store.
+        resource_type (str): Storage resource type ('image' or 'video').
+        stage (str): Name under which the hashing and upload are timed.
+        timings (UploadTimings): Collects the duration of each stage.
+        db (AsyncSession): The database session.
+
+    Returns:
+        MediaAsset: The asset holding the file's content.
+    """
+    with timings.stage(f"{stage}_hash"):
+        content_hash = await storage_service.run(hash_file, file.file)
+        asset = await repository_media.get_media_asset(content_hash, resource_type, db)
+    if asset is not None:
+        return asset
+
+    with timings.stage(stage):
+        uploaded = await storage_service.upload(file.file, public_id=generate_random_string(), folder='picture',
+                                                overwrite=True, resource_type=resource_type)
+    url = storage_service.url(uploaded['public_id'], resource_type=resource_type, version=uploaded.get('version'))
+    return await repository_media.add_media_asset(content_hash, resource_type, url, uploaded, db)
+
+
+async def upload_post_media(picture: UploadFile,
+                            picture_secondary: Optional[UploadFile],
+                            resource_type: str,
+                            timings: UploadTimings,
+                            db: AsyncSession,
+                            defer_qr: bool = UPLOAD_DEFER_QR) -> UploadedMedia:
+    """
+    Upload the main media of a post, then its secondary picture and QR code concurrently.
+
+    The QR code encodes the main media URL, so it has to wait for the main upload; the secondary
+    picture does not depend on it, but is started at the same point so both run side by side on
+    the storage pool. Content that was uploaded before is not uploaded again, and its QR code is
+    reused when it exists.
+
+    Args:
+        picture (UploadFile): The main media file.
+        picture_secondary (Optional[UploadFile]): The BeReal secondary picture, if any.
+        resource_type (str): Storage resource type of the main media ('image' or 'video').
+        timings (UploadTimings): Collects the duration of each stage.
+        db (AsyncSession): The database session.
+        defer_qr (bool): Skip a missing QR code; the caller generates it later with `attach_qr`.
+
+    Returns:
+        UploadedMedia: The uploaded media URLs.
+    """
+    asset = await store_media(picture, resource_type, "primary", timings, db)
+
+    async def upload_secondary() -> Optional[str]:
+        if not (picture_secondary and picture_secondary.filename):
+            return None
+        secondary = await store_media(picture_secondary, 'image', "secondary", timings, db)
+        return secondary.url
+
+    async def upload_qr() -> Optional[str]:
+        if asset.qr_code or defer_qr:
+            return asset.qr_code
+        with timings.stage("qr"):
+            return await generate_qr_and_upload_to_cloudinary(asset.url, asset.upload_json)
+
+    picture_secondary_url, qr = await asyncio.gather(upload_secondary(), upload_qr())
+    # A session runs one statement at a time, so the QR code is recorded once the secondary
+    # upload, which also queries the content index, is done.
+    if qr and not asset.qr_code:
+        await repository_media.set_media_asset_qr(asset.id, qr, db)
+    return UploadedMedia(asset.url, asset.upload_json, asset.id, picture_secondary_url, qr)
+
+
+async def attach_qr(picture_id: int,
+                    media: UploadedMedia,
+                    timings: UploadTimings,
+                    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal) -> None:
+    """
+    Generate the QR code of a saved picture and store its URL. Meant to run as a background task.
+
+    The QR code is also recorded on the picture's asset, so later uploads of the same content reuse
+    it. A failure is logged and leaves the picture without a QR code rather than failing the upload.
+
+    Args:
+        picture_id (int): The ID of the saved picture.
+        media (UploadedMedia): The picture's uploaded media.
+        timings (UploadTimings): The upload's timings, logged once the QR code is stored.
+        session_factory (Callable[[], AsyncSession]): Creates the session used to store the URL.
+    """
+    try:
+        with timings.stage("qr"):
+            qr = await generate_qr_and_upload_to_cloudinary(media.picture_url, media.picture_json)
+        async with session_factory() as db:
+            await repository_pictures.set_picture_qr(picture_id, qr, db)
+            await repository_media.set_media_asset_qr(media.asset_id, qr, db)
+    except Exception:
+        logger.exception("QR code generation failed for picture %s", picture_id)
+    timings.log(picture_id)
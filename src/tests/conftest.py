@@ -1,16 +1,25 @@
+from unittest.mock import patch
+
 import pytest
 from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.templating import Jinja2Templates
 from datetime import datetime
 from PIL import Image
 from io import BytesIO
 
 from main import app
-from src.database.models import Base, User, Comment, Reaction
-from src.database.db import get_db
+from src.database.models import Base, User, Comment, CommentReaction, CommentReactionCount
+from src.database.db import get_db, get_db_read
+from src.repository.reactions import counts_cache
+from src.repository.stories import active_stories_cache
 from src.services.auth import auth_service
+from src.services.cache import picture_detail_cache
+from src.services.passwords import password_service
 from faker import Faker
 
 fake = Faker("pl_PL")
@@ -22,13 +31,142 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The app runs on the async engine. NullPool gives every session a fresh connection, as the
+# test client and async tests each run their own event loop.
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 templates = Jinja2Templates(directory="templates")
 
 
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        self.expiry[key] = ex if px is None else px / 1000
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    async def exists(self, key):
+        return int(key in self.values)
+
+    async def zadd(self, key, mapping):
+        self.values.setdefault(key, {}).update({str(member): float(score) for member, score in mapping.items()})
+
+    async def zrem(self, key, member):
+        self.values.get(key, {}).pop(str(member), None)
+
+    async def zremrangebyscore(self, key, low, high):
+        high = float(high.lstrip("("))
+        zset = self.values.get(key, {})
+        for member in [member for member, score in zset.items() if score < high]:
+            del zset[member]
+
+    async def zrevrangebyscore(self, key, high, low):
+        zset = self.values.get(key, {})
+        return sorted((member for member, score in zset.items() if score >= float(low)),
+                      key=zset.get, reverse=True)
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        fields = dict(mapping or {})
+        if field is not None:
+            fields[field] = value
+        self.values.setdefault(key, {}).update({str(name): value for name, value in fields.items()})
+
+    async def hdel(self, key, field):
+        self.values.get(key, {}).pop(str(field), None)
+
+    async def hmget(self, key, fields):
+        return [self.values.get(key, {}).get(str(field)) for field in fields]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        return [await getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class DownRedis:
+    async def get(self, key):
+        raise ConnectionError("Connection refused")
+
+    async def mget(self, keys):
+        raise ConnectionError("Connection refused")
+
+    async def incr(self, key):
+        raise ConnectionError("Connection refused")
+
+    async def set(self, *args, **kwargs):
+        raise ConnectionError("Connection refused")
+
+    async def delete(self, *keys):
+        raise ConnectionError("Connection refused")
+
+    def pipeline(self, transaction=True):
+        raise ConnectionError("Connection refused")
+
+
+@pytest.fixture(scope="function", autouse=True)
+def redis_client():
+    """
+    Serve the Redis caches from memory, so results do not depend on a Redis server being up.
+    """
+    client = FakeRedis()
+    caches = (auth_service.user_cache, auth_service.user_versions, picture_detail_cache, counts_cache,
+              active_stories_cache)
+    patches = [patch.object(cache, "client", client) for cache in caches]
+    for cache_patch in patches:
+        cache_patch.start()
+    try:
+        yield client
+    finally:
+        for cache_patch in reversed(patches):
+            cache_patch.stop()
+
+
 @pytest.fixture(scope="function", autouse=True)
 def session():
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    # The database is recreated, so sessions cached by earlier tests no longer apply. Tokens minted
+    # in the same second are identical, so verified claims are dropped too.
+    auth_service.session_cache.clear()
+    auth_service.token_cache.clear()
 
     db = TestingSessionLocal()
     try:
@@ -39,13 +177,12 @@ def session():
 
 @pytest.fixture(scope="function")
 def client(session):
-    def override_get_db():
-        try:
-            yield session
-        finally:
-            session.close()
+    async def override_get_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_db_read] = override_get_db
 
     yield TestClient(app)
 
@@ -112,7 +249,7 @@ def create_user_db(body: user, db: session):
 def login_user_confirmed_true_and_hash_password(user, session):
     create_user_db(user, session)
     user_update: User = session.query(User).filter(User.email == user.email).first()
-    user_update.password = auth_service.get_password_hash(user_update.password)
+    user_update.password = password_service.context.hash(user_update.password)
     user_update.confirmed = True
     session.commit()
 
@@ -120,7 +257,7 @@ def login_user_confirmed_true_and_hash_password(user, session):
 def login_user_confirmed_false_and_hash_password(user, session):
     create_user_db(user, session)
     user_update: User = session.query(User).filter(User.email == user.email).first()
-    user_update.password = auth_service.get_password_hash(user_update.password)
+    user_update.password = password_service.context.hash(user_update.password)
     user_update.confirmed = False
     session.commit()
 
@@ -277,7 +414,10 @@ def create_comments(session):
 
 @pytest.fixture(scope="function", autouse=True)
 def create_reactions(session):
-    reactions_1 = Reaction(comment_id=1, data={"like": [1]})
-    reactions_2 = Reaction(comment_id=2, data={"like": [2, 8, 4], "wow": [15, 6], "haha": [9, 5, 3, 10, 14]})
-    session.add_all([reactions_1, reactions_2])
+    reactions = {1: {"like": [1]},
+                 2: {"like": [2, 8, 4], "wow": [15, 6], "haha": [9, 5, 3, 10, 14]}}
+    for comment_id, kinds in reactions.items():
+        for kind, user_ids in kinds.items():
+            session.add_all([CommentReaction(comment_id=comment_id, user_id=user_id, kind=kind) for user_id in user_ids])
+            session.add(CommentReactionCount(comment_id=comment_id, kind=kind, count=len(user_ids)))
     session.commit()
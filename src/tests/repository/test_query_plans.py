@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import event
+
+from src.repository import comments as repository_comments
+from src.repository import messages as repository_messages
+from src.repository import pictures as repository_pictures
+from src.repository import rating as repository_rating
+from src.repository import reactions as repository_reactions
+from src.repository import stories as repository_stories
+from src.tests.conftest import async_engine, engine, TestingAsyncSessionLocal
+
+
+async def capture_statements(query) -> list[tuple[str, tuple]]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        async with TestingAsyncSessionLocal() as db:
+            await query(db)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def query_plan(statement: str, parameters: tuple) -> str:
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def assert_plan_uses(plan: str, index: str):
+    assert index in plan, plan
+    assert "SCAN" not in plan.replace(f"SCAN {index}", ""), plan
+
+
+async def assert_first_query_uses(query, index: str):
+    statements = await capture_statements(query)
+    assert statements
+
+    assert_plan_uses(query_plan(*statements[0]), index)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query, index", [
+    (lambda db: repository_pictures.get_user_pictures(1, db), "ix_picture_user_id_created_at_id"),
+    (lambda db: repository_comments.get_comments(1, 0, 20, db), "ix_comment_picture_id_created_at"),
+    (lambda db: repository_rating.get_rating(1, db), "ix_rating_picture_id_user_id"),
+    (lambda db: repository_reactions.get_reactions(1, db), "sqlite_autoindex_comment_reaction_1"),
+    (lambda db: repository_reactions.get_number_of_reactions(1, db), "sqlite_autoindex_comment_reaction_count_1"),
+    (lambda db: repository_stories.get_active_stories(db), "ix_story_created_at"),
+    (lambda db: repository_stories.get_user_stories(1, db), "ix_story_user_id_created_at"),
+])
+async def test_hot_queries_use_indexes(query, index):
+    await assert_first_query_uses(query, index)
+
+
+@pytest.mark.asyncio
+async def test_rating_removal_uses_picture_user_index():
+    statements = await capture_statements(lambda db: repository_rating.remove_rating_from_picture_admin(1, 1, db))
+
+    # The first statement locks the picture row; the delete follows it.
+    assert statements[1][0].startswith("DELETE FROM rating"), statements[1][0]
+    assert_plan_uses(query_plan(*statements[1]), "ix_rating_picture_id_user_id")
+
+
+@pytest.mark.asyncio
+async def test_messages_query_uses_sender_and_receiver_indexes():
+    statements = await capture_statements(lambda db: repository_messages.get_messages_for_user(1, db))
+
+    plan = query_plan(*statements[0])
+    assert "ix_message_sender_id" in plan, plan
+    assert "ix_message_receiver_id" in plan, plan
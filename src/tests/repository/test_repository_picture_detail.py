@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.database.models import Picture, User
+from src.repository import comments as repository_comments
+from src.repository import descriptions as repository_descriptions
+from src.repository import pictures as repository_pictures
+from src.repository import rating as repository_rating
+from src.repository import reactions as repository_reactions
+from src.schemas import CommentModel
+from src.tests.conftest import async_engine, TestingAsyncSessionLocal
+
+
+@pytest.fixture
+def users(session: Session):
+    users = [User(id=1, username="uploader", email="uploader@example.com", password="password"),
+             User(id=2, username="commenter", email="commenter@example.com", password="password")]
+    session.add_all(users)
+    session.add(Picture(id=1, picture_url="https://example.com/1.jpg", description="first", user_id=1))
+    session.commit()
+    return users
+
+
+async def picture_detail(picture_id: int = 1):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        async with TestingAsyncSessionLocal() as db:
+            detail = await repository_pictures.get_picture_detail(picture_id, db)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return detail, len(statements)
+
+
+@pytest.mark.asyncio
+async def test_picture_detail_is_served_from_cache(redis_client, users):
+    detail, statements = await picture_detail()
+
+    assert statements > 0
+    assert detail["picture"]["description"] == "first"
+    assert detail["username_uploader"] == "uploader"
+    assert [comment["content"] for comment in detail["comments"]] == ["test content 3", "test content 2",
+                                                                      "test content 1"]
+    assert detail["comments"][2]["reactions"] == {"uploader": "like"}
+    assert detail["average_rating"] == 0
+    assert "picture_detail:1" in redis_client.values
+
+    cached, statements = await picture_detail()
+
+    assert statements == 0
+    assert cached == detail
+
+
+@pytest.mark.asyncio
+async def test_missing_picture_is_not_cached(redis_client, users):
+    detail, _ = await picture_detail(picture_id=99)
+
+    assert detail is None
+    assert redis_client.values == {}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("change", [
+    lambda db, user: repository_comments.create_comment(CommentModel(content="new"), 1, user, db),
+    lambda db, user: repository_rating.add_rating_to_picture(1, 5, user, db),
+    lambda db, user: repository_descriptions.update_description(1, "second", db),
+    lambda db, user: repository_reactions.add_reaction_to_comment(1, "wow", user, db),
+    lambda db, user: repository_pictures.set_picture_qr(1, "https://example.com/qr.png", db),
+])
+async def test_changes_invalidate_picture_detail(redis_client, users, change):
+    await picture_detail()
+    assert "picture_detail:1" in redis_client.values
+
+    async with TestingAsyncSessionLocal() as db:
+        await change(db, await db.get(User, 2))
+
+    assert "picture_detail:1" not in redis_client.values
+    _, statements = await picture_detail()
+    assert statements > 0
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.database.models import Picture, Rating, User
+from src.repository import rating as repository_rating
+from src.tests.conftest import TestingAsyncSessionLocal
+
+
+@pytest.fixture
+def picture(session: Session):
+    users = [User(username=f"rater{number}", email=f"rater{number}@example.com", password="password")
+             for number in range(2)]
+    picture = Picture(picture_url="https://example.com/picture.jpg", user=users[0])
+    session.add_all(users + [picture])
+    session.commit()
+    return picture
+
+
+async def rate(picture_id: int, value: int, user: User):
+    async with TestingAsyncSessionLocal() as db:
+        return await repository_rating.add_rating_to_picture(picture_id, value, user, db)
+
+
+def stored_ratings(session: Session, picture_id: int):
+    session.expire_all()
+    ratings = session.scalars(select(Rating.rat).where(Rating.picture_id == picture_id).order_by(Rating.id)).all()
+    picture = session.get(Picture, picture_id)
+    return ratings, (picture.rating_sum, picture.rating_count)
+
+
+@pytest.mark.asyncio
+async def test_add_rating_creates_and_updates_one_row(session: Session, picture: Picture):
+    first, second = session.scalars(select(User).order_by(User.id)).all()
+
+    result = await rate(picture.id, 4, first)
+    assert result == {"message": "The rating was successfully created or updated."}
+    assert stored_ratings(session, picture.id) == ([4], (4, 1))
+
+    await rate(picture.id, 2, first)
+    assert stored_ratings(session, picture.id) == ([2], (2, 1))
+
+    await rate(picture.id, 5, second)
+    assert stored_ratings(session, picture.id) == ([2, 5], (7, 2))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_ratings_of_one_user_do_not_duplicate(session: Session, picture: Picture):
+    user = session.scalar(select(User).order_by(User.id))
+
+    await asyncio.gather(*(rate(picture.id, value, user) for value in (1, 2, 3, 4, 5)))
+
+    count = session.scalar(select(func.count(Rating.id)).where(Rating.picture_id == picture.id))
+    assert count == 1
+    ratings, (rating_sum, rating_count) = stored_ratings(session, picture.id)
+    assert (rating_sum, rating_count) == (ratings[0], 1)
+
+
+async def unrate(picture_id: int, user: User):
+    async with TestingAsyncSessionLocal() as db:
+        return await repository_rating.remove_rating_from_picture(picture_id, user, db)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_removals_of_one_rating_subtract_it_once(session: Session, picture: Picture):
+    first, second = session.scalars(select(User).order_by(User.id)).all()
+    await rate(picture.id, 4, first)
+    await rate(picture.id, 2, second)
+
+    results = await asyncio.gather(*(unrate(picture.id, first) for _ in range(3)))
+
+    assert sorted(result["message"] for result in results) == ["No rating found for this user and picture."] * 2 + \
+        ["Rating removed successfully."]
+    assert stored_ratings(session, picture.id) == ([2], (2, 1))
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.database.models import Comment, CommentReaction, CommentReactionCount, Picture, User
+from src.repository import reactions as repository_reactions
+from src.tests.conftest import TestingAsyncSessionLocal
+
+
+@pytest.fixture
+def comment(session: Session):
+    user = User(username="reactor", email="reactor@example.com", password="password")
+    picture = Picture(picture_url="https://example.com/picture.jpg", user=user)
+    comment = Comment(content="Nice", user=user, picture=picture)
+    session.add_all([user, picture, comment])
+    session.commit()
+    return comment
+
+
+async def react(comment_id: int, reaction: str, user: User):
+    async with TestingAsyncSessionLocal() as db:
+        return await repository_reactions.add_reaction_to_comment(comment_id, reaction, user, db)
+
+
+def stored_reactions(session: Session, comment_id: int):
+    session.expire_all()
+    kinds = session.scalars(select(CommentReaction.kind).where(CommentReaction.comment_id == comment_id)).all()
+    counts = session.execute(select(CommentReactionCount.kind, CommentReactionCount.count)
+                             .where(CommentReactionCount.comment_id == comment_id,
+                                    CommentReactionCount.count > 0)).all()
+    return kinds, dict(counts)
+
+
+@pytest.mark.asyncio
+async def test_reaction_is_replaced_and_recounted(session: Session, comment: Comment):
+    user = session.scalar(select(User))
+
+    await react(comment.id, "like", user)
+    await react(comment.id, "like", user)
+    assert stored_reactions(session, comment.id) == (["like"], {"like": 1})
+
+    await react(comment.id, "wow", user)
+    assert stored_reactions(session, comment.id) == (["wow"], {"wow": 1})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reactions_of_one_user_are_counted_once(session: Session, comment: Comment):
+    user = session.scalar(select(User))
+
+    await asyncio.gather(*(react(comment.id, reaction, user) for reaction in ("like", "love", "haha", "wow")))
+
+    kinds, counts = stored_reactions(session, comment.id)
+    assert len(kinds) == 1
+    assert counts == {kinds[0]: 1}
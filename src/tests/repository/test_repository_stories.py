@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.database.models import Story, User
+from src.repository import stories as repository_stories
+from src.tests.conftest import async_engine, TestingAsyncSessionLocal
+
+
+@pytest.fixture
+def authors(session: Session):
+    authors = [User(id=1, username="first", email="first@example.com", password="password", avatar="a.png"),
+               User(id=2, username="second", email="second@example.com", password="password")]
+    session.add_all(authors)
+    now = datetime.now()
+    session.add_all([
+        Story(id=1, image_url="1.jpg", user_id=1, created_at=now - timedelta(hours=3)),
+        Story(id=2, image_url="2.jpg", user_id=2, created_at=now - timedelta(hours=2)),
+        Story(id=3, image_url="3.jpg", user_id=1, created_at=now - timedelta(hours=1)),
+        Story(id=4, image_url="4.jpg", user_id=2, created_at=now - timedelta(hours=30)),
+    ])
+    session.commit()
+    return authors
+
+
+async def active_stories():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        async with TestingAsyncSessionLocal() as db:
+            stories = await repository_stories.get_active_stories(db)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return stories, len(statements)
+
+
+@pytest.mark.asyncio
+async def test_active_stories_are_served_from_cache(redis_client, authors):
+    stories, statements = await active_stories()
+
+    assert statements == 1
+    assert [story["id"] for story in stories] == [3, 2, 1]
+    assert stories[0]["user"] == {"id": 1, "username": "first", "avatar": "a.png"}
+
+    cached, statements = await active_stories()
+
+    assert statements == 0
+    assert cached == stories
+
+
+@pytest.mark.asyncio
+async def test_story_changes_update_the_cache(redis_client, authors):
+    await active_stories()
+
+    async with TestingAsyncSessionLocal() as db:
+        await repository_stories.create_story("5.jpg", await db.get(User, 2), db, description="new")
+        await repository_stories.update_story(1, "video", "edited", db)
+        await repository_stories.delete_story(2, db)
+
+    stories, statements = await active_stories()
+
+    assert statements == 0
+    assert [(story["id"], story["description"]) for story in stories] == [(5, "new"), (3, None), (1, "edited")]
+    assert stories[0]["user"]["username"] == "second"
+
+
+@pytest.mark.asyncio
+async def test_unavailable_cache_reads_the_database(authors):
+    stories, statements = await active_stories()
+
+    assert statements == 1
+    assert [story["id"] for story in stories] == [3, 2, 1]
+
+
+def test_group_stories_by_user():
+    stories = [{"id": 3, "user_id": 1, "user": {"username": "first"}},
+               {"id": 2, "user_id": 2, "user": {"username": "second"}},
+               {"id": 1, "user_id": 1, "user": {"username": "first"}}]
+
+    groups = repository_stories.group_stories_by_user(stories)
+
+    assert [group["user"]["username"] for group in groups] == ["first", "second"]
+    assert [[story["id"] for story in group["stories"]] for group in groups] == [[3, 1], [2]]
@@ -2,16 +2,14 @@ import pytest
 from sqlalchemy.orm import Session
 from src.repository import tags
 from src.database.models import Tag
-from unittest.mock import patch
+from src.tests.conftest import TestingAsyncSessionLocal
 
 @pytest.mark.asyncio
 async def test_add_new_tags_to_db_with_new_tags_only(session: Session):
     new_tags = ["tag1", "tag2", "tag3", "tag4", "tag5"]
-       
-    mock_return_value = []
-    
-    with patch.object(session.query(Tag), 'filter', return_value=mock_return_value):
-        response = await tags.add_tags_to_db(picture_id=1, tags=new_tags, db=session)
+
+    async with TestingAsyncSessionLocal() as db:
+        response = await tags.add_tags_to_db(picture_id=1, tags=new_tags, db=db)
 
     assert len(response.new_tags) == len(new_tags)
     for tag_model, new_tag in zip(response.new_tags, new_tags):
@@ -30,10 +28,8 @@ async def test_add_new_tags_to_db_with_existing_tags(session: Session):
     
     all_tags = existing_tags + new_tags
 
-    mock_return_value = [Tag(name=name) for name in existing_tags]
-
-    with patch.object(session.query().filter(), 'all', return_value=mock_return_value):
-        response = await tags.add_tags_to_db(picture_id=1, tags=all_tags, db=session)
+    async with TestingAsyncSessionLocal() as db:
+        response = await tags.add_tags_to_db(picture_id=1, tags=all_tags, db=db)
 
     assert len(response.new_tags) == len(new_tags)
     for tag_model, new_tag in zip(response.new_tags, new_tags):
@@ -53,10 +49,8 @@ async def test_add_new_tags_to_db_with_existing_tags_only(session: Session):
 
     all_tags = existing_tags
 
-    mock_return_value = [Tag(name=name) for name in existing_tags]
-
-    with patch.object(session.query().filter(), 'all', return_value=mock_return_value):
-        response = await tags.add_tags_to_db(picture_id=1, tags=all_tags, db=session)
+    async with TestingAsyncSessionLocal() as db:
+        response = await tags.add_tags_to_db(picture_id=1, tags=all_tags, db=db)
 
     assert len(response.new_tags) == 0
     
@@ -1,7 +1,7 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import Comment, User
 from src.schemas import CommentModel, CommentResponse
@@ -17,7 +17,7 @@ from src.repository.comments import (
 class TestUnitRepositoryComments(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
-        self.session = MagicMock(spec=Session)
+        self.session = AsyncMock(spec=AsyncSession)
         self.user = User(
             id=1,
             username="Username",
@@ -54,7 +54,9 @@ class TestUnitRepositoryComments(unittest.IsolatedAsyncioTestCase):
         comments = [self.comment1, self.comment2, self.comment3]
         skip = 0
         limit = 20
-        self.session.query(Comment).filter().order_by(Comment.created_at.desc()).offset(skip).limit(limit).all.return_value = comments
+        scalars = MagicMock()
+        scalars.all.return_value = comments
+        self.session.scalars.return_value = scalars
 
         result = await get_comments(picture_id=1, db=self.session, skip=skip, limit=limit)
 
@@ -62,12 +64,12 @@ class TestUnitRepositoryComments(unittest.IsolatedAsyncioTestCase):
 
     async def test_get_comment_found(self):
         comment = self.comment1
-        self.session.query().filter().first.return_value = comment
+        self.session.scalar.return_value = comment
         result = await get_comment(comment_id=1, user=self.user, db=self.session)
         self.assertEqual(result, comment)
 
     async def test_get_comment_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.session.scalar.return_value = None
         result = await get_comment(comment_id=1, user=self.user, db=self.session)
         self.assertIsNone(result)
 
@@ -78,14 +80,17 @@ class TestUnitRepositoryComments(unittest.IsolatedAsyncioTestCase):
         result = await create_comment(body=comment_model, picture_id=1, user=self.user, db=self.session)
         self.assertEqual(result.content, comment_model.content)
         self.assertTrue(hasattr(result, "id"))
+        self.session.add.assert_called_once_with(result)
+        self.session.commit.assert_awaited_once()
 
     async def test_update_comment_found(self):
-        comment = CommentModel(
+        body = CommentModel(
             content="Test content")
-        self.session.query().filter().first.return_value = comment
-        self.session.commit.return_value = None
-        result = await update_comment(comment_id=1, body=comment, user=self.user, db=self.session)
+        comment = Comment(id=1, user_id=self.user.id, picture_id=1, content="Old content")
+        self.session.scalar.return_value = comment
+        result = await update_comment(comment_id=1, body=body, user=self.user, db=self.session)
         self.assertEqual(result, comment)
+        self.assertEqual(result.content, "Test content")
 
     async def test_update_comment_not_found(self):
         comment = CommentResponse(
@@ -95,18 +100,18 @@ class TestUnitRepositoryComments(unittest.IsolatedAsyncioTestCase):
             content="Test content",
             created_at="2002-03-15T00:00:00",
             updated_at="2002-03-15T00:00:00")
-        self.session.query().filter().first.return_value = None
-        self.session.commit.return_value = None
+        self.session.scalar.return_value = None
         result = await update_comment(comment_id=2, body=comment, user=self.user, db=self.session)
         self.assertIsNone(result)
 
     async def test_remove_comment_found(self):
         comment = Comment()
-        self.session.query().filter().first.return_value = comment
+        self.session.scalar.return_value = comment
         result = await remove_comment(comment_id=1, user=self.user, db=self.session)
         self.assertEqual(result, comment)
+        self.session.delete.assert_awaited_once_with(comment)
 
     async def test_remove_comment_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.session.scalar.return_value = None
         result = await remove_comment(comment_id=1, user=self.user, db=self.session)
         self.assertIsNone(result)
@@ -1,7 +1,7 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import Picture, User
 from src.repository.descriptions import (
@@ -16,7 +16,7 @@ from src.repository.descriptions import (
 class TestUnitRepositoryDescriptions(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
-        self.session = MagicMock(spec=Session)
+        self.session = AsyncMock(spec=AsyncSession)
         self.user = User(
             id=1,
             username="Username",
@@ -52,6 +52,7 @@ class TestUnitRepositoryDescriptions(unittest.IsolatedAsyncioTestCase):
     async def test_upload_description(self):
         picture = self.picture1
         test_description = "test description no.1"
+        self.session.scalar.return_value = picture
         result = await upload_description(picture_id=picture.id, description=test_description, db=self.session)
         self.assertEqual(result.description, test_description)
         self.assertTrue(hasattr(result, "id"))
@@ -60,10 +61,9 @@ class TestUnitRepositoryDescriptions(unittest.IsolatedAsyncioTestCase):
         pictures = [self.picture1, self.picture2, self.picture3]
         pictures_descriptions = [picture.description for picture in pictures]
 
-        mock_query = self.session.query.return_value
-        mock_offset = mock_query.offset.return_value
-        mock_limit = mock_offset.limit.return_value
-        mock_limit.all.return_value = pictures
+        result = MagicMock()
+        result.all.return_value = pictures
+        self.session.execute.return_value = result
 
         result = await get_all_descriptions(skip=0, limit=100, db=self.session)
 
@@ -74,39 +74,42 @@ class TestUnitRepositoryDescriptions(unittest.IsolatedAsyncioTestCase):
 
     async def test_get_one_description_picture_found(self):
         picture = self.picture2
-        self.session.query().filter().first.return_value = picture
+        result = MagicMock()
+        result.first.return_value = picture
+        self.session.execute.return_value = result
         result = await get_one_description(picture_id=2, db=self.session)
         self.assertEqual(result.description, picture.description)
         self.assertEqual(result.id, picture.id)
 
     async def test_get_one_description_picture_not_found(self):
-        self.session.query().filter(Picture.id == 999).first.return_value = None
+        result = MagicMock()
+        result.first.return_value = None
+        self.session.execute.return_value = result
         result = await get_one_description(picture_id=999, db=self.session)
         self.assertIsNone(result)
 
     async def test_update_description_picture_found(self):
         new_description = "New test description"
         picture_to_update = self.picture1
-        self.session.query().filter().first.return_value = picture_to_update
+        self.session.scalar.return_value = picture_to_update
         result = await update_description(picture_id=picture_to_update.id, new_description=new_description, db=self.session)
         self.assertEqual(result.description, new_description)
         self.assertEqual(result.id, picture_to_update.id)
 
     async def test_update_description_picture_not_found(self):
         new_description = "New test description"
-        self.session.query().filter().first.return_value = None
-        self.session.commit.return_value = None
+        self.session.scalar.return_value = None
         result = await update_description(picture_id=999, new_description=new_description ,db=self.session)
         self.assertIsNone(result)
 
     async def test_delete_description_picture_found(self):
         picture = self.picture2
-        self.session.query().filter().first.return_value = picture
+        self.session.scalar.return_value = picture
         result = await delete_description(picture_id=picture.id, db=self.session)
         self.assertEqual(result, picture)
         self.assertEqual(result.description, None)
 
     async def test_delete_description_picture_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.session.scalar.return_value = None
         result = await delete_description(picture_id=999, db=self.session)
         self.assertIsNone(result)
@@ -1,7 +1,7 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
 
@@ -21,7 +21,7 @@ from src.repository.pictures import (
 class TestUnitRepositoryPictures(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
-        self.session = MagicMock(spec=Session)
+        self.session = AsyncMock(spec=AsyncSession)
         self.user = User(
             id=1,
             username="Username",
@@ -71,14 +71,15 @@ class TestUnitRepositoryPictures(unittest.IsolatedAsyncioTestCase):
         result = await upload_picture(picture_url=picture.picture_url, picture_json=picture.picture_json, qr=picture.qr_code_picture, user=self.user, db=self.session)
         self.assertEqual(result.picture_url, picture.picture_url)
         self.assertTrue(hasattr(result, "id"))
+        self.session.commit.assert_awaited_once()
+        self.session.refresh.assert_awaited_once_with(result, ["tags"])
 
     async def test_get_all_pictures(self):
         pictures = [self.picture1, self.picture2, self.picture3]
 
-        mock_query = self.session.query.return_value
-        mock_offset = mock_query.offset.return_value
-        mock_limit = mock_offset.limit.return_value
-        mock_limit.all.return_value = pictures
+        scalars = MagicMock()
+        scalars.all.return_value = pictures
+        self.session.scalars.return_value = scalars
 
         result = await get_all_pictures(skip=0, limit=100, db=self.session)
 
@@ -90,41 +91,41 @@ class TestUnitRepositoryPictures(unittest.IsolatedAsyncioTestCase):
 
     async def test_get_one_picture_found(self):
         picture = self.picture1
-        self.session.query().filter().first.return_value = picture
+        self.session.scalar.return_value = picture
         result = await get_one_picture(picture_id=1, db=self.session)
         self.assertEqual(result, picture)
         self.assertEqual(result.id, picture.id)
 
     async def test_get_one_picture_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.session.scalar.return_value = None
         result = await get_one_picture(picture_id=1, db=self.session)
         self.assertIsNone(result)
 
     async def test_update_picture_found(self):
         updated_picture_data = self.picture2
         picture_to_update = self.picture1
-        self.session.query().filter().first.return_value = picture_to_update
+        self.session.scalar.return_value = picture_to_update
         result = await update_picture(picture_id=updated_picture_data.id, url=updated_picture_data.picture_url, user=self.user ,db=self.session)
         self.assertEqual(result, picture_to_update)
         self.assertEqual(result.id, picture_to_update.id)
 
     async def test_update_picture_not_found(self):
         updated_picture_data = self.picture2
-        self.session.query().filter().first.return_value = None
-        self.session.commit.return_value = None
+        self.session.scalar.return_value = None
         result = await update_picture(picture_id=updated_picture_data.id, url=updated_picture_data.picture_url, user=self.user ,db=self.session)
         self.assertIsNone(result)
 
     async def test_delete_picture_found(self):
         picture = self.picture1
-        self.session.query().filter().first.return_value = picture
+        self.session.scalar.return_value = picture
         result = await delete_picture(picture_id=picture.id, db=self.session)
         self.assertEqual(result, picture)
         self.assertEqual(result.id, picture.id)
+        self.session.delete.assert_awaited_once_with(picture)
 
     async def test_delete_picture_not_found(self):
         picture = self.picture1
-        self.session.query().filter().first.return_value = None
+        self.session.scalar.return_value = None
         result = await delete_picture(picture_id=picture.id, db=self.session)
         self.assertIsNone(result)
 
@@ -187,7 +188,7 @@ class TestUnitRepositoryPictures(unittest.IsolatedAsyncioTestCase):
         picture_edited_url = "http://edited_picture.com"
         qr = "http://edited_qr_code.com"
 
-        db_session = MagicMock(spec=Session)
+        db_session = AsyncMock(spec=AsyncSession)
 
         result = await upload_edited_picture(picture, picture_edited, picture_edited_url, qr, db_session)
 
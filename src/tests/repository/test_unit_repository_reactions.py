@@ -1,15 +1,17 @@
 import unittest
-from collections import Counter, OrderedDict
-from unittest.mock import MagicMock
+from collections import OrderedDict
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import Reaction, User
+from src.database.models import User
 
 from src.repository.reactions import (
     add_reaction_to_comment,
     remove_reaction_from_comment,
     get_reactions,
+    get_reactions_for_comments,
+    get_reaction_counts,
     get_number_of_reactions
 )
 
@@ -17,7 +19,14 @@ from src.repository.reactions import (
 class TestUnitRepositoryReactions(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
-        self.session = MagicMock(spec=Session)
+        self.session = AsyncMock(spec=AsyncSession)
+        self.session.get_bind.return_value.dialect.name = "sqlite"
+        cache_patch = patch("src.repository.reactions.counts_cache")
+        self.counts_cache = cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+        self.counts_cache.get_many = AsyncMock(return_value={})
+        self.counts_cache.set_many = AsyncMock()
+        self.counts_cache.delete = AsyncMock()
         self.user = User(
             id=1,
             username="Username",
@@ -28,71 +37,94 @@ class TestUnitRepositoryReactions(unittest.IsolatedAsyncioTestCase):
             refresh_token="refresh_token",
             confirmed=False
         )
-        self.reaction_1 = Reaction(
-            id=1,
-            comment_id=1,
-            data={"like": [1]}
-        )
-        self.reaction_2 = Reaction(
-            id=2,
-            comment_id=2,
-            data={"like": [1, 4, 8], "wow": [2, 3], "haha": [5, 7, 10, 13]}
-        )
 
-    # async def test_get_all_reactions_for_comment_found(self):
-    #     reaction_record = self.reaction_1
-    #     self.session.query(Reaction).filter(Reaction.comment_id == 1).first.return_value = reaction_record
-    #     self.session.query(User).filter(User.id == 1).first.return_value = self.user
-    #
-    #     result = await get_reactions(comment_id=1, db=self.session)
-    #
-    #     expected_reactions = {}
-    #     for react, users in reaction_record.data.items():
-    #         for user_id in users:
-    #             user = self.session.query(User).filter(User.id == user_id).first()
-    #             if user:
-    #                 expected_reactions[user.username] = react
-    #
-    #     self.assertEqual(result, expected_reactions)
+    def set_rows(self, rows):
+        result = MagicMock()
+        result.all.return_value = rows
+        self.session.execute.return_value = result
+
+    async def test_get_all_reactions_for_comment_found(self):
+        self.set_rows([(1, "Username", "like"), (1, "Other", "wow")])
+        result = await get_reactions(comment_id=1, db=self.session)
+        self.assertEqual(result, {"Username": "like", "Other": "wow"})
 
     async def test_get_all_reactions_for_comment_not_found(self):
-        self.session.query(Reaction).filter().first.return_value = None
+        self.set_rows([])
         result = await get_reactions(comment_id=1, db=self.session)
         self.assertEqual(result, {})
 
+    async def test_get_reactions_for_comments_in_one_query(self):
+        self.set_rows([(1, "Username", "like"), (3, "Username", "wow"), (3, "Other", "haha")])
+        result = await get_reactions_for_comments(comment_ids=[1, 2, 3], db=self.session)
+        self.assertEqual(result, {1: {"Username": "like"}, 2: {}, 3: {"Username": "wow", "Other": "haha"}})
+        self.session.execute.assert_awaited_once()
+
+    async def test_get_reactions_for_no_comments(self):
+        result = await get_reactions_for_comments(comment_ids=[], db=self.session)
+        self.assertEqual(result, {})
+        self.session.execute.assert_not_awaited()
+
+    async def test_get_reaction_counts_reads_missing_comments_in_one_query(self):
+        self.counts_cache.get_many.return_value = {1: {"like": 1}}
+        self.set_rows([(2, "haha", 4), (2, "like", 3)])
+        result = await get_reaction_counts(comment_ids=[1, 2, 3], db=self.session)
+        self.assertEqual(result, {1: {"like": 1}, 2: {"haha": 4, "like": 3}, 3: {}})
+        self.session.execute.assert_awaited_once()
+        self.counts_cache.set_many.assert_awaited_once_with({2: {"haha": 4, "like": 3}, 3: {}})
+
+    async def test_get_reaction_counts_all_cached(self):
+        self.counts_cache.get_many.return_value = {1: {"like": 1}, 2: {}}
+        result = await get_reaction_counts(comment_ids=[1, 2], db=self.session)
+        self.assertEqual(result, {1: {"like": 1}, 2: {}})
+        self.session.execute.assert_not_awaited()
+
     async def test_get_number_of_reactions_found(self):
-        reactions = self.reaction_2
-        self.session.query().filter().first.return_value = reactions
-        reactions_data = reactions.data
-        number_of_reactions = Counter()
-        for react, users in reactions_data.items():
-            number_of_reactions[react] = len(users)
-        numbers_of_reactions = OrderedDict(number_of_reactions.most_common())
+        self.set_rows([(2, "haha", 4), (2, "like", 3), (2, "wow", 2)])
         result = await get_number_of_reactions(comment_id=2, db=self.session)
-        self.assertEqual(result, numbers_of_reactions)
+        self.assertEqual(result, OrderedDict([("haha", 4), ("like", 3), ("wow", 2)]))
+        self.assertEqual(list(result), ["haha", "like", "wow"])
 
     async def test_get_number_of_reactions_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.set_rows([])
         result = await get_number_of_reactions(comment_id=2, db=self.session)
         self.assertEqual(result, {"message": "No reaction for comment"})
 
     async def test_add_reaction_if_not_record(self):
+        self.session.scalar.return_value = None
         result = await add_reaction_to_comment(comment_id=1, reaction="like", user=self.user, db=self.session)
         self.assertEqual(result, {"message": "The reaction was added"})
+        self.assertEqual(self.session.execute.await_count, 3)
+        self.session.commit.assert_awaited_once()
+        self.counts_cache.delete.assert_awaited_once_with(1)
+
+    async def test_add_reaction_replaces_previous_reaction(self):
+        self.session.scalar.return_value = "wow"
+        result = await add_reaction_to_comment(comment_id=1, reaction="like", user=self.user, db=self.session)
+        self.assertEqual(result, {"message": "The reaction was added"})
+        self.assertEqual(self.session.execute.await_count, 4)
+        self.session.commit.assert_awaited_once()
+
+    async def test_add_same_reaction_again_changes_nothing(self):
+        self.session.scalar.return_value = "like"
+        result = await add_reaction_to_comment(comment_id=1, reaction="like", user=self.user, db=self.session)
+        self.assertEqual(result, {"message": "The reaction was added"})
+        self.session.execute.assert_awaited_once()
+
+    async def test_add_reaction_rejects_unknown_reaction(self):
+        with self.assertRaises(ValueError):
+            await add_reaction_to_comment(comment_id=1, reaction="angry", user=self.user, db=self.session)
+        self.session.commit.assert_not_awaited()
 
     async def test_remove_reaction_record_found(self):
-        reactions = self.reaction_1
-        self.session.query().filter().first.return_value = reactions
+        self.session.scalar.return_value = "like"
         result = await remove_reaction_from_comment(comment_id=1, user=self.user, db=self.session)
         self.assertEqual(result, {"message": "Reaction was deleted"})
-
-    async def test_remove_reaction_from_data_found(self):
-        reactions = self.reaction_2
-        self.session.query().filter().first.return_value = reactions
-        result = await remove_reaction_from_comment(comment_id=2, user=self.user, db=self.session)
-        self.assertEqual(result, {"message": "Reaction was deleted"})
+        self.assertEqual(self.session.execute.await_count, 2)
+        self.session.commit.assert_awaited_once()
+        self.counts_cache.delete.assert_awaited_once_with(1)
 
     async def test_remove_reaction_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.session.scalar.return_value = None
         result = await remove_reaction_from_comment(comment_id=1, user=self.user, db=self.session)
         self.assertEqual(result, {"message": "No reaction for comment"})
+        self.session.commit.assert_not_awaited()
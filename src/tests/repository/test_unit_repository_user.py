@@ -1,7 +1,7 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
 from src.repository.users import (
@@ -16,7 +16,7 @@ from src.repository.users import (
 
 class TestUsers(unittest.IsolatedAsyncioTestCase):
     def setUp(self) -> None:
-        self.session = MagicMock(spec=Session)
+        self.session = AsyncMock(spec=AsyncSession)
         self.body = User(
             id=1,
             username="Username",
@@ -30,7 +30,7 @@ class TestUsers(unittest.IsolatedAsyncioTestCase):
 
     async def test_get_user_by_email_found(self):
         user = User
-        self.session.query().filter().first.return_value = user
+        self.session.scalar.return_value = user
         result = await get_user_by_email(email=user.email, db=self.session)
 
         self.assertEqual(result, user)
@@ -46,7 +46,7 @@ class TestUsers(unittest.IsolatedAsyncioTestCase):
             refresh_token="refresh_token",
             confirmed=False,
         )
-        self.session.query().filter().first.return_value = user
+        self.session.scalar.return_value = user
         result = await get_user_by_username(username=user.username, db=self.session)
 
         self.assertEqual(result.id, user.id)
@@ -55,7 +55,7 @@ class TestUsers(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.avatar, user.avatar)
 
     async def test_get_nonexistent_user_by_username(self):
-        self.session.query().filter().first.return_value = None
+        self.session.scalar.return_value = None
 
         with self.assertRaises(HTTPException) as context:
             await get_user_by_username(username="nonexistent_user", db=self.session)
@@ -65,7 +65,7 @@ class TestUsers(unittest.IsolatedAsyncioTestCase):
 
     async def test_get_user_by_email_not_fount(self):
         email = "example@example.com"
-        self.session.query().filter().first.return_value = None
+        self.session.scalar.return_value = None
         result = await get_user_by_email(email=email, db=self.session)
 
         self.assertIsNone(result)
@@ -85,21 +85,21 @@ class TestUsers(unittest.IsolatedAsyncioTestCase):
 
     async def test_update_token(self):
         body = self.body
-        self.session.query().filter().first.return_value = body
+        self.session.scalar.return_value = body
         await update_token(user=body, token="new_token", db=self.session)
 
         self.assertEqual(body.refresh_token, "new_token")
 
     async def test_confirmed_email(self):
         body = self.body
-        self.session.query().filter().first.return_value = body
+        self.session.scalar.return_value = body
         await confirmed_email(email=body.email, db=self.session)
 
         self.assertTrue(body.confirmed)
 
     async def test_update_avatar(self):
         body = self.body
-        self.session.query().filter().first.return_value = body
+        self.session.scalar.return_value = body
         await update_avatar(email=body.email, url="new_avatar", db=self.session)
 
         self.assertEqual(body.avatar, "new_avatar")
@@ -1,7 +1,7 @@
 from unittest.mock import patch
 
 from src.services.auth import auth_service
-from src.tests.conftest import login_user_token_created
+from src.tests.conftest import FakeRedis, login_user_token_created
 
 
 def test_get_all_comments_for_picture_if_found(session, client):
@@ -26,8 +26,7 @@ def test_get_all_comments_for_picture_if_not_found(session, client):
 
 def test_get_comment_if_found(session, client, user):
     new_user = login_user_token_created(user, session)
-    with patch.object(auth_service, "r") as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, "client", FakeRedis()):
         response = client.get("api/comments/1", headers={"accept": "application/json",
                                                          "Authorization": f"Bearer {new_user['access_token']}"
                                                          }, params={"comment_id": 1})
@@ -40,8 +39,7 @@ def test_get_comment_if_found(session, client, user):
 
 def test_get_comment_if_not_found(session, client, user):
     new_user = login_user_token_created(user, session)
-    with patch.object(auth_service, "r") as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, "client", FakeRedis()):
         response = client.get("api/comments/4", headers={"accept": "application/json",
                                                          "Authorization": f"Bearer {new_user['access_token']}"
                                                          }, params={"comment_id": 4})
@@ -53,8 +51,7 @@ def test_get_comment_if_not_found(session, client, user):
 
 def test_create_comment(session, client, user):
     new_user = login_user_token_created(user, session)
-    with patch.object(auth_service, "r") as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, "client", FakeRedis()):
         response = client.post("api/comments/", headers={"accept": "application/json",
                                                          "Authorization": f"Bearer {new_user['access_token']}"
                                                          }, json={"content": "test content"}, params={"picture_id": 1})
@@ -66,8 +63,7 @@ def test_create_comment(session, client, user):
 
 def test_update_comment_if_found(session, client, user):
     new_user = login_user_token_created(user, session)
-    with patch.object(auth_service, "r") as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, "client", FakeRedis()):
         response = client.put("api/comments/1", headers={"accept": "application/json",
                                                          "Authorization": f"Bearer {new_user['access_token']}"
                                                          }, json={"content": "new content"}, params={"comment_id": 1})
@@ -79,8 +75,7 @@ def test_update_comment_if_found(session, client, user):
 
 def test_update_comment_if_not_found(session, client, user):
     new_user = login_user_token_created(user, session)
-    with patch.object(auth_service, "r") as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, "client", FakeRedis()):
         response = client.put("api/comments/4", headers={"accept": "application/json",
                                                          "Authorization": f"Bearer {new_user['access_token']}"
                                                          }, json={"content": "new content"}, params={"comment_id": 4})
@@ -92,8 +87,7 @@ def test_update_comment_if_not_found(session, client, user):
 
 def test_delete_comment_if_admin(session, client, admin):
     new_user = login_user_token_created(admin, session)
-    with patch.object(auth_service, "r") as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, "client", FakeRedis()):
         response = client.delete("api/comments/1", headers={"accept": "application/json",
                                                             "Authorization": f"Bearer {new_user['access_token']}"
                                                             }, params={"comment_id": 1})
@@ -105,8 +99,7 @@ def test_delete_comment_if_admin(session, client, admin):
 
 def test_delete_comment_not_found_if_admin_(session, client, admin):
     new_user = login_user_token_created(admin, session)
-    with patch.object(auth_service, "r") as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, "client", FakeRedis()):
         response = client.delete("api/comments/4", headers={"accept": "application/json",
                                                             "Authorization": f"Bearer {new_user['access_token']}"
                                                             }, params={"comment_id": 4})
@@ -118,8 +111,7 @@ def test_delete_comment_not_found_if_admin_(session, client, admin):
 
 def test_delete_comment_if_user(session, client, user):
     new_user = login_user_token_created(user, session)
-    with patch.object(auth_service, "r") as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, "client", FakeRedis()):
         response = client.delete("api/comments/1", headers={"accept": "application/json",
                                                             "Authorization": f"Bearer {new_user['access_token']}"
                                                             }, params={"comment_id": 1})
@@ -6,7 +6,7 @@ from datetime import datetime
 from main import app
 from src.database.models import Picture
 from src.services.auth import auth_service
-from src.tests.conftest import login_user_token_created, login_user_token_created_unconfirmed
+from src.tests.conftest import FakeRedis, login_user_token_created, login_user_token_created_unconfirmed
 
 client = TestClient(app)
 
@@ -30,8 +30,7 @@ def test_upload_description_picture_found(user, session, client):
 
     new_description = "Test of description uploading"
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.post(
             f"/api/descriptions/upload/",
             headers={
@@ -55,8 +54,7 @@ def test_upload_description_picture_found_unauthorized(user, session, client):
 
     new_description = "Test of description uploading"
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.post(
             f"/api/descriptions/upload/",
             headers={
@@ -78,8 +76,7 @@ def test_upload_description_picture_not_found(user, session, client):
 
     new_description = "Test of description uploading"
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.post(
             f"/api/descriptions/upload/",
             headers={
@@ -100,8 +97,7 @@ def test_get_all_descriptions(user, session, client):
     for i in range(no_of_pictures):
         list_of_descriptions.append(pictures[i].description)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.get(
             "/api/descriptions/",
             headers={
@@ -126,8 +122,7 @@ def test_get_all_descriptions_unauthorized(user, session, client):
     for i in range(no_of_pictures):
         list_of_descriptions.append(pictures[i].description)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.get(
             "/api/descriptions/",
             headers={
@@ -146,8 +141,7 @@ def test_get_one_description_picture_found(user, session, client):
     pictures = create_x_pictures(session, no_of_pictures)
     description = pictures[no_to_get - 1].description
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.get(
             f"/api/descriptions/{no_to_get}",
             headers={
@@ -168,8 +162,7 @@ def test_get_one_description_picture_found_unauthorized(user, session, client):
     pictures = create_x_pictures(session, no_of_pictures)
     description = pictures[no_to_get - 1].description
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.get(
             f"/api/descriptions/{no_to_get}",
             headers={
@@ -187,8 +180,7 @@ def test_get_one_description_picture_not_found(user, session, client):
     no_to_get = no_of_pictures + 100
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.get(
             f"api/descriptions/{no_to_get}",
             headers={
@@ -208,8 +200,7 @@ def test_update_description_picture_found(admin, session, client):
 
     updated_description = "Test of updating description"
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.put(
             f"/api/descriptions/{no_to_update}",
             headers={
@@ -232,8 +223,7 @@ def test_update_description_picture_found_unauthorized(user, session, client):
 
     updated_description = "Test of updating description"
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.put(
             f"/api/descriptions/{no_to_update}",
             headers={
@@ -253,8 +243,7 @@ def test_update_description_picture_not_found(admin, session, client, mock_pictu
     no_to_update = no_of_pictures + 100
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.put(
             f"/api/descriptions/{no_to_update}",
             headers={
@@ -273,8 +262,7 @@ def test_delete_description_picture_found(admin, session, client):
     no_to_delete = no_of_pictures - 1
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.delete(
             f"/api/descriptions/{no_to_delete}",
             headers={
@@ -294,8 +282,7 @@ def test_delete_description_picture_found_unauthorized(user, session, client):
     no_to_delete = no_of_pictures - 1
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.delete(
             f"/api/descriptions/{no_to_delete}",
             headers={
@@ -313,8 +300,7 @@ def test_delete_description_picture_not_found(admin, session, client):
     no_to_delete = no_of_pictures + 100
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.delete(
             f"/api/descriptions/{no_to_delete}",
             headers={
@@ -2,11 +2,14 @@ import pytest
 
 from unittest.mock import patch, MagicMock
 from datetime import datetime
+from sqlalchemy import event
 
-from src.database.models import Picture
+from src.database.models import Picture, User, Tag, Rating, Comment
 from src.services.auth import auth_service
-from src.tests.conftest import login_user_token_created, login_user_token_created_unconfirmed
+from src.tests.conftest import FakeRedis, async_engine, login_user_token_created, login_user_token_created_unconfirmed, \
+    TestingAsyncSessionLocal
 from src.routes import pictures
+from src.services.storage import StorageService, CloudinaryBackend
 
 
 
@@ -23,13 +26,76 @@ def create_x_pictures(session, no_of_pictures):
     return pictures
 
 
+def create_x_feed_pictures(session, no_of_pictures):
+    """
+    Create pictures that each have their own uploader, tag, rating and comment.
+    """
+    for i in range(no_of_pictures):
+        uploader = User(username=f"uploader{i}", email=f"uploader{i}@example.com", password="secret")
+        picture = Picture(picture_url=f"feed_url{i}",
+                          description=f"feed_description{i}",
+                          created_at=datetime.now(),
+                          user=uploader,
+                          tags=[Tag(name=f"feed_tag{i}")])
+        session.add_all([uploader, picture])
+        session.flush()
+        session.add(Rating(picture_id=picture.id, user_id=uploader.id, rat=5))
+        session.add(Comment(picture_id=picture.id, user_id=uploader.id, content="feed comment"))
+    session.commit()
+    session.expunge_all()
+
+
+def count_statements(request_page):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = request_page()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements), response
+
+
+@pytest.mark.parametrize("cursor", [None, ""])
+def test_get_all_pictures_fixed_number_of_statements(session, client, cursor):
+    create_x_feed_pictures(session, 30)
+
+    small_page, response = count_statements(lambda: client.get("/api/pictures/", params={"limit": 2, "cursor": cursor}))
+    assert len(response.json()) == 2
+    session.expunge_all()
+    large_page, response = count_statements(lambda: client.get("/api/pictures/", params={"limit": 25, "cursor": cursor}))
+    assert len(response.json()) == 25
+
+    assert 0 < small_page == large_page
+
+
+def test_feed_fixed_number_of_statements(user, session, client):
+    tokens = login_user_token_created(user, session)
+    create_x_feed_pictures(session, 30)
+    client.cookies.set("refresh_token", tokens["refresh_token"])
+    # Resolve the session first, so both pages are served with the user cached.
+    client.get("/feed", params={"cursor": ""})
+
+    with patch("src.repository.pictures.FEED_PAGE_SIZE", 2):
+        small_page, response = count_statements(lambda: client.get("/feed", params={"cursor": ""}))
+    assert response.text.count('class="instagram-card"') == 2
+    session.expunge_all()
+    with patch("src.repository.pictures.FEED_PAGE_SIZE", 25):
+        large_page, response = count_statements(lambda: client.get("/feed", params={"cursor": ""}))
+    assert response.text.count('class="instagram-card"') == 25
+
+    assert small_page == large_page
+
+
 def test_upload_picture(user, session, client, mock_picture):
     new_user = login_user_token_created(user, session)
 
     mock_picture1 = {"picture": ("test_image.png", mock_picture, "image/png")}
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.post(
             "/api/pictures/upload",
             headers={
@@ -52,8 +118,7 @@ def test_upload_picture_unauthorized(user, session, client, mock_picture):
 
     mock_picture1 = {"picture": ("test_image.png", mock_picture, "image/png")}
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.post(
             "/api/pictures/upload",
             headers={
@@ -71,8 +136,7 @@ def test_get_all_pictures(user, session, client):
     no_of_pictures = 4
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.get(
             "/api/pictures/",
             headers={
@@ -92,14 +156,48 @@ def test_get_all_pictures(user, session, client):
             assert "created_at" in data[i]
 
 
+def test_get_all_pictures_cursor(user, session, client):
+    new_user = login_user_token_created(user, session)
+    no_of_pictures = 5
+    pictures = create_x_pictures(session, no_of_pictures)
+    expected_ids = [picture.id for picture in sorted(pictures, key=lambda p: (p.created_at, p.id), reverse=True)]
+
+    received_ids = []
+    cursor = ""
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
+        while cursor is not None:
+            response = client.get(
+                "/api/pictures/",
+                params={"cursor": cursor, "limit": 2},
+                headers={
+                    'accept': 'application/json',
+                    "Authorization": f"Bearer {new_user['access_token']}"
+                },
+            )
+            data = response.json()
+
+            assert response.status_code == 200, response.text
+            assert len(data) <= 2
+            received_ids.extend(picture["id"] for picture in data)
+            cursor = response.headers.get("X-Next-Cursor")
+
+    assert received_ids == expected_ids
+
+
+def test_get_all_pictures_invalid_cursor(client):
+    response = client.get("/api/pictures/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400, response.text
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
 def test_get_one_picture_found(user, session, client):
     new_user = login_user_token_created(user, session)
     no_of_pictures = 4
     no_to_get = no_of_pictures - 1
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.get(
             f"/api/pictures/{no_to_get}",
             headers={
@@ -122,8 +220,7 @@ def test_get_one_picture_found_unauthorized(user, session, client):
     no_to_get = no_of_pictures - 1
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.get(
             f"/api/pictures/{no_to_get}",
             headers={
@@ -141,8 +238,7 @@ def test_get_one_picture_not_found(user, session, client):
     no_to_get = no_of_pictures + 100
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.get(
             f"api/pictures/{no_to_get}",
             headers={
@@ -161,8 +257,7 @@ def test_update_picture_found(admin, session, client, mock_picture):
     no_to_update = no_of_pictures - 1
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.put(
             f"/api/pictures/{no_to_update}",
             headers={
@@ -187,8 +282,7 @@ def test_update_picture_found_unauthorized(user, session, client, mock_picture):
     no_to_update = no_of_pictures - 1
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.put(
             f"/api/pictures/{no_to_update}",
             headers={
@@ -208,8 +302,7 @@ def test_update_picture_not_found(admin, session, client, mock_picture):
     no_to_update = no_of_pictures + 100
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.put(
             f"/api/pictures/{no_to_update}",
             headers={
@@ -228,8 +321,7 @@ def test_delete_picture_found(admin, session, client):
     no_to_delete = no_of_pictures - 1
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.delete(
             f"/api/pictures/{no_to_delete}",
             headers={
@@ -251,8 +343,7 @@ def test_delete_picture_found_unauthorized(user, session, client):
     no_to_delete = no_of_pictures - 1
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.delete(
             f"/api/pictures/{no_to_delete}",
             headers={
@@ -270,8 +361,7 @@ def test_delete_picture_not_found(admin, session, client):
     no_to_delete = no_of_pictures + 100
     pictures = create_x_pictures(session, no_of_pictures)
 
-    with patch.object(auth_service, 'r') as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()):
         response = client.delete(
             f"/api/pictures/{no_to_delete}",
             headers={
@@ -300,13 +390,12 @@ async def test_edit_picture(admin, session, client):
     picture_mock = MagicMock()
     picture_mock.picture_json = {"public_id": "public_id", "version": "version"}
 
-    with patch.object(auth_service, 'r') as r_mock, \
+    with patch.object(auth_service.user_cache, 'client', FakeRedis()), \
         patch("src.routes.pictures.repository_pictures.get_one_picture", return_value=picture_mock) as mock_get_one_picture, \
         patch("src.routes.pictures.cloudinary.uploader.upload") as mock_cloudinary_upload, \
         patch("src.routes.pictures.generate_qr_and_upload_to_cloudinary") as mock_generate_qr_and_upload, \
         patch("src.routes.pictures.cloudinary.CloudinaryImage") as mock_cloudinary_image:
 
-        r_mock.get.return_value = None
         response = client.post(
             "/api/pictures/edit/{picture_id}",
             headers={
@@ -331,10 +420,42 @@ async def test_edit_picture(admin, session, client):
         mock_generate_qr_and_upload.side_effect = mock_qr_upload
         mock_cloudinary_image.return_value.build_url = mock_build_url
 
-        edited_picture = await pictures.edit_picture(picture_id, picture_edit, admin, db=session)
+        async with TestingAsyncSessionLocal() as db:
+            edited_picture = await pictures.edit_picture(picture_id, picture_edit, admin, db=db)
 
     assert edited_picture == {
         "picture_edited_url": expected_edited_url,
         "qr_code_picture_edited": expected_qr_url
     }
     assert response.status_code == 422, response.text
+
+
+@pytest.mark.asyncio
+async def test_edit_deduplicated_pictures_keeps_edits_apart(session):
+    upload = {"public_id": "picture/shared", "version": 1, "folder": "picture"}
+    owners = [User(username=f"owner{i}", email=f"owner{i}@example.com", password="secret") for i in range(2)]
+    shared = [Picture(picture_url="https://res.cloudinary.com/dummy/image/upload/v1/picture/shared",
+                      picture_json=upload, user=owner) for owner in owners]
+    session.add_all(owners + shared)
+    session.commit()
+    picture_edit = MagicMock(improve="0", contrast="0", unsharp_mask="500", brightness="10", gamma="50",
+                             grayscale=False, redeye=False, gen_replace="from_null;to_null", gen_remove="prompt_null")
+
+    def fake_upload(file, **options):
+        return {"public_id": options["public_id"], "version": 1, "folder": "picture"}
+
+    async def fake_qr(url, picture=None, version=None):
+        return f"qr-for-{picture['public_id']}"
+
+    results = []
+    with patch("src.routes.pictures.storage_service", StorageService(CloudinaryBackend(), max_workers=1)), \
+            patch("src.services.storage.cloudinary.uploader.upload", side_effect=fake_upload), \
+            patch("src.routes.pictures.generate_qr_and_upload_to_cloudinary", side_effect=fake_qr):
+        for owner, picture in zip(owners, shared):
+            async with TestingAsyncSessionLocal() as db:
+                results.append(await pictures.edit_picture(picture.id, picture_edit, owner, db=db))
+
+    edited_urls = {result["picture_edited_url"] for result in results}
+    edited_qrs = {result["qr_code_picture_edited"] for result in results}
+    assert len(edited_urls) == len(edited_qrs) == 2
+    assert edited_qrs == {f"qr-for-picture/shared_{picture.id}_edited" for picture in shared}
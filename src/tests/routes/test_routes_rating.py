@@ -1,11 +1,20 @@
+from src.database.models import Picture
 from src.tests.conftest import login_user_token_created
 
 
+def create_picture(session):
+    picture = Picture(id=1, picture_url="test_url")
+    session.add(picture)
+    session.commit()
+    return picture
+
+
 def test_routes_rating(user, admin, picture_s, session, client):
     user_1 = login_user_token_created(user, session)
     user_2 = login_user_token_created(admin, session)
 
     picture = picture_s
+    create_picture(session)
 
     response = client.post(
         "/api/rating/",
@@ -69,6 +78,9 @@ def test_routes_rating(user, admin, picture_s, session, client):
     assert response.status_code == 200
     assert response.json() == {"average_rating": 3.5}
 
+    stored = session.query(Picture.rating_sum, Picture.rating_count).filter(Picture.id == 1).one()
+    assert (stored.rating_sum, stored.rating_count) == (7, 2)
+
     response = client.post(
         "/api/rating/average/picture",
         json={"picture_id": 2}
@@ -85,6 +97,10 @@ def test_routes_rating(user, admin, picture_s, session, client):
     assert response.status_code == 200
     assert response.json() == {"message": "Rating removed successfully."}
 
+    session.expire_all()
+    stored = session.query(Picture.rating_sum, Picture.rating_count).filter(Picture.id == 1).one()
+    assert (stored.rating_sum, stored.rating_count) == (2, 1)
+
     response = client.delete(
         "/api/rating/1",
         headers={"Authorization": f"Bearer {user_1.get('access_token')}"},
@@ -97,6 +113,7 @@ def test_routes_rating_admin(user, admin, picture_s, session, client):
     user_1 = login_user_token_created(user, session)
     user_2 = login_user_token_created(admin, session)
     picture = picture_s
+    create_picture(session)
 
     client.post(
         "/api/rating/",
@@ -2,7 +2,7 @@ from unittest.mock import patch
 
 from src.database.models import User
 from src.services.auth import auth_service
-from src.tests.conftest import login_user_token_created
+from src.tests.conftest import FakeRedis, login_user_token_created
 
 
 def test_get_all_reactions_for_comment(session, client):
@@ -15,6 +15,27 @@ def test_get_all_reactions_for_comment(session, client):
     assert response.json() == {"test name": "like"}
 
 
+def test_get_reactions_for_many_comments(session, client):
+    session.add_all([User(id=1, username="test name", email="example@test.pl", password="secret"),
+                     User(id=2, username="second name", email="second@test.pl", password="secret")])
+    session.commit()
+    response = client.get("api/reactions/", params={"comment_ids": [1, 2, 3]})
+    assert response.status_code == 200, response.text
+    assert response.json() == {"1": {"test name": "like"}, "2": {"second name": "like"}, "3": {}}
+
+
+def test_get_reactions_for_too_many_comments(session, client):
+    response = client.get("api/reactions/", params={"comment_ids": list(range(201))})
+    assert response.status_code == 422, response.text
+
+
+def test_get_reaction_counts_for_many_comments(session, client):
+    response = client.get("api/reactions/counts", params={"comment_ids": [2, 1, 3]})
+    assert response.status_code == 200, response.text
+    assert response.json() == {"2": {"haha": 5, "like": 3, "wow": 2}, "1": {"like": 1}, "3": {}}
+    assert list(response.json()["2"]) == ["haha", "like", "wow"]
+
+
 def test_get_number_reactions_for_comment_(session, client):
     response = client.get("api/reactions/number/2", params={"picture_id": 2})
     assert response.status_code == 200, response.text
@@ -23,8 +44,7 @@ def test_get_number_reactions_for_comment_(session, client):
 
 def test_add_reaction(session, client, user):
     new_user = login_user_token_created(user, session)
-    with patch.object(auth_service, "r") as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, "client", FakeRedis()):
         response = client.post("api/reactions/like", headers={"accept": "application/json",
                                                               "Authorization": f"Bearer {new_user['access_token']}"
                                                               }, params={"comment_id": 2, "reaction": "wow"})
@@ -36,8 +56,7 @@ def test_add_reaction(session, client, user):
 
 def test_delete_reaction_if_found(session, client, user):
     new_user = login_user_token_created(user, session)
-    with patch.object(auth_service, "r") as r_mock:
-        r_mock.get.return_value = None
+    with patch.object(auth_service.user_cache, "client", FakeRedis()):
         response = client.delete("api/reactions/like", headers={"accept": "application/json",
                                                                 "Authorization": f"Bearer {new_user['access_token']}"
                                                                 }, params={"comment_id": 1})
@@ -1,3 +1,10 @@
+from datetime import datetime
+from unittest.mock import patch
+
+from src.database.models import Picture, Tag, User
+from src.services.auth import auth_service
+from src.tests.conftest import FakeRedis, login_user_token_created
+
 
 def test_search_picture(client, picture_s):
     picture = picture_s
@@ -18,3 +25,164 @@ def test_search_picture(client, picture_s):
 
     assert response1.status_code == 404
     assert response1.json() == {"detail": "Picture not found"}
+
+
+def create_rated_pictures(session):
+    pictures = [
+        Picture(picture_url="url1", description="sunset beach", rating_sum=8, rating_count=2,
+                created_at=datetime(2024, 3, 1), tags=[Tag(name="holiday")]),
+        Picture(picture_url="url2", description="mountain", rating_sum=5, rating_count=1,
+                created_at=datetime(2024, 3, 2)),
+        Picture(picture_url="url3", description="sunset city", rating_sum=2, rating_count=1,
+                created_at=datetime(2024, 3, 3)),
+        Picture(picture_url="url4", description="sunset forest", rating_sum=0, rating_count=0,
+                created_at=datetime(2024, 3, 4)),
+    ]
+    session.add_all(pictures)
+    session.commit()
+    return pictures
+
+
+def test_search_picture_sort_by_rating(client, session):
+    create_rated_pictures(session)
+
+    response = client.post("/api/search/pictures?keyword=sunset&sort_by=rating&sort_order=desc")
+
+    assert response.status_code == 200, response.text
+    assert [picture["picture_url"] for picture in response.json()] == ["url1", "url3", "url4"]
+    assert [picture["average_rating"] for picture in response.json()] == [4.0, 2.0, None]
+
+
+def test_search_picture_min_rating_and_limit(client, session):
+    create_rated_pictures(session)
+
+    response = client.post("/api/search/pictures?sort_by=rating&min_rating=2.5&limit=1&skip=1")
+
+    assert response.status_code == 200, response.text
+    assert [picture["picture_url"] for picture in response.json()] == ["url1"]
+
+
+def test_search_picture_by_tag(client, session):
+    create_rated_pictures(session)
+
+    response = client.post("/api/search/pictures?keyword=holi")
+
+    assert response.status_code == 200, response.text
+    assert [picture["picture_url"] for picture in response.json()] == ["url1"]
+
+
+def test_search_picture_index_follows_edits(client, session):
+    pictures = create_rated_pictures(session)
+
+    pictures[1].description = "lake at dawn"
+    pictures[2].tags.append(Tag(name="lakeside"))
+    session.delete(pictures[0])
+    session.commit()
+
+    response = client.post("/api/search/pictures?keyword=lake")
+    assert [picture["picture_url"] for picture in response.json()] == ["url3", "url2"]
+
+    response = client.post("/api/search/pictures?keyword=holiday")
+    assert response.status_code == 404
+
+
+def test_search_picture_sort_by_relevance(client, session):
+    session.add_all([
+        Picture(picture_url="url1", description="red car", created_at=datetime(2024, 3, 1)),
+        Picture(picture_url="url2", description="blue bike", created_at=datetime(2024, 3, 2), tags=[Tag(name="red")]),
+        Picture(picture_url="url3", description="green bus", created_at=datetime(2024, 3, 3)),
+    ])
+    session.commit()
+
+    response = client.post("/api/search/pictures?keyword=red&sort_by=relevance")
+
+    assert response.status_code == 200, response.text
+    assert [picture["picture_url"] for picture in response.json()] == ["url2", "url1"]
+
+
+def create_users_with_pictures(session):
+    users = [User(username=f"member{i}", email=f"member{i}@example.com", password="secret") for i in range(1, 5)]
+    session.add_all(users)
+    session.flush()
+    session.add_all([
+        Picture(picture_url="url1", user_id=users[0].id, rating_sum=5, rating_count=1, created_at=datetime(2024, 3, 1)),
+        Picture(picture_url="url2", user_id=users[0].id, rating_sum=1, rating_count=1, created_at=datetime(2024, 3, 5)),
+        Picture(picture_url="url3", user_id=users[1].id, rating_sum=4, rating_count=1, created_at=datetime(2024, 3, 6)),
+        Picture(picture_url="url4", user_id=users[2].id, rating_sum=0, rating_count=0, created_at=datetime(2024, 3, 2)),
+    ])
+    session.commit()
+    return [user.id for user in users]
+
+
+def search_as(client, url, token, **params):
+    with patch.object(auth_service.user_cache, "client", FakeRedis()):
+        return client.get(url, params=params, headers={"Authorization": f"Bearer {token['access_token']}"})
+
+
+def test_search_users_requires_moderator(client, session, user):
+    token = login_user_token_created(user, session)
+
+    response = search_as(client, "/api/search/users", token)
+
+    assert response.status_code == 403, response.text
+
+
+def test_search_users_filters_and_counts_pictures(client, session, admin):
+    token = login_user_token_created(admin, session)
+    user_ids = create_users_with_pictures(session)
+
+    response = search_as(client, "/api/search/users", token, keyword="member1", with_total=True)
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["total"] == 1
+    assert data["next_cursor"] is None
+    assert data["items"] == [{"id": user_ids[0], "username": "member1", "email": "member1@example.com",
+                              "avatar": None, "picture_count": 2}]
+
+
+def test_search_users_keyset_pages(client, session, admin):
+    token = login_user_token_created(admin, session)
+    create_users_with_pictures(session)
+
+    first = search_as(client, "/api/search/users", token, email="member", limit=3, with_total=True).json()
+    second = search_as(client, "/api/search/users", token, email="member", limit=3,
+                       cursor=first["next_cursor"]).json()
+
+    assert first["total"] == 4
+    assert [item["username"] for item in first["items"]] == ["member1", "member2", "member3"]
+    assert [item["username"] for item in second["items"]] == ["member4"]
+    assert second["next_cursor"] is None
+    assert second["total"] is None
+
+
+def test_search_users_invalid_cursor(client, session, admin):
+    token = login_user_token_created(admin, session)
+
+    response = search_as(client, "/api/search/users", token, cursor="not-a-cursor")
+
+    assert response.status_code == 400, response.text
+
+
+def test_search_users_by_picture(client, session, admin):
+    token = login_user_token_created(admin, session)
+    user_ids = create_users_with_pictures(session)
+
+    response = search_as(client, "/api/search/user/_by_picture", token,
+                         min_rating=3, added_after="2024-03-01T12:00:00", with_total=True)
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["total"] == 1
+    assert [(item["id"], item["picture_count"]) for item in data["items"]] == [(user_ids[1], 1)]
+
+
+def test_search_users_by_picture_groups_pictures(client, session, admin):
+    token = login_user_token_created(admin, session)
+    user_ids = create_users_with_pictures(session)
+
+    response = search_as(client, "/api/search/user/_by_picture", token, limit=2)
+
+    data = response.json()
+    assert [(item["id"], item["picture_count"]) for item in data["items"]] == [(user_ids[0], 2), (user_ids[1], 1)]
+    assert data["next_cursor"] is not None
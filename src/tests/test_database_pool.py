@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.db import async_database_url, pool_options
+from src.database.pool import TimedQueuePool, pool_stats
+from src.routes.metrics import render_pool_metrics
+
+
+def create_engine_with_pool(tmp_path, **options):
+    return create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool, **options)
+
+
+def test_async_database_url():
+    assert async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert async_database_url("postgresql://user:pass@db:5432/app") == "postgresql+asyncpg://user:pass@db:5432/app"
+    assert async_database_url("postgresql+psycopg2://user:pass@db/app") == "postgresql+asyncpg://user:pass@db/app"
+    assert async_database_url("postgresql+asyncpg://user:pass@db/app") == "postgresql+asyncpg://user:pass@db/app"
+
+
+def test_pool_options_are_read_from_secrets():
+    options = pool_options()
+
+    assert options["poolclass"] is TimedQueuePool
+    assert (options["pool_size"], options["max_overflow"]) == (5, 10)
+    assert options["pool_timeout"] == 30
+    assert options["pool_recycle"] == 1800
+    assert options["pool_pre_ping"] is True
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_track_checked_out_connections(tmp_path):
+    engine = create_engine_with_pool(tmp_path, pool_size=2, max_overflow=1)
+    try:
+        async with engine.connect() as first, engine.connect() as second, engine.connect() as third:
+            for connection in (first, second, third):
+                await connection.execute(text("SELECT 1"))
+            stats = pool_stats(engine.sync_engine)
+            assert stats["size"] == 2
+            assert stats["checked_out"] == 3
+            assert stats["overflow"] == 1
+
+        stats = pool_stats(engine.sync_engine)
+        assert stats["checked_out"] == 0
+        assert stats["checked_in"] == 2
+        assert stats["checkouts"] == 3
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_records_wait_time_and_timeouts(tmp_path):
+    engine = create_engine_with_pool(tmp_path, pool_size=1, max_overflow=0, pool_timeout=0.2)
+    try:
+        async with engine.connect() as held:
+            await held.execute(text("SELECT 1"))
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+
+        stats = pool_stats(engine.sync_engine)
+        assert stats["timeouts"] == 1
+        assert stats["wait_seconds_max"] >= 0.2
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_waiting_checkout_gets_returned_connection(tmp_path):
+    engine = create_engine_with_pool(tmp_path, pool_size=1, max_overflow=0, pool_timeout=5)
+
+    async def hold():
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            await asyncio.sleep(0.2)
+
+    async def wait():
+        await asyncio.sleep(0.05)
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    try:
+        await asyncio.gather(hold(), wait())
+        stats = pool_stats(engine.sync_engine)
+        assert stats["checkouts"] == 2
+        assert stats["timeouts"] == 0
+        assert stats["wait_seconds_max"] >= 0.1
+    finally:
+        await engine.dispose()
+
+
+def test_render_pool_metrics():
+    stats = {"size": 5, "checked_in": 1, "checked_out": 2, "overflow": -2,
+             "checkouts": 7, "timeouts": 0, "wait_seconds_total": 0.5, "wait_seconds_max": 0.25}
+
+    body = render_pool_metrics({"primary": stats})
+
+    assert "# TYPE db_pool_checked_out gauge" in body
+    assert "# TYPE db_pool_checkouts_total counter" in body
+    assert 'db_pool_checked_out{pool="primary",worker="' in body
+    assert body.rstrip().endswith("0.25")
+
+
+def test_metrics_route(client):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'db_pool_size{pool="primary"' in response.text
+    assert "db_pool_wait_seconds_total" in response.text
+    assert 'cache_hits_total{cache="token"' in response.text
+    assert 'cache_misses_total{cache="session"' in response.text
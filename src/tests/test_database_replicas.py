@@ -0,0 +1,92 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.requests import Request
+
+from src.database import db as database
+from src.database.replicas import PRIMARY_PIN_COOKIE, ReplicaRouter, pin_primary_after_writes
+
+
+def create_replica(tmp_path, name):
+    return create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}")
+
+
+def make_request(cookies: str = "") -> Request:
+    headers = [(b"cookie", cookies.encode())] if cookies else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_choose_round_robin_skips_replicas_that_are_down(tmp_path):
+    engines = [create_replica(tmp_path, f"replica{index}.db") for index in range(3)]
+    router = ReplicaRouter(engines)
+
+    assert [router.choose() for _ in range(3)] == engines
+
+    router.mark_down(1)
+    assert {router.choose() for _ in range(4)} == {engines[0], engines[2]}
+
+    router.mark_up(1)
+    assert {router.choose() for _ in range(3)} == set(engines)
+
+
+def test_choose_without_healthy_replicas(tmp_path):
+    assert ReplicaRouter([]).choose() is None
+
+    router = ReplicaRouter([create_replica(tmp_path, "replica.db")])
+    router.mark_down(0)
+    assert router.choose() is None
+
+
+@pytest.mark.asyncio
+async def test_check_marks_unreachable_replicas_down(tmp_path):
+    healthy = create_replica(tmp_path, "replica.db")
+    unreachable = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = ReplicaRouter([healthy, unreachable])
+    try:
+        await router.check()
+
+        assert router.is_healthy(0)
+        assert not router.is_healthy(1)
+        assert router.choose() is healthy
+    finally:
+        await router.stop()
+
+
+def test_read_engine_uses_primary_when_pinned(tmp_path, monkeypatch):
+    replica = create_replica(tmp_path, "replica.db")
+    monkeypatch.setattr(database, "replica_router", ReplicaRouter([replica]))
+
+    assert database.read_engine(make_request()) is replica
+    assert database.read_engine(make_request(f"{PRIMARY_PIN_COOKIE}=1")) is database.async_engine
+
+
+def test_read_engine_falls_back_to_primary(monkeypatch):
+    monkeypatch.setattr(database, "replica_router", ReplicaRouter([]))
+
+    assert database.read_engine(make_request()) is database.async_engine
+
+
+def test_pin_primary_after_writes():
+    app = FastAPI()
+    app.middleware("http")(pin_primary_after_writes(5))
+
+    @app.get("/item")
+    async def read_item():
+        return {}
+
+    @app.post("/item")
+    async def create_item():
+        return {}
+
+    @app.delete("/item")
+    async def delete_item():
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    client = TestClient(app)
+
+    assert PRIMARY_PIN_COOKIE not in client.get("/item").cookies
+    response = client.post("/item")
+    assert response.cookies[PRIMARY_PIN_COOKIE] == "1"
+    assert "Max-Age=5" in response.headers["set-cookie"]
+    assert PRIMARY_PIN_COOKIE not in client.delete("/item").cookies
@@ -0,0 +1,182 @@
+import json
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from jose import JWTError, jwt
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import DetachedInstanceError
+from starlette.requests import Request
+
+from src.database.models import User
+from src.repository import users as repository_users
+from src.services.auth import (auth_service, token_fingerprint, user_from_record, user_to_record, ALGORITHM,
+                               USER_RECORD_VERSION)
+from src.tests.conftest import async_engine, DownRedis, TestingAsyncSessionLocal
+
+
+@pytest.fixture
+def members(session: Session):
+    members = [User(id=1, username="admin", email="admin@example.com", password="hash", admin=True),
+               User(id=2, username="member", email="member@example.com", password="hash")]
+    session.add_all(members)
+    session.commit()
+    return members
+
+
+def test_user_record_round_trip():
+    user = User(id=1, username="member", email="member@example.com", password="hash", avatar=None,
+                confirmed=True, admin=False, moderator=True, ban_status=False, created_at=datetime(2024, 3, 1))
+
+    record = json.loads(json.dumps(user_to_record(user)))
+    cached = user_from_record(record)
+
+    assert record["v"] == USER_RECORD_VERSION
+    assert "password" not in record
+    assert (cached.id, cached.email, cached.moderator, cached.created_at) == (1, "member@example.com", True,
+                                                                           datetime(2024, 3, 1))
+    with pytest.raises(DetachedInstanceError):
+        cached.password
+
+
+def test_user_record_of_other_version_is_a_miss():
+    record = user_to_record(User(id=1, username="member", email="member@example.com"))
+    record["v"] = USER_RECORD_VERSION + 1
+
+    assert user_from_record(record) is None
+
+
+@pytest.mark.asyncio
+async def test_current_user_is_cached_until_banned(redis_client, members):
+    token = auth_service.create_access_token(data={"sub": "member@example.com"})
+
+    async with TestingAsyncSessionLocal() as db:
+        await auth_service.get_current_user(token, db)
+    assert json.loads(redis_client.values["auth_user:member@example.com"])["ban_status"] is False
+
+    async with TestingAsyncSessionLocal() as db:
+        await repository_users.ban_user(2, db, await db.get(User, 1))
+    assert "auth_user:member@example.com" not in redis_client.values
+
+    async with TestingAsyncSessionLocal() as db:
+        with pytest.raises(HTTPException) as error:
+            await auth_service.get_current_user(token, db)
+    assert error.value.status_code == 403
+
+
+def session_request(refresh_token: str) -> Request:
+    return Request({"type": "http", "headers": [(b"cookie", f"refresh_token={refresh_token}".encode())]})
+
+
+async def resolve_session(refresh_token: str):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        async with TestingAsyncSessionLocal() as db:
+            request = session_request(refresh_token)
+            user = await auth_service.get_current_user_optional(request, db)
+            assert await auth_service.get_current_user_optional(request, db) is user
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return user, len(statements)
+
+
+@pytest.mark.asyncio
+async def test_session_user_is_resolved_from_memory_until_invalidated(redis_client, members):
+    refresh_token = auth_service.create_refresh_token(data={"sub": "member@example.com"})
+
+    user, statements = await resolve_session(refresh_token)
+    assert (user.id, statements) == (2, 1)
+
+    user, statements = await resolve_session(refresh_token)
+    assert (user.id, user.ban_status, statements) == (2, False, 0)
+
+    async with TestingAsyncSessionLocal() as db:
+        await repository_users.ban_user(2, db, await db.get(User, 1))
+
+    user, statements = await resolve_session(refresh_token)
+    assert (user.ban_status, statements) == (True, 1)
+
+
+@pytest.mark.asyncio
+async def test_session_user_is_invalidated_by_other_workers(redis_client, members):
+    refresh_token = auth_service.create_refresh_token(data={"sub": "member@example.com"})
+    await resolve_session(refresh_token)
+
+    # Another worker bans the user: the version in Redis changes, this worker's memory does not.
+    async with TestingAsyncSessionLocal() as db:
+        await db.execute(update(User).where(User.id == 2).values(ban_status=True))
+        await db.commit()
+    await auth_service.user_versions.bump("member@example.com")
+
+    user, statements = await resolve_session(refresh_token)
+    assert (user.ban_status, statements) == (True, 1)
+
+
+@pytest.mark.asyncio
+async def test_session_user_is_not_cached_without_redis(members):
+    refresh_token = auth_service.create_refresh_token(data={"sub": "member@example.com"})
+
+    with patch.object(auth_service.user_versions, "client", DownRedis()):
+        for _ in range(2):
+            user, statements = await resolve_session(refresh_token)
+            assert (user.id, statements) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_session_user_expires_with_the_refresh_token(redis_client, members, monkeypatch):
+    now = [time.monotonic()]
+    monkeypatch.setattr("src.services.cache.time.monotonic", lambda: now[0])
+    refresh_token = auth_service.create_refresh_token(data={"sub": "member@example.com"}, expires_delta=2)
+
+    await resolve_session(refresh_token)
+    now[0] += 5
+
+    assert auth_service.session_cache.get(token_fingerprint(refresh_token)) is None
+
+
+@pytest.mark.asyncio
+async def test_no_session_cookie():
+    request = Request({"type": "http", "headers": []})
+
+    async with TestingAsyncSessionLocal() as db:
+        assert await auth_service.get_current_user_optional(request, db) is None
+
+
+def test_verified_token_claims_are_cached():
+    token = auth_service.create_access_token(data={"sub": "member@example.com"})
+
+    with patch("src.services.auth.jwt.decode", wraps=jwt.decode) as decode:
+        first = auth_service.decode_token(token)
+        second = auth_service.decode_token(token)
+
+    assert first == second
+    assert first["sub"] == "member@example.com"
+    decode.assert_called_once()
+
+
+def test_cached_token_expires_with_its_claims(monkeypatch):
+    now = [time.monotonic()]
+    monkeypatch.setattr("src.services.cache.time.monotonic", lambda: now[0])
+    token = auth_service.create_access_token(data={"sub": "member@example.com"}, expires_delta=2)
+    auth_service.decode_token(token)
+
+    now[0] += 5
+
+    assert auth_service.token_cache.get(token_fingerprint(token)) is None
+
+
+def test_invalid_token_is_not_cached():
+    token = jwt.encode({"sub": "member@example.com", "scope": "access_token"}, "other key", algorithm=ALGORITHM)
+
+    for _ in range(2):
+        with pytest.raises(JWTError):
+            auth_service.decode_token(token)
+    assert auth_service.token_cache.get(token_fingerprint(token)) is None
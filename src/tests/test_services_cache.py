@@ -0,0 +1,119 @@
+import time
+
+import pytest
+
+from src.services.cache import MemoryCache, RedisCache, RedisTimeline, RedisVersions
+from src.tests.conftest import DownRedis, FakeRedis
+
+
+@pytest.mark.asyncio
+async def test_set_and_get_many():
+    client = FakeRedis()
+    cache = RedisCache("counts", ttl=60, client=client)
+
+    await cache.set_many({1: {"like": 2}, 2: {}})
+
+    assert client.values == {"counts:1": '{"like": 2}', "counts:2": "{}"}
+    assert client.expiry == {"counts:1": 60, "counts:2": 60}
+    assert await cache.get_many([1, 2, 3]) == {1: {"like": 2}, 2: {}}
+    assert await cache.get(3) is None
+
+
+@pytest.mark.asyncio
+async def test_delete_invalidates():
+    cache = RedisCache("counts", ttl=60, client=FakeRedis())
+    await cache.set(1, {"like": 2})
+
+    await cache.delete(1)
+
+    assert await cache.get(1) is None
+
+
+@pytest.mark.asyncio
+async def test_unavailable_redis_is_a_miss():
+    cache = RedisCache("counts", ttl=60, client=DownRedis())
+
+    assert await cache.get_many([1, 2]) == {}
+    await cache.set(1, {"like": 2})
+    await cache.delete(1)
+
+
+def test_memory_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("src.services.cache.time.monotonic", lambda: now[0])
+    cache = MemoryCache(maxsize=10, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+
+    now[0] += 10
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(maxsize=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+
+    cache.set("c", 3)
+
+    assert [cache.get(name) for name in "abc"] == [1, None, 3]
+
+
+def test_memory_cache_delete_where():
+    cache = MemoryCache(maxsize=10, ttl=30)
+    cache.set("a", {"email": "member@example.com"})
+    cache.set("b", {"email": "admin@example.com"})
+
+    cache.delete_where(lambda value: value["email"] == "member@example.com")
+
+    assert cache.get("a") is None
+    assert cache.get("b") == {"email": "admin@example.com"}
+
+
+@pytest.mark.asyncio
+async def test_timeline_trims_entries_older_than_its_window():
+    client = FakeRedis()
+    timeline = RedisTimeline("stories", window=60, ttl=300, client=client)
+    assert await timeline.recent() is None
+
+    now = time.time()
+    await timeline.load([(1, now - 120, {"id": 1}), (2, now - 30, {"id": 2})])
+    await timeline.add(3, now, {"id": 3})
+
+    assert await timeline.recent() == [{"id": 3}, {"id": 2}]
+    assert "1" not in client.values["stories:ids"]
+    assert client.expiry["stories:loaded"] == 300
+
+    await timeline.remove(3)
+    assert await timeline.recent() == [{"id": 2}]
+
+
+@pytest.mark.asyncio
+async def test_unavailable_redis_timeline_must_be_loaded():
+    timeline = RedisTimeline("stories", window=60, ttl=300, client=DownRedis())
+
+    assert await timeline.recent() is None
+    await timeline.load([(1, time.time(), {"id": 1})])
+    await timeline.add(2, time.time(), {"id": 2})
+    await timeline.remove(2)
+
+
+@pytest.mark.asyncio
+async def test_versions_start_at_zero_and_bump():
+    versions = RedisVersions("user_version", client=FakeRedis())
+
+    assert await versions.get("member") == 0
+    await versions.bump("member")
+    assert await versions.get("member") == 1
+
+
+@pytest.mark.asyncio
+async def test_versions_unavailable():
+    versions = RedisVersions("user_version", client=DownRedis())
+
+    assert await versions.get("member") is None
+    await versions.bump("member")
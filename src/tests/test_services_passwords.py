@@ -0,0 +1,66 @@
+import threading
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import User
+from src.services.auth import auth_service
+from src.services.passwords import PasswordService
+
+
+@pytest.fixture
+def passwords():
+    service = PasswordService(rounds=4, max_workers=2)
+    yield service
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify(passwords):
+    hashed = await passwords.hash("secret")
+
+    assert hashed.startswith("$2b$04$")
+    assert await passwords.verify("secret", hashed)
+    assert not await passwords.verify("wrong", hashed)
+
+
+@pytest.mark.asyncio
+async def test_hashing_runs_on_the_pool(passwords, monkeypatch):
+    threads = []
+    hash_password = passwords.context.hash
+
+    def record_thread(password):
+        threads.append(threading.current_thread().name)
+        return hash_password(password)
+
+    monkeypatch.setattr(passwords.context, "hash", record_thread)
+    await passwords.hash("secret")
+
+    assert threads[0].startswith("passwords")
+
+
+@pytest.mark.asyncio
+async def test_changed_cost_is_rehashed(passwords):
+    old_hash = PasswordService(rounds=5, max_workers=1).context.hash("secret")
+
+    valid, new_hash = await passwords.verify_and_update("secret", old_hash)
+    assert valid
+    assert new_hash.startswith("$2b$04$")
+    assert await passwords.verify_and_update("secret", new_hash) == (True, None)
+    assert await passwords.verify_and_update("wrong", old_hash) == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_login_stores_rehashed_password(passwords, monkeypatch):
+    monkeypatch.setattr(auth_service, "password_service", passwords)
+    db = AsyncMock(spec=AsyncSession)
+    user = User(email="member@example.com", password=PasswordService(rounds=5, max_workers=1).context.hash("secret"))
+
+    assert await auth_service.authenticate_password(user, "secret", db)
+    assert user.password.startswith("$2b$04$")
+    db.commit.assert_awaited_once()
+
+    assert not await auth_service.authenticate_password(user, "wrong", db)
+    assert await auth_service.authenticate_password(user, "secret", db)
+    db.commit.assert_awaited_once()
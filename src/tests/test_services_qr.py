@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import patch
-from src.services.qr import generate_qr_and_upload_to_cloudinary
+from fastapi import HTTPException
+from src.services.qr import generate_qr_and_upload_to_cloudinary, qr_target
 
 @pytest.mark.asyncio
 async def test_generate_qr_and_upload_to_cloudinary_picture():
@@ -18,8 +19,8 @@ async def test_generate_qr_and_upload_to_cloudinary_picture():
     }
 
     with patch("src.services.qr.generate_random_string", return_value="test_qr"), \
-         patch("src.services.qr.cloudinary.uploader.upload", veturn_value=expected_upload_response) as mock_cloudinary_upload, \
-         patch("src.services.qr.cloudinary.CloudinaryImage.build_url", return_value=expected_qr_url) as mock_build_url:
+         patch("src.services.storage.cloudinary.uploader.upload", veturn_value=expected_upload_response) as mock_cloudinary_upload, \
+         patch("src.services.storage.cloudinary.CloudinaryImage.build_url", return_value=expected_qr_url) as mock_build_url:
 
         qr_url = await generate_qr_and_upload_to_cloudinary(url, picture)
 
@@ -38,8 +39,8 @@ async def test_generate_qr_and_upload_to_cloudinary_any_url():
     }
 
     with patch("src.services.qr.generate_random_string", return_value="test_qr"), \
-         patch("src.services.qr.cloudinary.uploader.upload", return_value=expected_upload_response) as mock_cloudinary_upload, \
-         patch("src.services.qr.cloudinary.CloudinaryImage.build_url", return_value=expected_qr_url) as mock_build_url:
+         patch("src.services.storage.cloudinary.uploader.upload", return_value=expected_upload_response) as mock_cloudinary_upload, \
+         patch("src.services.storage.cloudinary.CloudinaryImage.build_url", return_value=expected_qr_url) as mock_build_url:
 
         qr_url = await generate_qr_and_upload_to_cloudinary(url)
 
@@ -47,3 +48,22 @@ async def test_generate_qr_and_upload_to_cloudinary_any_url():
         mock_cloudinary_upload.assert_called_once()
         mock_build_url.assert_called_once_with(version='test_version')
 
+
+def test_qr_target_keeps_absolute_urls():
+    assert qr_target("https://cdn.example.com/media/ab/cd/file.png", "") == "https://cdn.example.com/media/ab/cd/file.png"
+
+def test_qr_target_resolves_relative_urls():
+    assert qr_target("/media/ab/cd/file.png", "https://photoshare.example.com/") == \
+        "https://photoshare.example.com/media/ab/cd/file.png"
+
+@pytest.mark.asyncio
+async def test_qr_of_relative_url_requires_public_base_url():
+    with patch("src.services.qr.PUBLIC_BASE_URL", ""), \
+         patch("src.services.storage.cloudinary.uploader.upload") as mock_cloudinary_upload:
+
+        with pytest.raises(HTTPException) as error:
+            await generate_qr_and_upload_to_cloudinary("/media/ab/cd/file.png")
+
+    assert error.value.status_code == 500
+    assert "PUBLIC_BASE_URL" in error.value.detail
+    mock_cloudinary_upload.assert_not_called()
@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import threading
+import time
+from io import BytesIO
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.staticfiles import StaticFiles
+from unittest.mock import patch
+
+from src.services.storage import StorageService, CloudinaryBackend, LocalBackend, CHUNK_SIZE
+
+
+@pytest.mark.asyncio
+async def test_upload_runs_off_the_event_loop():
+    storage = StorageService(CloudinaryBackend(), max_workers=2)
+    loop_thread = threading.get_ident()
+    upload_threads = []
+
+    def fake_upload(file, **options):
+        upload_threads.append(threading.get_ident())
+        return {"public_id": options["public_id"]}
+
+    with patch("src.services.storage.cloudinary.uploader.upload", side_effect=fake_upload):
+        result = await storage.upload(b"data", public_id="picture/test")
+
+    storage.shutdown()
+    assert result == {"public_id": "picture/test"}
+    assert upload_threads and upload_threads[0] != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_slow_uploads_do_not_block_other_work():
+    storage = StorageService(CloudinaryBackend(), max_workers=2)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    with patch("src.services.storage.cloudinary.uploader.upload", side_effect=lambda file, **options: time.sleep(0.2)):
+        await asyncio.gather(storage.upload(b"data"), ticker())
+
+    storage.shutdown()
+    assert ticks == 5
+
+
+@pytest.mark.asyncio
+async def test_concurrent_uploads_are_bounded():
+    storage = StorageService(CloudinaryBackend(), max_workers=2)
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def fake_upload(file, **options):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return {}
+
+    with patch("src.services.storage.cloudinary.uploader.upload", side_effect=fake_upload):
+        await asyncio.gather(*(storage.upload(b"data") for _ in range(6)))
+
+    storage.shutdown()
+    assert peak == 2
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+def test_local_backend_stores_content_addressed_files(tmp_path):
+    backend = LocalBackend(root=str(tmp_path), base_url="/media/")
+    digest = hashlib.sha256(PNG).hexdigest()
+
+    first = backend.upload(BytesIO(PNG), folder="picture", public_id="ignored")
+    second = backend.upload(PNG, folder="qr_code")
+
+    assert first["public_id"] == second["public_id"] == f"{digest[:2]}/{digest[2:4]}/{digest}.png"
+    assert first["folder"] == "picture"
+    assert (tmp_path / first["public_id"]).read_bytes() == PNG
+    assert backend.url(first["public_id"], width=250) == f"/media/{first['public_id']}"
+    assert [path.name for path in tmp_path.iterdir()] == [digest[:2]]
+
+
+def test_local_backend_streams_in_chunks(tmp_path):
+    backend = LocalBackend(root=str(tmp_path), base_url="/media")
+    content = b"\x00" * (CHUNK_SIZE * 2 + 10)
+    file = BytesIO(content)
+
+    with patch.object(file, "read", wraps=file.read) as read:
+        uploaded = backend.upload(file)
+
+    assert all(call.args == (CHUNK_SIZE,) for call in read.call_args_list)
+    assert uploaded["bytes"] == len(content)
+    assert uploaded["public_id"].endswith(".bin")
+
+
+def test_local_backend_rejects_urls(tmp_path):
+    backend = LocalBackend(root=str(tmp_path), base_url="/media")
+
+    with pytest.raises(ValueError):
+        backend.upload("https://example.com/picture.png")
+
+
+@pytest.mark.asyncio
+async def test_local_media_is_served(tmp_path):
+    storage = StorageService(LocalBackend(root=str(tmp_path), base_url="/media"), max_workers=1)
+    uploaded = await storage.upload(BytesIO(PNG), folder="picture")
+    storage.shutdown()
+
+    app = FastAPI()
+    app.mount("/media", StaticFiles(directory=str(tmp_path)), name="media")
+    response = TestClient(app).get(storage.url(uploaded["public_id"]))
+
+    assert response.status_code == 200
+    assert response.content == PNG
+    assert response.headers["content-type"] == "image/png"
+
+
+@pytest.mark.asyncio
+async def test_local_backend_deletes_files(tmp_path):
+    storage = StorageService(LocalBackend(root=str(tmp_path), base_url="/media"), max_workers=1)
+    uploaded = await storage.upload(b"GIF89a story")
+    public_id = storage.public_id(storage.url(uploaded["public_id"]))
+
+    await storage.delete([public_id, "aa/bb/missing.gif"])
+
+    storage.shutdown()
+    assert public_id == uploaded["public_id"]
+    assert not (tmp_path / public_id).exists()
+    assert storage.public_id("https://example.com/other.gif") is None
+
+
+def test_cloudinary_backend_deletes_in_batches():
+    backend = CloudinaryBackend()
+    public_ids = [f"stories/{i}" for i in range(250)]
+
+    with patch("src.services.storage.cloudinary.api.delete_resources") as delete_resources:
+        backend.delete(public_ids, resource_type="video")
+
+    assert [len(call.args[0]) for call in delete_resources.call_args_list] == [100, 100, 50]
+    assert delete_resources.call_args.kwargs == {"resource_type": "video"}
+    assert backend.public_id("https://res.cloudinary.com/demo/video/upload/v123/stories/abc") == "stories/abc"
+    assert backend.public_id("https://res.cloudinary.com/demo/image/upload/stories/abc") == "stories/abc"
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.database.models import MediaAsset, Picture, Story, User
+from src.services.story_purge import StoryPurger, purge_expired_stories
+from src.tests.conftest import DownRedis, FakeRedis, TestingAsyncSessionLocal
+
+MEDIA_URL = "https://res.cloudinary.com/demo/{}/upload/v1/stories/{}"
+
+
+@pytest.fixture
+def stories(session: Session):
+    session.add(User(id=1, username="author", email="author@example.com", password="password"))
+    now = datetime.now()
+    session.add_all([Story(id=i, image_url=MEDIA_URL.format("image", i), user_id=1,
+                           created_at=now - timedelta(hours=30 + i)) for i in range(1, 5)])
+    session.add_all([
+        Story(id=5, image_url=MEDIA_URL.format("video", 5), media_type="video", user_id=1,
+              created_at=now - timedelta(hours=25)),
+        Story(id=6, image_url=MEDIA_URL.format("image", 6), user_id=1, created_at=now - timedelta(hours=1)),
+        Picture(id=1, picture_url=MEDIA_URL.format("image", 4), user_id=1),
+    ])
+    session.commit()
+
+
+@pytest.fixture
+def delete_media():
+    with patch("src.services.story_purge.storage_service.delete", new_callable=AsyncMock) as delete_media:
+        yield delete_media
+
+
+@pytest.mark.asyncio
+async def test_purge_deletes_expired_stories_in_batches(stories, delete_media):
+    async with TestingAsyncSessionLocal() as db:
+        with patch.object(db, "commit", wraps=db.commit) as commit:
+            purged = await purge_expired_stories(db, batch_size=2)
+
+        assert purged == 5
+        assert commit.await_count == 3
+        assert (await db.scalars(select(Story.id))).all() == [6]
+
+    # One call per batch and resource type. Story 4 shares its file with a picture, so the file stays.
+    assert [(call.kwargs["resource_type"], call.args[0]) for call in delete_media.await_args_list] == [
+        ("image", ["stories/3"]),
+        ("image", ["stories/1", "stories/2"]),
+        ("video", ["stories/5"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_media_deletion_keeps_purging(stories, delete_media):
+    delete_media.side_effect = RuntimeError("storage unavailable")
+
+    async with TestingAsyncSessionLocal() as db:
+        assert await purge_expired_stories(db, batch_size=10) == 5
+        assert (await db.scalars(select(Story.id))).all() == [6]
+
+
+@pytest.mark.asyncio
+async def test_nothing_to_purge(delete_media):
+    async with TestingAsyncSessionLocal() as db:
+        assert await purge_expired_stories(db) == 0
+
+    delete_media.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_purge_keeps_media_of_avatars_edits_and_qr_codes(session: Session, delete_media):
+    urls = [MEDIA_URL.format("image", i) for i in range(1, 7)]
+    session.add(User(id=1, username="author", email="author@example.com", password="password", avatar=urls[0]))
+    session.add_all([Story(id=i, image_url=url, user_id=1, created_at=datetime.now() - timedelta(hours=30))
+                     for i, url in enumerate(urls, start=1)])
+    session.add_all([
+        Picture(id=1, picture_url="https://example.com/other.jpg", picture_edited_url=urls[1],
+                qr_code_picture=urls[2], qr_code_picture_edited=urls[3], user_id=1),
+        MediaAsset(content_hash="hash", resource_type="image", url="https://example.com/other.jpg",
+                   qr_code=urls[4]),
+    ])
+    session.commit()
+
+    async with TestingAsyncSessionLocal() as db:
+        assert await purge_expired_stories(db) == 6
+
+    assert [call.args[0] for call in delete_media.await_args_list] == [["stories/6"]]
+
+
+@pytest.mark.asyncio
+async def test_one_worker_purges_per_interval():
+    client = FakeRedis()
+    workers = [StoryPurger(client), StoryPurger(client)]
+
+    with patch("src.services.story_purge.purge_expired_stories", new_callable=AsyncMock,
+               return_value=2) as purge:
+        results = await asyncio.gather(*(worker.run_once(3600) for worker in workers))
+
+    assert sorted(results, key=str) == [2, None]
+    purge.assert_awaited_once()
+    assert client.expiry[StoryPurger.lock_key] == 3600
+
+
+@pytest.mark.asyncio
+async def test_purge_is_skipped_without_redis():
+    with patch("src.services.story_purge.purge_expired_stories", new_callable=AsyncMock) as purge:
+        assert await StoryPurger(DownRedis()).run_once(3600) is None
+
+    purge.assert_not_awaited()
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from fastapi import UploadFile
+
+from src.database.models import Picture, MediaAsset
+from src.services.storage import StorageService, CloudinaryBackend
+from src.services.uploads import UploadTimings, UploadedMedia, upload_post_media, attach_qr
+from src.tests.conftest import TestingAsyncSessionLocal
+
+
+def fake_upload(file, **options):
+    time.sleep(0.1)
+    return {"public_id": f"{options.get('folder', 'picture')}/{options.get('public_id')}", "version": 1,
+            "folder": options.get("folder", "picture")}
+
+
+async def fake_qr(url, picture=None, version=None):
+    await asyncio.sleep(0.1)
+    return f"qr-for-{url}"
+
+
+def upload_file(name, content=None):
+    return UploadFile(file=BytesIO(content or name.encode()), filename=name)
+
+
+def storage_patches(upload=fake_upload, qr=fake_qr):
+    return (patch("src.services.uploads.storage_service", StorageService(CloudinaryBackend(), max_workers=4)),
+            patch("src.services.storage.cloudinary.uploader.upload", side_effect=upload),
+            patch("src.services.uploads.generate_qr_and_upload_to_cloudinary", side_effect=qr))
+
+
+@pytest.mark.asyncio
+async def test_secondary_and_qr_run_concurrently(session):
+    # Each of the secondary upload and the QR code waits for the other to start, which only
+    # happens in time if they run at the same time.
+    uploads, waited = [], {}
+    secondary_started, qr_started = threading.Event(), threading.Event()
+
+    def upload(file, **options):
+        uploads.append(options)
+        if len(uploads) > 1:
+            secondary_started.set()
+            waited["secondary"] = qr_started.wait(timeout=2)
+        return fake_upload(file, **options)
+
+    async def qr(url, picture=None, version=None):
+        qr_started.set()
+        waited["qr"] = await asyncio.to_thread(secondary_started.wait, 2)
+        return await fake_qr(url, picture, version)
+
+    timings = UploadTimings()
+    storage, upload_patch, qr_patch = storage_patches(upload, qr)
+    async with TestingAsyncSessionLocal() as db:
+        with storage, upload_patch, qr_patch:
+            media = await upload_post_media(upload_file("main.png"), upload_file("back.png"), "image", timings, db,
+                                            defer_qr=False)
+
+    assert media.picture_url.startswith("https://")
+    assert media.picture_secondary_url is not None
+    assert media.qr == f"qr-for-{media.picture_url}"
+    assert set(timings.stages) == {"primary_hash", "primary", "secondary_hash", "secondary", "qr"}
+    assert waited == {"secondary": True, "qr": True}
+
+
+@pytest.mark.asyncio
+async def test_qr_can_be_deferred(session):
+    timings = UploadTimings()
+    storage, upload, qr = storage_patches()
+    async with TestingAsyncSessionLocal() as db:
+        with storage, upload, qr as qr_mock:
+            media = await upload_post_media(upload_file("main.png"), None, "image", timings, db, defer_qr=True)
+
+    qr_mock.assert_not_called()
+    assert media.qr is None
+    assert media.picture_secondary_url is None
+    assert set(timings.stages) == {"primary_hash", "primary"}
+
+
+@pytest.mark.asyncio
+async def test_attach_qr_stores_the_qr_url(session):
+    picture = Picture(picture_url="https://example.com/main.png")
+    session.add(picture)
+    session.commit()
+    asset = MediaAsset(content_hash="0" * 64, resource_type="image", url="https://example.com/main.png")
+    session.add(asset)
+    session.commit()
+    media = UploadedMedia("https://example.com/main.png", {"public_id": "picture/main", "folder": "picture"}, asset.id)
+    timings = UploadTimings()
+
+    with patch("src.services.uploads.generate_qr_and_upload_to_cloudinary", side_effect=fake_qr):
+        await attach_qr(picture.id, media, timings, session_factory=TestingAsyncSessionLocal)
+
+    session.expire_all()
+    assert session.get(Picture, picture.id).qr_code_picture == "qr-for-https://example.com/main.png"
+    assert session.get(MediaAsset, media.asset_id).qr_code == "qr-for-https://example.com/main.png"
+    assert "qr" in timings.stages
+    assert "qr;dur=" in timings.server_timing()
+
+
+@pytest.mark.asyncio
+async def test_attach_qr_failure_keeps_the_picture(session):
+    picture = Picture(picture_url="https://example.com/main.png")
+    session.add(picture)
+    session.commit()
+    asset = MediaAsset(content_hash="0" * 64, resource_type="image", url="https://example.com/main.png")
+    session.add(asset)
+    session.commit()
+    media = UploadedMedia("https://example.com/main.png", {"public_id": "picture/main", "folder": "picture"}, asset.id)
+
+    with patch("src.services.uploads.generate_qr_and_upload_to_cloudinary", side_effect=RuntimeError("down")):
+        await attach_qr(picture.id, media, UploadTimings(), session_factory=TestingAsyncSessionLocal)
+
+    session.expire_all()
+    assert session.get(Picture, picture.id).qr_code_picture is None
+
+
+@pytest.mark.asyncio
+async def test_same_content_reuses_asset_and_qr(session):
+    storage, upload, qr = storage_patches()
+    async with TestingAsyncSessionLocal() as db:
+        with storage, upload as upload_mock, qr as qr_mock:
+            first = await upload_post_media(upload_file("one.png", b"same"), None, "image", UploadTimings(), db,
+                                            defer_qr=False)
+            timings = UploadTimings()
+            second = await upload_post_media(upload_file("two.png", b"same"), None, "image", timings, db,
+                                             defer_qr=False)
+
+    assert upload_mock.call_count == 1
+    assert qr_mock.call_count == 1
+    assert (second.picture_url, second.qr, second.asset_id) == (first.picture_url, first.qr, first.asset_id)
+    assert set(timings.stages) == {"primary_hash"}
+    assert session.query(MediaAsset).count() == 1
+
+
+@pytest.mark.asyncio
+async def test_different_content_or_resource_type_is_uploaded(session):
+    storage, upload, qr = storage_patches()
+    async with TestingAsyncSessionLocal() as db:
+        with storage, upload as upload_mock, qr:
+            await upload_post_media(upload_file("one.png", b"one"), None, "image", UploadTimings(), db, defer_qr=True)
+            await upload_post_media(upload_file("two.png", b"two"), None, "image", UploadTimings(), db, defer_qr=True)
+            await upload_post_media(upload_file("one.gif", b"one"), None, "video", UploadTimings(), db, defer_qr=True)
+
+    assert upload_mock.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_reused_asset_without_qr_generates_it(session):
+    storage, upload, qr = storage_patches()
+    async with TestingAsyncSessionLocal() as db:
+        with storage, upload as upload_mock, qr as qr_mock:
+            first = await upload_post_media(upload_file("one.png", b"same"), None, "image", UploadTimings(), db,
+                                            defer_qr=True)
+            second = await upload_post_media(upload_file("two.png", b"same"), None, "image", UploadTimings(), db,
+                                             defer_qr=False)
+
+    assert upload_mock.call_count == 1
+    assert qr_mock.call_count == 1
+    assert first.qr is None
+    assert session.get(MediaAsset, second.asset_id).qr_code == second.qr